@@ -0,0 +1,120 @@
+"""
+Compares the memory and time cost of keeping a long run's history as
+`json.loads(message.model_dump_json())` dicts versus compact `Message`s.
+
+    python benchmarks/messages.py --turns 2000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai.types.chat import ChatCompletionMessage  # noqa: E402
+from openai.types.chat.chat_completion_message_tool_call import (  # noqa: E402
+    ChatCompletionMessageToolCall,
+    Function,
+)
+
+from swarm.message import Message, wire_messages  # noqa: E402
+
+
+def completions(turns: int):
+    # alternate plain answers and single tool calls, like a tool-heavy agent
+    messages = []
+    for turn in range(turns):
+        tool_calls = None
+        if turn % 2 == 0:
+            tool_calls = [
+                ChatCompletionMessageToolCall(
+                    id=f"call_{turn}",
+                    type="function",
+                    function=Function(
+                        name="lookup_order", arguments=json.dumps({"order_id": turn})
+                    ),
+                )
+            ]
+        messages.append(
+            ChatCompletionMessage(
+                role="assistant",
+                content=None if tool_calls else f"Order {turn} ships tomorrow.",
+                tool_calls=tool_calls,
+            )
+        )
+    return messages
+
+
+def legacy_history(messages, sender: str):
+    history = []
+    for message in messages:
+        message.sender = sender
+        history.append(json.loads(message.model_dump_json()))
+        for tool_call in message.tool_calls or ():
+            history.append(
+                {
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "tool_name": tool_call.function.name,
+                    "content": "shipped",
+                }
+            )
+    return history
+
+
+def compact_history(messages, sender: str):
+    history = []
+    for message in messages:
+        history.append(Message.from_completion(message, sender))
+        for tool_call in message.tool_calls or ():
+            history.append(Message.tool(tool_call.id, tool_call.function.name, "shipped"))
+    return history
+
+
+def measure(build, turns: int):
+    # sender built at runtime, as agent names are
+    sender = "".join(["Order", "Agent"])
+    gc.collect()
+    tracemalloc.start()
+    # completions are created and dropped inside the window, as in a real
+    # run, so both sides pay for the payload strings they keep alive
+    messages = completions(turns)
+    start = time.perf_counter()
+    history = build(messages, sender)
+    elapsed = time.perf_counter() - start
+    del messages
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    wire_messages(history)
+    wire = time.perf_counter() - start
+    return history, size, elapsed, wire
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{args.turns} turns")
+    results = {}
+    for name, build in (("json round trip", legacy_history), ("compact", compact_history)):
+        history, size, elapsed, wire = measure(build, args.turns)
+        results[name] = size / len(history)
+        print(
+            f"  {name:16} {len(history):6} messages  {size / len(history):7.0f} B/message  "
+            f"{elapsed / len(history) * 1e6:6.1f} µs/message to record  "
+            f"{wire * 1e3:6.2f} ms to build a request's messages"
+        )
+    saved = 1 - results["compact"] / results["json round trip"]
+    print(f"  compact messages use {saved:.0%} less memory")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
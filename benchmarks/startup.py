@@ -0,0 +1,120 @@
+"""
+Tracks `import swarm` startup cost with `python -X importtime`.
+
+    python benchmarks/startup.py                      # report
+    python benchmarks/startup.py --record startup.jsonl   # append a data point
+    python benchmarks/startup.py --max-ms 150         # fail if slower
+
+Each data point records the median cumulative import time of the target
+statement over several fresh interpreters, the heaviest modules, and whether
+`openai` was imported, so regressions show up as a diff between lines.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def import_times(statement: str) -> dict:
+    """Runs `statement` in a fresh interpreter and returns cumulative µs per module."""
+    probe = f"{statement}; import sys; sys.stdout.write(str('openai' in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        check=True,
+    )
+    modules, total = {}, 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative, indent, name = int(match[2]), len(match[3]), match[4]
+        modules[name] = cumulative
+        # top-level imports are indented by a single space
+        if indent == 1:
+            total += cumulative
+    return {"total": total, "modules": modules, "openai": result.stdout == "True"}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def measure(statement: str, runs: int, top: int) -> dict:
+    samples = [import_times(statement) for _ in range(runs)]
+    median = statistics.median(s["total"] for s in samples)
+    best = min(samples, key=lambda s: s["total"])
+    heaviest = sorted(best["modules"].items(), key=lambda item: -item[1])[:top]
+    return {
+        "time": time.time(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "statement": statement,
+        "runs": runs,
+        "median_ms": median / 1000,
+        "min_ms": best["total"] / 1000,
+        "openai_imported": any(s["openai"] for s in samples),
+        "heaviest": [[name, us / 1000] for name, us in heaviest],
+    }
+
+
+def last_record(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--statement", default="import swarm")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--record", help="append the result to this JSONL file")
+    parser.add_argument("--max-ms", type=float, help="exit non-zero above this median")
+    args = parser.parse_args()
+
+    result = measure(args.statement, args.runs, args.top)
+    print(f"{result['statement']!r}: median {result['median_ms']:.1f} ms, "
+          f"min {result['min_ms']:.1f} ms over {result['runs']} runs "
+          f"(openai imported: {result['openai_imported']})")
+    for name, ms in result["heaviest"]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.record:
+        previous = last_record(args.record)
+        if previous is not None:
+            delta = result["median_ms"] - previous["median_ms"]
+            print(f"change since {previous['commit'] or 'last record'}: {delta:+.1f} ms")
+        with open(args.record, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+    if args.max_ms is not None and result["median_ms"] > args.max_ms:
+        print(f"median above {args.max_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,30 @@
-from .core import Swarm
-from .types import Agent, Response
+from typing import TYPE_CHECKING
 
-__all__ = ["Swarm", "Agent", "Response"]
+if TYPE_CHECKING:
+    from .core import Swarm, AsyncSwarm
+    from .types import Agent, Response
+
+__all__ = ["Swarm", "AsyncSwarm", "Agent", "Response"]
+
+# resolved on first access, so `import swarm` doesn't pay for openai up front
+_EXPORTS = {
+    "Swarm": ".core",
+    "AsyncSwarm": ".core",
+    "Agent": ".types",
+    "Response": ".types",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,216 @@
+import asyncio
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, List
+
+# Package/library imports
+from pydantic import BaseModel
+
+from .cancel import reserve_workers
+from .policy import transient_errors
+
+
+class BatchStats(BaseModel):
+    """
+    Aggregate statistics for a `run_many` batch.
+
+    Latencies are per conversation (including retries), in seconds.
+    """
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    wall_time: float = 0.0
+    throughput: float = 0.0
+    latency_p50: float = 0.0
+    latency_p90: float = 0.0
+    latency_p99: float = 0.0
+    latency_max: float = 0.0
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(stats: BatchStats, latencies: List[float], wall_time: float) -> None:
+    latencies = sorted(latencies)
+    stats.wall_time = wall_time
+    stats.throughput = stats.total / wall_time if wall_time > 0 else 0.0
+    stats.latency_p50 = percentile(latencies, 50)
+    stats.latency_p90 = percentile(latencies, 90)
+    stats.latency_p99 = percentile(latencies, 99)
+    stats.latency_max = latencies[-1] if latencies else 0.0
+
+
+def run_kwargs_for(conversation, agent, shared_kwargs: dict) -> dict:
+    # a conversation is either a list of messages or a dict of run() kwargs,
+    # which may name its own agent
+    if isinstance(conversation, dict):
+        return {"agent": agent, **shared_kwargs, **conversation}
+    return {"agent": agent, **shared_kwargs, "messages": conversation}
+
+
+def backoff_delay(attempt: int, backoff: float) -> float:
+    # exponential backoff with full jitter
+    return random.uniform(0, backoff * 2**attempt)
+
+
+class BatchRun:
+    """
+    Iterates `(index, response)` pairs for a batch of independent conversations,
+    running at most `max_concurrency` of them at a time on one `Swarm` (and
+    therefore one HTTP client). A conversation that still fails after `retries`
+    attempts yields its exception in place of the `Response`.
+
+    `stats` is filled in once iteration finishes.
+    """
+
+    def __init__(
+        self,
+        swarm,
+        agent,
+        conversations: Iterable,
+        max_concurrency: int,
+        ordered: bool,
+        retries: int,
+        backoff: float,
+        run_kwargs: dict,
+    ):
+        self.swarm = swarm
+        self.agent = agent
+        self.conversations = conversations
+        self.max_concurrency = max_concurrency
+        self.ordered = ordered
+        self.retries = retries
+        self.backoff = backoff
+        self.run_kwargs = run_kwargs
+        self.stats = BatchStats()
+        self._latencies = []
+        # bounded requests and tool calls wait in the shared pools
+        reserve_workers(max_concurrency)
+
+    def run_one(self, conversation):
+        kwargs = run_kwargs_for(conversation, self.agent, self.run_kwargs)
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                result = self.swarm.run(**kwargs)
+                break
+            except transient_errors() as e:
+                result = e
+                if attempt == self.retries:
+                    break
+                time.sleep(backoff_delay(attempt, self.backoff))
+            except Exception as e:
+                result = e
+                break
+        return result, time.perf_counter() - start, attempt
+
+    def record(self, result, latency: float, retries: int) -> None:
+        self.stats.total += 1
+        self.stats.retries += retries
+        if isinstance(result, Exception):
+            self.stats.failed += 1
+        else:
+            self.stats.succeeded += 1
+        self._latencies.append(latency)
+
+    def __iter__(self):
+        start = time.perf_counter()
+        conversations = enumerate(self.conversations)
+        in_flight, buffered, next_index = {}, {}, 0
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="swarm-batch"
+        ) as executor:
+
+            def submit_next() -> bool:
+                for index, conversation in conversations:
+                    in_flight[executor.submit(self.run_one, conversation)] = index
+                    return True
+                return False
+
+            while len(in_flight) < self.max_concurrency and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    result, latency, retries = future.result()
+                    self.record(result, latency, retries)
+                    submit_next()
+                    if not self.ordered:
+                        yield index, result
+                        continue
+                    buffered[index] = result
+                    while next_index in buffered:
+                        yield next_index, buffered.pop(next_index)
+                        next_index += 1
+
+        summarize(self.stats, self._latencies, time.perf_counter() - start)
+
+
+class AsyncBatchRun(BatchRun):
+    """The `AsyncSwarm` counterpart of `BatchRun`, iterated with `async for`."""
+
+    async def run_one(self, conversation):
+        kwargs = run_kwargs_for(conversation, self.agent, self.run_kwargs)
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                result = await self.swarm.run(**kwargs)
+                break
+            except transient_errors() as e:
+                result = e
+                if attempt == self.retries:
+                    break
+                await asyncio.sleep(backoff_delay(attempt, self.backoff))
+            except Exception as e:
+                result = e
+                break
+        return result, time.perf_counter() - start, attempt
+
+    def __iter__(self):
+        raise TypeError("AsyncBatchRun must be iterated with 'async for'")
+
+    async def __aiter__(self):
+        start = time.perf_counter()
+        conversations = enumerate(self.conversations)
+        in_flight, buffered, next_index = {}, {}, 0
+
+        def submit_next() -> bool:
+            for index, conversation in conversations:
+                in_flight[asyncio.ensure_future(self.run_one(conversation))] = index
+                return True
+            return False
+
+        while len(in_flight) < self.max_concurrency and submit_next():
+            pass
+
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = in_flight.pop(task)
+                    result, latency, retries = task.result()
+                    self.record(result, latency, retries)
+                    submit_next()
+                    if not self.ordered:
+                        yield index, result
+                        continue
+                    buffered[index] = result
+                    while next_index in buffered:
+                        yield next_index, buffered.pop(next_index)
+                        next_index += 1
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        summarize(self.stats, self._latencies, time.perf_counter() - start)
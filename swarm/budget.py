@@ -0,0 +1,156 @@
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+# Third-party imports
+from pydantic import BaseModel, model_validator
+
+from .cancel import RunCancelled
+from .metrics import TurnMetrics
+
+# USD per million (input, output) tokens; list prices, override with your own
+DEFAULT_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+
+class RunBudget(BaseModel):
+    """
+    Limits for a single run, counted across all of its turns and handoffs.
+    A run stops before the completion that would go over a limit.
+
+    Attributes:
+        max_completions (int): Completion requests, i.e. model turns.
+        max_input_tokens (int): Prompt tokens over all completions.
+        max_output_tokens (int): Completion tokens over all completions.
+        max_cost (float): Estimated cost in USD, priced with `prices`.
+        max_time (float): Wall-clock seconds for the whole run.
+        prices (dict): Model name (or prefix, for dated versions) to USD per
+            million input and output tokens.
+    """
+
+    max_completions: Optional[int] = None
+    max_input_tokens: Optional[int] = None
+    max_output_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    max_time: Optional[float] = None
+    prices: Dict[str, Tuple[float, float]] = DEFAULT_PRICES
+
+    @model_validator(mode="after")
+    def check_prices(self):
+        if self.max_cost is not None and not self.prices:
+            raise ValueError("max_cost needs prices to estimate cost")
+        return self
+
+    def price(self, model: str) -> Optional[Tuple[float, float]]:
+        price = self.prices.get(model)
+        if price is None:
+            # "gpt-4o-2024-08-06" is priced as "gpt-4o"
+            prefixes = [name for name in self.prices if model.startswith(name + "-")]
+            if prefixes:
+                price = self.prices[max(prefixes, key=len)]
+        return price
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int = 0) -> float:
+        price = self.price(model)
+        if price is None:
+            return 0.0
+        return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+
+
+class BudgetUsage(BaseModel):
+    """
+    What a run has spent against its budget.
+
+    Attributes:
+        completions (int): Completion requests made.
+        input_tokens (int): Prompt tokens, from `usage` or estimated.
+        output_tokens (int): Completion tokens, from `usage` or estimated.
+        cost (float): Estimated cost in USD.
+        by_agent (dict): The same counts per agent name.
+    """
+
+    completions: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    by_agent: Dict[str, "BudgetUsage"] = {}
+
+    def add(self, input_tokens: int, output_tokens: int, cost: float) -> None:
+        self.completions += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost += cost
+
+
+class BudgetTracker:
+    """
+    Keeps a run's usage current and stops the run before it overspends.
+    Shared with the run's fan-out branches, which may record concurrently.
+    """
+
+    __slots__ = ("budget", "usage", "_in_flight", "_lock")
+
+    def __init__(self, budget: RunBudget):
+        self.budget = budget
+        self.usage = BudgetUsage()
+        # completions admitted but not yet recorded, so concurrent branches
+        # can't all pass the same check before any of them records
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def admit(self, model: str, prompt_tokens: int) -> None:
+        """
+        Raises `RunCancelled` if a completion with this prompt would go over
+        budget, and `ValueError` if `max_cost` is set and `model` has no price.
+        """
+        with self._lock:
+            self._admit(model, prompt_tokens)
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """Gives back an admitted completion that failed before it was recorded."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def _admit(self, model: str, prompt_tokens: int) -> None:
+        budget, usage = self.budget, self.usage
+        completions = usage.completions + self._in_flight
+        if budget.max_completions is not None and completions >= budget.max_completions:
+            raise RunCancelled("max_completions")
+        if (
+            budget.max_input_tokens is not None
+            and usage.input_tokens + prompt_tokens > budget.max_input_tokens
+        ):
+            raise RunCancelled("max_input_tokens")
+        if budget.max_output_tokens is not None and usage.output_tokens >= budget.max_output_tokens:
+            raise RunCancelled("max_output_tokens")
+        if budget.max_cost is not None:
+            if budget.price(model) is None:
+                # an unpriced model would count as free and never reach the limit
+                raise ValueError(
+                    f"max_cost is set but RunBudget.prices has no price for {model!r}"
+                )
+            if usage.cost + budget.cost(model, prompt_tokens) > budget.max_cost:
+                raise RunCancelled("max_cost")
+
+    def record(self, turn: TurnMetrics) -> None:
+        cost = self.budget.cost(turn.model, turn.prompt_tokens, turn.completion_tokens)
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self.usage.add(turn.prompt_tokens, turn.completion_tokens, cost)
+            agent = self.usage.by_agent.get(turn.agent)
+            if agent is None:
+                agent = self.usage.by_agent[turn.agent] = BudgetUsage()
+            agent.add(turn.prompt_tokens, turn.completion_tokens, cost)
+
+
+def budget_tracker(
+    budget: Union[RunBudget, BudgetTracker, None]
+) -> Optional[BudgetTracker]:
+    # a fan-out branch is handed its parent's tracker, so both count against one budget
+    if budget is None or isinstance(budget, BudgetTracker):
+        return budget
+    return BudgetTracker(budget)
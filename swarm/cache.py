@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .stream import StreamAccumulator
+
+# openai types are imported where they're built, keeping `import swarm` light
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion
+
+
+def cache_key(create_params: dict) -> str:
+    """
+    Canonical hash of a completion request. `stream` is left out so streamed
+    and non-streamed requests share entries.
+    """
+    payload = {k: v for k, v in create_params.items() if k != "stream"}
+    canonical = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+
+class CompletionCache:
+    """
+    Base class for completion caches. Subclasses implement `_get` and `_set`;
+    `get` and `set` keep hit/miss counters.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[ChatCompletion]:
+        completion = self._get(key)
+        if completion is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return completion
+
+    def set(self, key: str, completion: ChatCompletion) -> None:
+        self._set(key, completion)
+
+    def _get(self, key: str) -> Optional[ChatCompletion]:
+        raise NotImplementedError
+
+    def _set(self, key: str, completion: ChatCompletion) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CompletionCache):
+    """In-process LRU cache with optional TTL (in seconds)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[ChatCompletion]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            completion, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                self.stats.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+        # callers annotate returned messages, so hand out copies
+        return completion.model_copy(deep=True)
+
+    def _set(self, key: str, completion: ChatCompletion) -> None:
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (completion.model_copy(deep=True), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CompletionCache):
+    """
+    On-disk cache in a single SQLite file, with TTL and max entry count.
+
+    Hits record their access time in memory and write it back in batches of
+    `touch_batch`, and before any eviction, so reads don't each commit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = 100_000,
+        ttl: Optional[float] = None,
+        touch_batch: int = 100,
+    ):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.touch_batch = touch_batch
+        self._lock = threading.Lock()
+        # key -> access time not yet written
+        self._touched = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE completions SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _get(self, key: str) -> Optional[ChatCompletion]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl is not None and created + self.ttl < now:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                self._touched.pop(key, None)
+                self._count -= 1
+                self.stats.evictions += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched()
+                self._conn.commit()
+        from openai.types.chat import ChatCompletion
+
+        return ChatCompletion.model_validate_json(value)
+
+    def _set(self, key: str, completion: ChatCompletion) -> None:
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)",
+                (key, completion.model_dump_json(), now, now),
+            )
+            self._touched.pop(key, None)
+            if exists is None:
+                self._count += 1
+            if self.max_entries is not None and self._count > self.max_entries:
+                # least recently used first, by the accessed index
+                self._flush_touched()
+                evicted = self._conn.execute(
+                    "DELETE FROM completions WHERE key IN ("
+                    "SELECT key FROM completions ORDER BY accessed LIMIT ?)",
+                    (self._count - self.max_entries,),
+                ).rowcount
+                self._count -= max(evicted, 0)
+                self.stats.evictions += max(evicted, 0)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+class TieredCache(CompletionCache):
+    """An in-memory tier in front of a slower (e.g. on-disk) tier."""
+
+    def __init__(self, memory: CompletionCache, disk: CompletionCache):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def _get(self, key: str) -> Optional[ChatCompletion]:
+        completion = self.memory.get(key)
+        if completion is None:
+            completion = self.disk.get(key)
+            if completion is not None:
+                self.memory.set(key, completion)
+        return completion
+
+    def _set(self, key: str, completion: ChatCompletion) -> None:
+        self.memory.set(key, completion)
+        self.disk.set(key, completion)
+
+
+def completion_chunks(completion: ChatCompletion):
+    """Replays a cached completion as a synthetic chunk sequence."""
+    from openai.types.chat import ChatCompletionChunk
+    from openai.types.chat.chat_completion_chunk import (
+        Choice as ChunkChoice,
+        ChoiceDelta,
+        ChoiceDeltaToolCall,
+        ChoiceDeltaToolCallFunction,
+    )
+
+    choice = completion.choices[0]
+    message = choice.message
+
+    def chunk(delta: ChoiceDelta, finish_reason=None) -> ChatCompletionChunk:
+        return ChatCompletionChunk(
+            id=completion.id,
+            created=completion.created,
+            model=completion.model,
+            object="chat.completion.chunk",
+            choices=[ChunkChoice(delta=delta, index=0, finish_reason=finish_reason)],
+        )
+
+    yield chunk(ChoiceDelta(role="assistant", content=message.content or ""))
+    for index, tool_call in enumerate(message.tool_calls or ()):
+        yield chunk(
+            ChoiceDelta(
+                tool_calls=[
+                    ChoiceDeltaToolCall(
+                        index=index,
+                        id=tool_call.id,
+                        type=tool_call.type,
+                        function=ChoiceDeltaToolCallFunction(
+                            name=tool_call.function.name,
+                            arguments=tool_call.function.arguments,
+                        ),
+                    )
+                ]
+            )
+        )
+    yield chunk(ChoiceDelta(), finish_reason=choice.finish_reason)
+
+
+async def async_completion_chunks(completion: ChatCompletion):
+    for chunk in completion_chunks(completion):
+        yield chunk
+
+
+class StreamRecorder:
+    """Collects a streamed completion so it can be cached once the stream ends."""
+
+    def __init__(self, on_complete: Callable[[ChatCompletion], None]):
+        self.on_complete = on_complete
+        self.accumulator = StreamAccumulator(sender=None)
+        self.first = None
+        self.finish_reason = None
+
+    def add(self, chunk) -> None:
+        if self.first is None:
+            self.first = chunk
+        if chunk.choices:
+            choice = chunk.choices[0]
+            self.accumulator.add(choice.delta)
+            self.finish_reason = choice.finish_reason or self.finish_reason
+
+    def finish(self) -> None:
+        if self.first is None:
+            return
+        from openai.types.chat import ChatCompletion
+        from openai.types.chat.chat_completion import Choice
+
+        from .types import ChatCompletionMessage, ChatCompletionMessageToolCall, Function
+
+        message = self.accumulator.message()
+        tool_calls = [
+            ChatCompletionMessageToolCall(
+                id=tool_call["id"],
+                type=tool_call["type"] or "function",
+                function=Function(**tool_call["function"]),
+            )
+            for tool_call in message["tool_calls"] or ()
+        ]
+        self.on_complete(
+            ChatCompletion(
+                id=self.first.id,
+                created=self.first.created,
+                model=self.first.model,
+                object="chat.completion",
+                choices=[
+                    Choice(
+                        index=0,
+                        finish_reason=self.finish_reason or "stop",
+                        message=ChatCompletionMessage(
+                            role="assistant",
+                            content=message["content"] or None,
+                            tool_calls=tool_calls or None,
+                        ),
+                    )
+                ],
+            )
+        )
+
+
+def record_stream(stream, on_complete: Callable[[ChatCompletion], None]):
+    recorder = StreamRecorder(on_complete)
+    for chunk in stream:
+        recorder.add(chunk)
+        yield chunk
+    recorder.finish()
+
+
+async def async_record_stream(stream, on_complete: Callable[[ChatCompletion], None]):
+    recorder = StreamRecorder(on_complete)
+    async for chunk in stream:
+        recorder.add(chunk)
+        yield chunk
+    recorder.finish()
@@ -0,0 +1,248 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional
+
+# how often a wait wakes up to look at a cancellation token
+POLL_INTERVAL = 0.05
+
+# workers per shared pool until `reserve_workers` asks for more; threads only
+# start as work arrives, so an idle pool costs nothing
+POOL_WORKERS = 64
+
+_shared_pools = []
+
+
+class SharedPool:
+    """
+    A process-wide thread pool, created on first use and grown to the largest
+    concurrency reserved for it.
+
+    Attributes:
+        prefix (str): Thread name prefix.
+        per_run (int): Workers one run may keep busy at once.
+        workers (int): Current pool size.
+    """
+
+    __slots__ = ("prefix", "per_run", "workers", "_executor", "_lock")
+
+    def __init__(self, prefix: str, per_run: int = 1):
+        self.prefix = prefix
+        self.per_run = per_run
+        self.workers = POOL_WORKERS
+        self._executor = None
+        self._lock = threading.Lock()
+        _shared_pools.append(self)
+
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix=self.prefix
+                )
+            return self._executor
+
+    def reserve(self, runs: int) -> None:
+        with self._lock:
+            workers = runs * self.per_run
+            if workers <= self.workers:
+                return
+            self.workers = workers
+            # work already submitted finishes on the old pool, whose threads
+            # exit once nothing references it
+            self._executor = None
+
+
+def reserve_workers(runs: int) -> None:
+    """Grows every shared pool so `runs` concurrent runs never queue on it."""
+    for pool in _shared_pools:
+        pool.reserve(runs)
+
+
+# blocking completion requests of bounded runs wait here, so the run can give up on them
+_requests = SharedPool("swarm-request")
+# tool calls of clients without their own `max_tool_workers` pool
+_tools = SharedPool("swarm-tool")
+
+
+def request_executor() -> ThreadPoolExecutor:
+    return _requests.executor()
+
+
+def shared_tool_executor() -> ThreadPoolExecutor:
+    return _tools.executor()
+
+
+class RunCancelled(Exception):
+    """
+    Raised inside a run when its deadline passes, its token is cancelled or
+    its budget runs out. `run()` catches it and returns the partial `Response`.
+
+    Attributes:
+        reason (str): "deadline", "cancelled" or the `RunBudget` limit reached,
+            e.g. "max_cost".
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class WaitTimeout(TimeoutError):
+    """A bounded wait gave up; the work it waited on was abandoned."""
+
+
+class CancellationToken:
+    """
+    Cancels runs from outside, e.g. from another thread or a request handler.
+    One token may be shared by many runs.
+    """
+
+    __slots__ = ("_event", "reason")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if self.reason is None:
+            self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+
+class RunScope:
+    """
+    A run's deadline, cancellation token and budget. Checked between steps of
+    the run and used to bound every wait on a completion or tool.
+
+    Attributes:
+        deadline (float): `time.monotonic()` value the run must finish by, or None.
+        deadline_reason (str): "deadline", or "max_time" if the budget set it.
+        token (CancellationToken): Token that cancels the run, or None.
+        budget (BudgetTracker): The run's budget usage, or None.
+    """
+
+    __slots__ = ("deadline", "deadline_reason", "token", "budget")
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        token: CancellationToken = None,
+        budget=None,
+    ):
+        self.deadline, self.deadline_reason = None, "deadline"
+        if timeout is not None:
+            self.deadline = time.monotonic() + timeout
+        max_time = budget.budget.max_time if budget is not None else None
+        if max_time is not None and (timeout is None or max_time < timeout):
+            self.deadline, self.deadline_reason = time.monotonic() + max_time, "max_time"
+        self.token = token
+        self.budget = budget
+
+    @property
+    def bounded(self) -> bool:
+        """Whether waits need a bound; a budget alone is checked between steps."""
+        return self.deadline is not None or self.token is not None
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        if self.token is not None and self.token.cancelled:
+            raise RunCancelled(self.token.reason or "cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise RunCancelled(self.deadline_reason)
+
+    def admit(self, model: str, prompt_tokens: int) -> None:
+        if self.budget is not None:
+            self.budget.admit(model, prompt_tokens)
+
+    def release(self) -> None:
+        if self.budget is not None:
+            self.budget.release()
+
+    def record(self, turn) -> None:
+        if self.budget is not None:
+            self.budget.record(turn)
+
+    def bound(self, timeout: Optional[float]) -> Optional[float]:
+        """The smaller of `timeout` and the time left in the run."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def next_wait(self, give_up: Optional[float]) -> Optional[float]:
+        # wake up for whichever comes first: the run's deadline, the caller's
+        # own timeout, or the next look at the token
+        limits = [
+            limit
+            for limit in (
+                self.deadline,
+                give_up,
+                time.monotonic() + POLL_INTERVAL if self.token is not None else None,
+            )
+            if limit is not None
+        ]
+        return max(0.0, min(limits) - time.monotonic()) if limits else None
+
+
+def run_scope(
+    timeout: Optional[float] = None,
+    cancel_token: CancellationToken = None,
+    budget=None,
+) -> Optional[RunScope]:
+    if timeout is None and cancel_token is None and budget is None:
+        return None
+    return RunScope(timeout, cancel_token, budget)
+
+
+def wait_future(
+    future: Future, timeout: Optional[float] = None, scope: RunScope = None
+):
+    """
+    Waits for `future`'s result. Raises `WaitTimeout` after `timeout` seconds
+    and `RunCancelled` as soon as `scope` is cancelled or out of time; either
+    way the work itself is abandoned, not interrupted.
+    """
+    give_up = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        if scope is not None:
+            scope.check()
+            done, _ = wait([future], scope.next_wait(give_up))
+        else:
+            done, _ = wait([future], timeout)
+        if done:
+            return future.result()
+        if give_up is not None and time.monotonic() >= give_up:
+            raise WaitTimeout
+
+
+async def await_bounded(awaitable, timeout: Optional[float] = None, scope: RunScope = None):
+    """`wait_future` for awaitables; the task is cancelled when the wait gives up."""
+    task = asyncio.ensure_future(awaitable)
+    give_up = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            if scope is not None:
+                scope.check()
+                done, _ = await asyncio.wait({task}, timeout=scope.next_wait(give_up))
+            else:
+                done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result()
+            if give_up is not None and time.monotonic() >= give_up:
+                raise WaitTimeout
+    finally:
+        if not task.done():
+            task.cancel()
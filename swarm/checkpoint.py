@@ -0,0 +1,227 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Literal, Optional
+
+# Third-party imports
+from pydantic import BaseModel
+
+from .message import wire_message
+
+
+class Checkpoint(BaseModel):
+    """
+    The state of a run after its latest turn, enough to resume it.
+
+    Attributes:
+        run_id (str): Identifies the run.
+        agent (str): Name of the active agent.
+        messages (List[dict]): The full history, including the run's input messages.
+        init_len (int): Number of input messages, i.e. where the run's output starts.
+        context_variables (dict): Context variables, which must be JSON-serializable.
+        status (str): "running" until the run returns, then "finished".
+        model_override (str): The run's `model_override`.
+        max_turns (int): The run's `max_turns`, or None for no limit.
+        execute_tools (bool): The run's `execute_tools`.
+        updated (float): When the checkpoint was written, as a Unix timestamp.
+    """
+
+    run_id: str
+    agent: str
+    messages: List[dict] = []
+    init_len: int = 0
+    context_variables: dict = {}
+    status: Literal["running", "finished"] = "running"
+    model_override: Optional[str] = None
+    max_turns: Optional[int] = None
+    execute_tools: bool = True
+    updated: float = 0.0
+
+    def pending_tool_calls(self) -> List[dict]:
+        """Tool calls of the last assistant message that have no result yet."""
+        for index in range(len(self.messages) - 1, self.init_len - 1, -1):
+            message = self.messages[index]
+            if message.get("role") != "assistant":
+                continue
+            answered = {
+                m.get("tool_call_id") for m in self.messages[index + 1 :]
+            }
+            return [
+                tool_call
+                for tool_call in message.get("tool_calls") or ()
+                if tool_call["id"] not in answered
+            ]
+        return []
+
+
+class CheckpointStore:
+    """
+    Base class for checkpoint stores. Subclasses implement `save`, `load`,
+    `delete` and `runs`.
+
+    A run's `init_len` and `max_turns` are fixed by its first save, so a resumed
+    run keeps reporting the original output and counting turns against the
+    original limit. Message history is append-only within a
+    run, so stores may persist only the messages they haven't seen yet.
+    """
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        raise NotImplementedError
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        raise NotImplementedError
+
+    def delete(self, run_id: str) -> None:
+        raise NotImplementedError
+
+    def runs(self, status: Optional[str] = None) -> List[str]:
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """In-process store, mostly for tests."""
+
+    def __init__(self):
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        checkpoint = checkpoint.model_copy(deep=True)
+        with self._lock:
+            previous = self._checkpoints.get(checkpoint.run_id)
+            if previous is not None:
+                checkpoint.init_len = previous.init_len
+                checkpoint.max_turns = previous.max_turns
+            self._checkpoints[checkpoint.run_id] = checkpoint
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            checkpoint = self._checkpoints.get(run_id)
+        return checkpoint.model_copy(deep=True) if checkpoint is not None else None
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._checkpoints.pop(run_id, None)
+
+    def runs(self, status: Optional[str] = None) -> List[str]:
+        with self._lock:
+            return [
+                run_id
+                for run_id, checkpoint in self._checkpoints.items()
+                if status is None or checkpoint.status == status
+            ]
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Durable store in a single SQLite file (WAL mode); appends only new messages."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, state TEXT NOT NULL, init_len INTEGER NOT NULL, "
+            "status TEXT NOT NULL, length INTEGER NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "run_id TEXT NOT NULL, position INTEGER NOT NULL, message TEXT NOT NULL, "
+            "PRIMARY KEY (run_id, position))"
+        )
+        self._conn.commit()
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        state = checkpoint.model_dump_json(exclude={"messages", "run_id", "init_len"})
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT length FROM runs WHERE run_id = ?", (checkpoint.run_id,)
+            ).fetchone()
+            stored = row[0] if row is not None else 0
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?)",
+                [
+                    (checkpoint.run_id, position, json.dumps(wire_message(message)))
+                    for position, message in enumerate(
+                        checkpoint.messages[stored:], start=stored
+                    )
+                ],
+            )
+            self._conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (run_id) DO "
+                "UPDATE SET state = json_set(excluded.state, '$.max_turns', "
+                "json_extract(runs.state, '$.max_turns')), status = excluded.status, "
+                "length = excluded.length, updated = excluded.updated",
+                (
+                    checkpoint.run_id,
+                    state,
+                    checkpoint.init_len,
+                    checkpoint.status,
+                    len(checkpoint.messages),
+                    checkpoint.updated,
+                ),
+            )
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, init_len, length FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            state, init_len, length = row
+            messages = self._conn.execute(
+                "SELECT message FROM messages WHERE run_id = ? AND position < ? "
+                "ORDER BY position",
+                (run_id, length),
+            ).fetchall()
+        return Checkpoint(
+            run_id=run_id,
+            init_len=init_len,
+            messages=[json.loads(message) for (message,) in messages],
+            **json.loads(state),
+        )
+
+    def delete(self, run_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def runs(self, status: Optional[str] = None) -> List[str]:
+        query, params = "SELECT run_id FROM runs", ()
+        if status is not None:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._lock:
+            return [run_id for (run_id,) in self._conn.execute(query, params)]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def make_checkpoint(
+    run_id: str,
+    agent,
+    history,
+    context_variables: dict,
+    init_len: int,
+    model_override: Optional[str],
+    max_turns,
+    execute_tools: bool,
+    status: str = "running",
+) -> Checkpoint:
+    # model_construct skips re-validating a history that only ever grows
+    return Checkpoint.model_construct(
+        run_id=run_id,
+        agent=agent.name,
+        messages=list(history),
+        init_len=init_len,
+        context_variables=context_variables,
+        status=status,
+        model_override=model_override,
+        max_turns=None if max_turns == float("inf") else int(max_turns),
+        execute_tools=execute_tools,
+        updated=time.time(),
+    )
@@ -1,35 +1,671 @@
+from __future__ import annotations
+
 # Standard library imports
+import asyncio
 import copy
+import inspect
 import json
+import time
+import uuid
+import weakref
 from collections import defaultdict
-from typing import List, Callable, Union
-
-# Package/library imports
-from openai import OpenAI
-
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Iterable, List, Callable, Optional, Union
 
 # Local imports
-from .util import function_to_json, debug_print, merge_chunk
-from .types import (
-    Agent,
-    AgentFunction,
-    ChatCompletionMessage,
-    ChatCompletionMessageToolCall,
-    Function,
-    Response,
-    Result,
+from .batch import AsyncBatchRun, BatchRun
+from .budget import BudgetTracker, RunBudget, budget_tracker
+from .cancel import (
+    CancellationToken,
+    RunCancelled,
+    RunScope,
+    WaitTimeout,
+    await_bounded,
+    request_executor,
+    run_scope,
+    shared_tool_executor,
+    wait_future,
+)
+from .checkpoint import Checkpoint, CheckpointStore, make_checkpoint
+from .cache import (
+    CompletionCache,
+    async_completion_chunks,
+    async_record_stream,
+    cache_key,
+    completion_chunks,
+    record_stream,
 )
+from .message import Message, wire_messages
+from .metrics import RunMetrics, TurnMetrics
+from .fanout import FanOut, task_context
+from .graph import AgentGraph, compile_graph
+from .history import ContextVariables, History
+from .instructions import render_instructions
+from .tools import __CTX_VARS_NAME__, ToolManifest, compile_tools
+from .stream import StreamAccumulator, ToolCall, delta_event
+from .tracing import RunTrace, TraceHook, start_trace
+from .policy import (
+    CompletionPolicy,
+    acall_with_policy,
+    aclose_stream,
+    call_with_policy,
+    close_stream,
+    single_attempt_client,
+)
+from .routing import ModelRouter
+from .ratelimit import RateLimiter, shared_rate_limiter
+from .transport import shared_clients
+from .util import debug_print, estimate_tokens
+from .types import Agent, AgentFunction, Response, Result
+
+if TYPE_CHECKING:
+    from .types import ChatCompletionMessage, ChatCompletionMessageToolCall
+
+
+def missing_tool_message(tool_call: ChatCompletionMessageToolCall) -> Message:
+    name = tool_call.function.name
+    return Message.tool(tool_call.id, name, f"Error: Tool {name} not found.")
+
+
+def timed_out_tool_message(
+    tool_call: ChatCompletionMessageToolCall, timeout: float
+) -> Message:
+    name = tool_call.function.name
+    return Message.tool(
+        tool_call.id, name, f"Error: Tool {name} timed out after {timeout:g}s."
+    )
+
+
+def stopped_tool_message(
+    tool_call: ChatCompletionMessageToolCall, reason: str
+) -> Message:
+    name = tool_call.function.name
+    return Message.tool(
+        tool_call.id, name, f"Error: Tool {name} did not finish, the run stopped ({reason})."
+    )
+
+
+# stands in for the result of a tool call the run stopped waiting for
+TIMED_OUT = object()
+
+
+def time_left(started: float, timeout: Optional[float]) -> Optional[float]:
+    if timeout is None:
+        return None
+    return max(0.0, started + timeout - time.monotonic())
+
+
+def discard_stream(future) -> None:
+    # an abandoned streaming request still holds a connection
+    if not future.cancelled() and future.exception() is None:
+        close_stream(future.result()[0])
+
+
+def branch_limits(scope: Optional[RunScope]) -> tuple:
+    # fan-out branches stop with their parent run and spend from its budget
+    if scope is None:
+        return None, None, None
+    return scope.remaining(), scope.token, scope.budget
+
+
+def estimate_prompt_tokens(create_params: dict, tool_tokens: int) -> int:
+    messages = sum(estimate_tokens(m) for m in create_params["messages"])
+    return messages + tool_tokens
+
+
+async def gather_all(awaitables: List) -> List:
+    return await asyncio.gather(*awaitables)
+
+
+def tool_call_object(call: ToolCall) -> ChatCompletionMessageToolCall:
+    from .types import ChatCompletionMessageToolCall, Function
+
+    return ChatCompletionMessageToolCall(
+        id=call.id,
+        function=Function(arguments=call.arguments, name=call.name),
+        type=call.type or "function",
+    )
+
+
+def tool_call_objects(tool_calls: List[dict]) -> List[ChatCompletionMessageToolCall]:
+    from .types import ChatCompletionMessageToolCall, Function
+
+    return [
+        ChatCompletionMessageToolCall(
+            id=tool_call["id"],
+            function=Function(
+                arguments=tool_call["function"]["arguments"],
+                name=tool_call["function"]["name"],
+            ),
+            type=tool_call["type"],
+        )
+        for tool_call in tool_calls
+    ]
+
+
+class ToolProgress:
+    """
+    Collects a turn's tool results as they come in, so a run stopped midway
+    can still answer every tool call the model made, and hands each one to
+    `save` so a checkpointed run can be resumed from the last result.
+    """
+
+    __slots__ = ("tool_calls", "save", "partial_response")
+
+    def __init__(
+        self,
+        tool_calls: List[dict],
+        save: Optional[Callable[[Response], None]] = None,
+    ):
+        self.tool_calls = tool_call_objects(tool_calls)
+        self.save = save
+        self.partial_response = Response(messages=[], agent=None, context_variables={})
+
+    def __call__(self, partial_response: Response) -> None:
+        self.partial_response = partial_response
+        if self.save is not None:
+            self.save(partial_response)
+
+    def stopped(self, reason: str) -> Response:
+        """The results so far, and an error result for each call left unanswered."""
+        partial_response = self.partial_response
+        # results are merged in call order, one message per call
+        unanswered = self.tool_calls[len(partial_response.messages) :]
+        return Response(
+            messages=[
+                *partial_response.messages,
+                *(stopped_tool_message(tool_call, reason) for tool_call in unanswered),
+            ],
+            agent=partial_response.agent,
+            context_variables=partial_response.context_variables,
+        )
+
+
+def run_finished(checkpoint: Checkpoint) -> bool:
+    if checkpoint.status == "finished":
+        return True
+    output = checkpoint.messages[checkpoint.init_len :]
+    if checkpoint.max_turns is not None and len(output) >= checkpoint.max_turns:
+        return True
+    # the last turn ended without tools, but the run died before its final save
+    last = output[-1] if output else {}
+    return last.get("role") == "assistant" and (
+        not last.get("tool_calls") or not checkpoint.execute_tools
+    )
+
+
+class RunState:
+    """
+    The bookkeeping of one run, shared by the sync and async loops: history,
+    context variables and active agent, metrics, tracing, checkpoints and
+    limits. The loops only request completions and run tools.
+
+    Attributes:
+        agent (Agent): The active agent.
+        context_variables (ContextVariables): The run's context variables.
+        history (History): Input messages followed by the run's own.
+        init_len (int): Number of input messages.
+        metrics (RunMetrics): Per-turn timings and token counts.
+        run_id (str): Identifies the run in traces and checkpoints.
+        trace (RunTrace): Emits the run's events, or None without hooks.
+        save (callable): Writes a checkpoint, or None without a store.
+        tracker (BudgetTracker): The run's budget usage, or None.
+        scope (RunScope): The run's deadline, token and budget, or None.
+        termination_reason (str): Why the run stopped early, if it did.
+        progress (ToolProgress): The tool calls being run, if any.
+    """
+
+    __slots__ = (
+        "agent",
+        "context_variables",
+        "history",
+        "init_len",
+        "metrics",
+        "run_id",
+        "trace",
+        "save",
+        "tracker",
+        "scope",
+        "termination_reason",
+        "progress",
+        "debug",
+        "model_override",
+        "_run_start",
+        "_tool_start",
+    )
+
+    def __init__(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict,
+        model_override: Optional[str],
+        debug: bool,
+        run_id: Optional[str],
+        trace: Optional[RunTrace],
+        save: Optional[Callable],
+        tracker: Optional[BudgetTracker],
+        scope: Optional[RunScope],
+    ):
+        self.agent = agent
+        self.context_variables = ContextVariables(context_variables)
+        self.history = History(messages)
+        self.init_len = len(messages)
+        self.metrics = RunMetrics()
+        self.run_id = run_id
+        self.trace = trace
+        self.save = save
+        self.tracker = tracker
+        self.scope = scope
+        self.termination_reason = None
+        self.progress = None
+        self.debug = debug
+        self.model_override = model_override
+        self._run_start = time.perf_counter()
+        self._tool_start = None
+
+    def turns_left(self, max_turns) -> bool:
+        return len(self.history) - self.init_len < max_turns
+
+    def checkpoint(self, status: str = "running") -> None:
+        if self.save is not None:
+            self.save(
+                self.agent,
+                self.history,
+                # the raw values: saving serializes or copies them anyway
+                self.context_variables.to_dict(),
+                status=status,
+            )
+
+    def start_turn(self) -> TurnMetrics:
+        if self.scope is not None:
+            self.scope.check()
+        turn = TurnMetrics(agent=self.agent.name)
+        self.metrics.turns.append(turn)
+        if self.trace is not None:
+            self.trace.emit(
+                "completion_request",
+                agent=self.agent.name,
+                model=self.model_override or self.agent.model,
+            )
+        return turn
+
+    def add_completion(self, message: Message, turn: TurnMetrics, usage) -> None:
+        debug_print(self.debug, "Received completion:", message)
+        self.history = self.history.append(message)
+        self.checkpoint()
+        turn.record_usage(usage, message)
+        if self.scope is not None:
+            self.scope.record(turn)
+        if self.trace is not None:
+            self.trace.emit(
+                "completion_response",
+                duration=turn.model_time,
+                **turn.model_dump(),
+            )
+
+    def start_tools(self) -> ToolProgress:
+        """Tracks the last completion's tool calls, checkpointing each result."""
+        self._tool_start = time.perf_counter()
+        save = None
+        if self.save is not None:
+            agent, history = self.agent, self.history
+            context_variables = self.context_variables
+
+            def save(partial_response: Response) -> None:
+                # resuming then re-runs only the calls without a result
+                self.save(
+                    partial_response.agent or agent,
+                    history.extend(partial_response.messages),
+                    {
+                        **context_variables.to_dict(),
+                        **partial_response.context_variables,
+                    },
+                )
+
+        self.progress = ToolProgress(self.history[-1]["tool_calls"], save)
+        return self.progress
+
+    def add_tool_results(self, partial_response: Response, turn: TurnMetrics) -> None:
+        turn.tool_time = time.perf_counter() - self._tool_start
+        self.progress = None
+        self.history = self.history.extend(partial_response.messages)
+        self.context_variables.update(partial_response.context_variables)
+        if partial_response.agent:
+            if self.trace is not None:
+                self.trace.emit(
+                    "handoff",
+                    source=self.agent.name,
+                    target=partial_response.agent.name,
+                )
+            self.agent = partial_response.agent
+        self.checkpoint()
+
+    def stop(self, reason: str) -> None:
+        self.termination_reason = reason
+        debug_print(self.debug, f"Run stopped: {reason}.")
+        if self.progress is not None:
+            # the API rejects a history with unanswered tool calls
+            stopped = self.progress.stopped(reason)
+            self.progress = None
+            self.history = self.history.extend(stopped.messages)
+            self.context_variables.update(stopped.context_variables)
+            self.agent = stopped.agent or self.agent
+
+    def fail(self, error: Exception) -> None:
+        if self.trace is not None:
+            self.trace.emit("error", agent=self.agent.name, error=repr(error))
+
+    def finish(self) -> Response:
+        self.metrics.finish(time.perf_counter() - self._run_start)
+        # an interrupted run stays resumable
+        if self.termination_reason in (None, "max_turns"):
+            self.checkpoint(status="finished")
+        if self.trace is not None:
+            self.trace.emit(
+                "run_end",
+                agent=self.agent.name,
+                termination_reason=self.termination_reason,
+                **self.metrics.model_dump(exclude={"turns"}),
+            )
+        return Response(
+            # the run keeps compact `Message`s; callers get plain dicts
+            messages=wire_messages(self.history[self.init_len :]),
+            agent=self.agent,
+            context_variables=self.context_variables.to_dict(),
+            metrics=self.metrics,
+            run_id=self.run_id,
+            termination_reason=self.termination_reason,
+            usage=self.tracker.usage if self.tracker is not None else None,
+        )
+
 
-__CTX_VARS_NAME__ = "context_variables"
+def last_sender(checkpoint: Checkpoint) -> Optional[str]:
+    for message in reversed(checkpoint.messages[checkpoint.init_len :]):
+        if message.get("role") == "assistant":
+            return message.get("sender")
+    return None
+
+
+def prepend_messages(events, messages: List[dict]):
+    for event in events:
+        if "response" in event:
+            event["response"].messages = messages + event["response"].messages
+        yield event
+
+
+async def single_event(event: dict):
+    yield event
+
+
+async def aprepend_messages(events, messages: List[dict]):
+    async for event in events:
+        if "response" in event:
+            event["response"].messages = messages + event["response"].messages
+        yield event
 
 
 class Swarm:
-    def __init__(self, client=None):
+    def __init__(
+        self,
+        client=None,
+        max_tool_workers: int = None,
+        cache: CompletionCache = None,
+        hooks: List[TraceHook] = None,
+        rate_limiter: RateLimiter = None,
+        policy: CompletionPolicy = None,
+        checkpoint_store: CheckpointStore = None,
+        early_tool_execution: bool = False,
+    ):
         if not client:
-            client = OpenAI()
+            # reuse the process-wide keep-alive pool
+            client = shared_clients().client()
         self.client = client
+        # streamed turns start each tool call as soon as its arguments are complete
+        self.early_tool_execution = early_tool_execution
+        # records each turn so an interrupted run can be resumed
+        self.checkpoint_store = checkpoint_store
+        # retry/timeout/hedging for completions, unless the agent sets its own
+        self.policy = policy
+        # falls back to the process-wide limiter, if one is configured
+        self.rate_limiter = rate_limiter
+        # tracing hooks, called with one event dict each
+        self.hooks = list(hooks or [])
+        # optional completion cache, keyed on the canonical request
+        self.cache = cache
+        # opt-in concurrent dispatch of parallel tool calls
+        self.max_tool_workers = max_tool_workers
+        self._tool_executor = None
+        # set by compile(); its agents skip building tool manifests on handoff
+        self.graph: Optional[AgentGraph] = None
 
-    def get_chat_completion(
+    def compile(
+        self,
+        entry_agent: Agent,
+        agents=None,
+        context_variables: Optional[dict] = None,
+    ) -> AgentGraph:
+        """
+        Discovers the agents `entry_agent` can hand off to, builds and checks
+        all of their tool manifests, and keeps the graph for later runs. See
+        `compile_graph` for `agents` and `context_variables`.
+        """
+        self.graph = compile_graph(entry_agent, agents, context_variables)
+        return self.graph
+
+    def tool_manifest(self, functions: List[AgentFunction]) -> ToolManifest:
+        if self.graph is not None:
+            manifest = self.graph.manifest(functions)
+            if manifest is not None:
+                return manifest
+        return compile_tools(functions)
+
+    def add_hook(self, hook: TraceHook) -> None:
+        self.hooks.append(hook)
+
+    def tool_executor(self) -> ThreadPoolExecutor:
+        if not self.max_tool_workers:
+            # bounded and early tool calls share one process-wide pool
+            return shared_tool_executor()
+        if self._tool_executor is None:
+            self._tool_executor = ThreadPoolExecutor(
+                max_workers=self.max_tool_workers, thread_name_prefix="swarm-tool"
+            )
+            # the threads go with the client, even if close() is never called
+            weakref.finalize(self, self._tool_executor.shutdown, wait=False)
+        return self._tool_executor
+
+    def close(self) -> None:
+        """Shuts down the client's own tool pool, if `max_tool_workers` gave it one."""
+        if self._tool_executor is not None:
+            self._tool_executor.shutdown(wait=False)
+            self._tool_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def branch_client(self) -> "Swarm":
+        """This client without its checkpoint store, for fan-out branch runs."""
+        if self.checkpoint_store is None:
+            return self
+        # branches are resumed with their parent's turn, never on their own,
+        # so their checkpoints would only pile up in the store
+        branch = copy.copy(self)
+        branch.checkpoint_store = None
+        branch.tool_executor = self.tool_executor
+        return branch
+
+    def dispatch_concurrently(self, tool_calls: List, concurrent: bool) -> bool:
+        return bool(concurrent and self.max_tool_workers and len(tool_calls) > 1)
+
+    def checkpointer(
+        self,
+        run_id: str,
+        init_len: int,
+        model_override: str,
+        max_turns: int,
+        execute_tools: bool,
+    ) -> Callable:
+        if self.checkpoint_store is None:
+            return None
+
+        def save(agent: Agent, history, context_variables, status="running"):
+            self.checkpoint_store.save(
+                make_checkpoint(
+                    run_id,
+                    agent,
+                    history,
+                    dict(context_variables),
+                    init_len,
+                    model_override,
+                    max_turns,
+                    execute_tools,
+                    status,
+                )
+            )
+
+        return save
+
+    def start_run(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict,
+        model_override: str,
+        debug: bool,
+        max_turns: int,
+        execute_tools: bool,
+        run_id: str,
+        timeout: float,
+        cancel_token: CancellationToken,
+        budget: RunBudget,
+        stream: bool,
+    ) -> RunState:
+        if run_id is None and self.checkpoint_store is not None:
+            run_id = uuid.uuid4().hex
+        trace = start_trace(
+            self.hooks,
+            run_id=run_id,
+            agent=agent.name,
+            messages=len(messages),
+            stream=stream,
+        )
+        run_id = trace.run_id if trace is not None else run_id
+        save = self.checkpointer(
+            run_id, len(messages), model_override, max_turns, execute_tools
+        )
+        tracker = budget_tracker(budget)
+        return RunState(
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            run_id,
+            trace,
+            save,
+            tracker,
+            run_scope(timeout, cancel_token, tracker),
+        )
+
+    def load_checkpoint(self, run_id: str, agents) -> tuple:
+        if self.checkpoint_store is None:
+            raise ValueError("Resuming a run needs a Swarm with a checkpoint_store")
+        checkpoint = self.checkpoint_store.load(run_id)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint for run {run_id!r}")
+        if isinstance(agents, AgentGraph):
+            agents = agents.agents
+        elif not isinstance(agents, dict):
+            agents = {agent.name: agent for agent in agents}
+        agent = agents.get(checkpoint.agent)
+        if agent is None:
+            raise ValueError(
+                f"Run {run_id!r} stopped in agent {checkpoint.agent!r}, "
+                "which is not among the given agents"
+            )
+        # pending tool calls run with the agent that made them, even if a call
+        # answered before the run stopped handed off to another one
+        caller = agents.get(last_sender(checkpoint), agent)
+        return checkpoint, agent, caller
+
+    def resumed_tool_progress(
+        self,
+        checkpoint: Checkpoint,
+        pending: List[dict],
+        agent: Agent,
+        context_variables: ContextVariables,
+    ) -> ToolProgress:
+        def save_result(partial_response: Response) -> None:
+            self.checkpoint_store.save(
+                checkpoint.model_copy(
+                    update={
+                        "messages": [*checkpoint.messages, *partial_response.messages],
+                        "context_variables": {
+                            **context_variables.to_dict(),
+                            **partial_response.context_variables,
+                        },
+                        "agent": (partial_response.agent or agent).name,
+                        "updated": time.time(),
+                    }
+                )
+            )
+
+        return ToolProgress(pending, save_result)
+
+    def stopped_resumed(
+        self,
+        checkpoint: Checkpoint,
+        agent: Agent,
+        context_variables: ContextVariables,
+        stopped: Response,
+        reason: str,
+    ) -> Response:
+        # the checkpoint keeps only real results, so the run stays resumable
+        return Response(
+            messages=wire_messages(
+                [*checkpoint.messages[checkpoint.init_len :], *stopped.messages]
+            ),
+            agent=stopped.agent or agent,
+            context_variables={
+                **context_variables.to_dict(),
+                **stopped.context_variables,
+            },
+            run_id=checkpoint.run_id,
+            termination_reason=reason,
+        )
+
+    def record_resumed_tools(
+        self,
+        checkpoint: Checkpoint,
+        agent: Agent,
+        context_variables: ContextVariables,
+        partial_response: Response,
+    ) -> Agent:
+        context_variables.update(partial_response.context_variables)
+        agent = partial_response.agent or agent
+        checkpoint.messages.extend(partial_response.messages)
+        checkpoint.context_variables = context_variables.to_dict()
+        checkpoint.agent = agent.name
+        checkpoint.updated = time.time()
+        self.checkpoint_store.save(checkpoint)
+        return agent
+
+    def finish_resumed(self, checkpoint: Checkpoint, agent: Agent) -> Response:
+        checkpoint.status = "finished"
+        self.checkpoint_store.save(checkpoint)
+        return Response(
+            messages=wire_messages(checkpoint.messages[checkpoint.init_len :]),
+            agent=agent,
+            context_variables=checkpoint.context_variables,
+            run_id=checkpoint.run_id,
+        )
+
+    def build_completion_params(
         self,
         agent: Agent,
         history: List,
@@ -37,23 +673,32 @@ class Swarm:
         model_override: str,
         stream: bool,
         debug: bool,
-    ) -> ChatCompletionMessage:
-        context_variables = defaultdict(str, context_variables)
-        instructions = (
-            agent.instructions(context_variables)
-            if callable(agent.instructions)
-            else agent.instructions
-        )
-        messages = [{"role": "system", "content": instructions}] + history
+        turn: TurnMetrics = None,
+    ) -> tuple:
+        """The request's create() kwargs, and the estimated tokens of the tools it sends."""
+        instructions = agent.instructions
+        if callable(instructions) and agent.memoize_instructions:
+            # re-rendered only when the context variables it reads change
+            instructions = render_instructions(instructions, context_variables)
+        elif callable(instructions):
+            instructions = instructions(defaultdict(str, context_variables))
+        system_message = {"role": "system", "content": instructions}
+        if agent.context_window is not None:
+            history = agent.context_window.fit(system_message, list(history))
+        # compact messages become wire dicts only here, per request
+        messages = [system_message, *wire_messages(history)]
         debug_print(debug, "Getting chat completion for...:", messages)
 
-        tools = [function_to_json(f) for f in agent.functions]
-        # hide context_variables from model
-        for tool in tools:
-            params = tool["function"]["parameters"]
-            params["properties"].pop(__CTX_VARS_NAME__, None)
-            if __CTX_VARS_NAME__ in params["required"]:
-                params["required"].remove(__CTX_VARS_NAME__)
+        manifest = self.tool_manifest(agent.functions)
+        tools, tool_tokens = manifest.tools, manifest.tokens
+        if agent.tool_selector is not None and tools:
+            # only the tools relevant to the end of the conversation
+            selection = agent.tool_selector.select(manifest, messages)
+            tools, tool_tokens = selection.tools, selection.tokens
+            debug_print(debug, "Selected tools:", selection.names)
+            if turn is not None:
+                turn.tool_selection_time = selection.time
+                turn.tool_tokens_saved = selection.tokens_saved
 
         create_params = {
             "model": model_override or agent.model,
@@ -66,7 +711,198 @@ class Swarm:
         if tools:
             create_params["parallel_tool_calls"] = agent.parallel_tool_calls
 
-        return self.client.chat.completions.create(**create_params)
+        return create_params, tool_tokens
+
+    def prepare_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+        turn: TurnMetrics = None,
+    ) -> tuple:
+        """The request's params, its estimated prompt tokens and what sends it."""
+        start = time.perf_counter()
+        create_params, tool_tokens = self.build_completion_params(
+            agent, history, context_variables, model_override, stream, debug, turn
+        )
+        prompt_tokens = estimate_prompt_tokens(create_params, tool_tokens)
+        if turn is not None:
+            turn.model = create_params["model"]
+            turn.prompt_tokens = prompt_tokens
+            turn.build_time = time.perf_counter() - start
+
+        # an explicit model_override pins the model for the whole run
+        router = agent.models if not model_override else None
+        create = (
+            partial(self.create_routed_completion, router)
+            if router is not None
+            else self.create_completion
+        )
+        return create_params, prompt_tokens, create
+
+    def get_chat_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+        turn: TurnMetrics = None,
+        scope: RunScope = None,
+    ) -> ChatCompletionMessage:
+        create_params, prompt_tokens, create = self.prepare_completion(
+            agent, history, context_variables, model_override, stream, debug, turn
+        )
+        sent = time.perf_counter()
+        completion = create(
+            create_params,
+            debug,
+            prompt_tokens=prompt_tokens,
+            turn=turn,
+            policy=agent.policy or self.policy,
+            scope=scope,
+        )
+        if turn is not None:
+            turn.model_time = time.perf_counter() - sent - turn.queue_time
+        return completion
+
+    def create_routed_completion(
+        self,
+        router: ModelRouter,
+        create_params: dict,
+        debug: bool,
+        prompt_tokens: int = 0,
+        turn: TurnMetrics = None,
+        policy: CompletionPolicy = None,
+        scope: RunScope = None,
+    ):
+        candidates = router.candidates()
+        for index, model in enumerate(candidates):
+            if turn is not None:
+                turn.model = model
+            start = time.perf_counter()
+            try:
+                completion = self.create_completion(
+                    {**create_params, "model": model},
+                    debug,
+                    prompt_tokens=prompt_tokens,
+                    turn=turn,
+                    policy=policy,
+                    scope=scope,
+                )
+            except router.failover_errors():
+                router.record(model, time.perf_counter() - start, ok=False)
+                if index == len(candidates) - 1:
+                    raise
+                router.record_failover(model)
+                debug_print(
+                    debug, f"{model} failed, failing over to {candidates[index + 1]}"
+                )
+                continue
+            router.record(model, time.perf_counter() - start)
+            return completion
+
+    def request_setup(self, policy: CompletionPolicy, scope: RunScope) -> tuple:
+        """The rate limiter, client and extra kwargs for one completion request."""
+        # client-side backpressure, shared across Swarm instances by default
+        limiter = self.rate_limiter or shared_rate_limiter()
+        request_kwargs = policy.request_kwargs() if policy is not None else {}
+        client = self.client if policy is None else single_attempt_client(self.client)
+        if scope is not None:
+            scope.check()
+            if scope.deadline is not None:
+                # no attempt may outlive the run
+                request_kwargs = {
+                    **request_kwargs,
+                    "timeout": scope.bound(request_kwargs.get("timeout")),
+                }
+        return limiter, client, request_kwargs
+
+    def record_request(
+        self,
+        create_params: dict,
+        prompt_tokens: int,
+        completion,
+        outcome,
+        limiter: Optional[RateLimiter],
+        turn: TurnMetrics = None,
+    ) -> None:
+        if outcome is not None and turn is not None:
+            turn.attempts, turn.hedged = outcome.attempts, outcome.hedged
+        usage = getattr(completion, "usage", None)
+        if limiter is not None and not create_params["stream"] and usage:
+            limiter.settle(create_params["model"], prompt_tokens, usage.total_tokens)
+
+    def create_completion(
+        self,
+        create_params: dict,
+        debug: bool,
+        prompt_tokens: int = 0,
+        turn: TurnMetrics = None,
+        policy: CompletionPolicy = None,
+        scope: RunScope = None,
+    ):
+        stream = create_params["stream"]
+        if scope is not None:
+            # stop before a request that would go over the run's budget,
+            # priced as the model actually requested
+            scope.admit(create_params["model"], prompt_tokens)
+        if self.cache is not None:
+            key = cache_key(create_params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                debug_print(debug, "Completion cache hit:", key)
+                return completion_chunks(cached) if stream else cached
+
+        limiter, client, request_kwargs = self.request_setup(policy, scope)
+
+        def send():
+            if limiter is not None:
+                waited = limiter.acquire(create_params["model"], prompt_tokens)
+                if turn is not None:
+                    turn.queue_time += waited
+            return client.chat.completions.create(**create_params, **request_kwargs)
+
+        def request():
+            if policy is None:
+                return send(), None
+            return call_with_policy(policy, send, create_params["model"], stream)
+
+        if scope is None:
+            completion, outcome = request()
+        elif not scope.bounded:
+            # a budget alone has nothing to interrupt the request for
+            try:
+                completion, outcome = request()
+            except BaseException:
+                scope.release()
+                raise
+        else:
+            # a blocking request can't be interrupted, so wait for it where the
+            # run can give up on it
+            future = request_executor().submit(request)
+            try:
+                completion, outcome = wait_future(future, scope=scope)
+            except BaseException as e:
+                # a failed request never records, so give its admission back
+                scope.release()
+                if isinstance(e, RunCancelled):
+                    future.add_done_callback(discard_stream)
+                raise
+        self.record_request(
+            create_params, prompt_tokens, completion, outcome, limiter, turn
+        )
+
+        if self.cache is None:
+            return completion
+        if stream:
+            return record_stream(completion, partial(self.cache.set, key))
+        self.cache.set(key, completion)
+        return completion
 
     def handle_function_result(self, result, debug) -> Result:
         match result:
@@ -86,54 +922,417 @@ class Swarm:
                     debug_print(debug, error_message)
                     raise TypeError(error_message)
 
+    def tool_result(
+        self,
+        raw_result,
+        context_variables: dict,
+        debug: bool,
+        trace: RunTrace = None,
+        scope: RunScope = None,
+    ) -> Result:
+        if isinstance(raw_result, FanOut):
+            raw_result = self.run_fan_out(
+                raw_result, context_variables, debug, trace, scope
+            )
+        return self.handle_function_result(raw_result, debug)
+
+    def run_fan_out(
+        self,
+        fan_out: FanOut,
+        context_variables: dict,
+        debug: bool,
+        trace: RunTrace = None,
+        scope: RunScope = None,
+    ):
+        """Runs each of `fan_out`'s tasks as its own run, concurrently, then reduces them."""
+        tasks = fan_out.tasks
+        timeout, cancel_token, budget = branch_limits(scope)
+        debug_print(debug, f"Fanning out to {len(tasks)} agents.")
+        if trace is not None:
+            trace.emit("fan_out_start", agents=[task.agent.name for task in tasks])
+        start = time.perf_counter()
+        client = self.branch_client()
+        # a pool per fan-out, so branches that fan out again can't starve each other
+        with ThreadPoolExecutor(
+            max_workers=max(1, fan_out.max_concurrency or len(tasks)),
+            thread_name_prefix="swarm-fanout",
+        ) as executor:
+            futures = [
+                executor.submit(
+                    client.run,
+                    agent=task.agent,
+                    messages=task.messages,
+                    context_variables=task_context(context_variables, task),
+                    debug=debug,
+                    max_turns=task.max_turns,
+                    timeout=timeout,
+                    cancel_token=cancel_token,
+                    budget=budget,
+                )
+                for task in tasks
+            ]
+            responses = [future.result() for future in futures]
+        if trace is not None:
+            trace.emit(
+                "fan_out_end",
+                agents=[task.agent.name for task in tasks],
+                duration=time.perf_counter() - start,
+            )
+        return fan_out.reduce(context_variables, responses)
+
+    def resolve_tool_call(
+        self,
+        tool_call: ChatCompletionMessageToolCall,
+        manifest: ToolManifest,
+        context_variables: dict,
+        debug: bool,
+        arguments: Optional[dict] = None,
+    ):
+        name = tool_call.function.name
+        # handle missing tool case, caller skips to next tool
+        func = manifest.function_map.get(name)
+        if func is None:
+            debug_print(debug, f"Tool {name} not found in function map.")
+            return None, None
+        # streamed turns hand over arguments already parsed while they arrived
+        args = json.loads(tool_call.function.arguments) if arguments is None else arguments
+        debug_print(
+            debug, f"Processing tool call: {name} with arguments {args}")
+
+        # pass context_variables to agent functions
+        if name in manifest.context_functions:
+            args[__CTX_VARS_NAME__] = context_variables
+        return func, args
+
+    def merge_tool_result(
+        self,
+        partial_response: Response,
+        tool_call: ChatCompletionMessageToolCall,
+        result: Union[Result, Message],
+        on_result: Optional[Callable[[Response], None]] = None,
+    ) -> None:
+        if isinstance(result, Message):
+            # an error message in place of the function's result
+            partial_response.messages.append(result)
+        else:
+            partial_response.messages.append(
+                Message.tool(tool_call.id, tool_call.function.name, result.value)
+            )
+            partial_response.context_variables.update(result.context_variables)
+            if result.agent:
+                partial_response.agent = result.agent
+        if on_result is not None:
+            on_result(partial_response)
+
+    def call_tool(
+        self,
+        func: AgentFunction,
+        args: dict,
+        tool_call: ChatCompletionMessageToolCall,
+        trace: RunTrace = None,
+    ):
+        if trace is None:
+            return func(**args)
+        name = tool_call.function.name
+        trace.emit("tool_start", tool=name, tool_call_id=tool_call.id)
+        start = time.perf_counter()
+        try:
+            raw_result = func(**args)
+        except Exception as e:
+            trace.emit(
+                "tool_end",
+                tool=name,
+                tool_call_id=tool_call.id,
+                duration=time.perf_counter() - start,
+                error=repr(e),
+            )
+            raise
+        trace.emit(
+            "tool_end",
+            tool=name,
+            tool_call_id=tool_call.id,
+            duration=time.perf_counter() - start,
+        )
+        return raw_result
+
+    async def acall_tool(
+        self,
+        func: AgentFunction,
+        args: dict,
+        tool_call: ChatCompletionMessageToolCall,
+        trace: RunTrace = None,
+    ):
+        if trace is None:
+            raw_result = func(**args)
+            return await raw_result if inspect.isawaitable(raw_result) else raw_result
+        name = tool_call.function.name
+        trace.emit("tool_start", tool=name, tool_call_id=tool_call.id)
+        start = time.perf_counter()
+        try:
+            raw_result = func(**args)
+            if inspect.isawaitable(raw_result):
+                raw_result = await raw_result
+        except Exception as e:
+            trace.emit(
+                "tool_end",
+                tool=name,
+                tool_call_id=tool_call.id,
+                duration=time.perf_counter() - start,
+                error=repr(e),
+            )
+            raise
+        trace.emit(
+            "tool_end",
+            tool=name,
+            tool_call_id=tool_call.id,
+            duration=time.perf_counter() - start,
+        )
+        return raw_result
+
+    def run_tool(
+        self,
+        func: AgentFunction,
+        args: dict,
+        tool_call: ChatCompletionMessageToolCall,
+        trace: RunTrace = None,
+        timeout: Optional[float] = None,
+        scope: RunScope = None,
+    ):
+        if timeout is None and (scope is None or not scope.bounded):
+            return self.call_tool(func, args, tool_call, trace)
+        # off the caller's thread, so a hung function can be abandoned
+        future = self.tool_executor().submit(
+            self.call_tool, func, args, tool_call, trace
+        )
+        return wait_future(future, timeout, scope)
+
     def handle_tool_calls(
         self,
         tool_calls: List[ChatCompletionMessageToolCall],
         functions: List[AgentFunction],
         context_variables: dict,
         debug: bool,
+        concurrent: bool = False,
+        trace: RunTrace = None,
+        arguments: Optional[dict] = None,
+        scope: RunScope = None,
+        tool_timeout: Optional[float] = None,
+        on_result: Optional[Callable[[Response], None]] = None,
     ) -> Response:
-        function_map = {f.__name__: f for f in functions}
+        manifest = self.tool_manifest(functions)
         partial_response = Response(
             messages=[], agent=None, context_variables={})
+        arguments = arguments or {}
+
+        if self.dispatch_concurrently(tool_calls, concurrent):
+            return self.handle_tool_calls_concurrently(
+                tool_calls,
+                manifest,
+                context_variables,
+                debug,
+                partial_response,
+                trace,
+                arguments,
+                scope,
+                tool_timeout,
+                on_result,
+            )
 
         for tool_call in tool_calls:
-            name = tool_call.function.name
-            # handle missing tool case, skip to next tool
-            if name not in function_map:
-                debug_print(debug, f"Tool {name} not found in function map.")
-                partial_response.messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "tool_name": name,
-                        "content": f"Error: Tool {name} not found.",
-                    }
+            func, args = self.resolve_tool_call(
+                tool_call,
+                manifest,
+                context_variables,
+                debug,
+                arguments.get(tool_call.id),
+            )
+            if func is None:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    missing_tool_message(tool_call),
+                    on_result,
+                )
+                continue
+            timeout = manifest.timeouts.get(tool_call.function.name, tool_timeout)
+            try:
+                raw_result = self.run_tool(func, args, tool_call, trace, timeout, scope)
+            except WaitTimeout:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    timed_out_tool_message(tool_call, timeout),
+                    on_result,
                 )
                 continue
-            args = json.loads(tool_call.function.arguments)
-            debug_print(
-                debug, f"Processing tool call: {name} with arguments {args}")
 
-            func = function_map[name]
-            # pass context_variables to agent functions
-            if __CTX_VARS_NAME__ in func.__code__.co_varnames:
-                args[__CTX_VARS_NAME__] = context_variables
-            raw_result = function_map[name](**args)
+            result: Result = self.tool_result(
+                raw_result, context_variables, debug, trace, scope
+            )
+            self.merge_tool_result(partial_response, tool_call, result, on_result)
 
-            result: Result = self.handle_function_result(raw_result, debug)
-            partial_response.messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "tool_name": name,
-                    "content": result.value,
-                }
+        return partial_response
+
+    def handle_tool_calls_concurrently(
+        self,
+        tool_calls: List[ChatCompletionMessageToolCall],
+        manifest: ToolManifest,
+        context_variables: dict,
+        debug: bool,
+        partial_response: Response,
+        trace: RunTrace = None,
+        arguments: Optional[dict] = None,
+        scope: RunScope = None,
+        tool_timeout: Optional[float] = None,
+        on_result: Optional[Callable[[Response], None]] = None,
+    ) -> Response:
+        arguments = arguments or {}
+        timeouts = [
+            manifest.timeouts.get(tool_call.function.name, tool_timeout)
+            for tool_call in tool_calls
+        ]
+        resolved = [
+            self.resolve_tool_call(
+                tool_call,
+                manifest,
+                context_variables,
+                debug,
+                arguments.get(tool_call.id),
             )
-            partial_response.context_variables.update(result.context_variables)
-            if result.agent:
-                partial_response.agent = result.agent
+            for tool_call in tool_calls
+        ]
+        debug_print(
+            debug, f"Dispatching {len(tool_calls)} tool calls concurrently.")
 
+        # coroutine functions are gathered on one event loop, the rest go to the
+        # pool; bounded calls all go to the pool so each can be waited on alone
+        bounded = (scope is not None and scope.bounded) or any(
+            t is not None for t in timeouts
+        )
+        executor = self.tool_executor()
+        futures, coroutines = {}, {}
+        for i, (resolved_call, (func, args)) in enumerate(zip(tool_calls, resolved)):
+            if func is None:
+                continue
+            if inspect.iscoroutinefunction(func) and not bounded:
+                coroutines[i] = self.acall_tool(func, args, resolved_call, trace)
+            elif inspect.iscoroutinefunction(func):
+                futures[i] = executor.submit(
+                    asyncio.run, self.acall_tool(func, args, resolved_call, trace)
+                )
+            else:
+                futures[i] = executor.submit(
+                    self.call_tool, func, args, resolved_call, trace
+                )
+
+        raw_results = [None] * len(resolved)
+        if coroutines:
+            # on a pool thread, since the caller may already be inside an
+            # event loop (Jupyter, async web handlers)
+            gathered = executor.submit(
+                asyncio.run, gather_all(list(coroutines.values()))
+            ).result()
+            for i, raw_result in zip(coroutines, gathered):
+                raw_results[i] = raw_result
+        started = time.monotonic()
+
+        # merge in original tool_call order so handoffs stay deterministic,
+        # each result as soon as it and the ones before it are in
+        for i, (tool_call, (func, _), timeout) in enumerate(
+            zip(tool_calls, resolved, timeouts)
+        ):
+            if func is None:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    missing_tool_message(tool_call),
+                    on_result,
+                )
+                continue
+            if i in futures:
+                try:
+                    raw_results[i] = wait_future(
+                        futures[i], time_left(started, timeout), scope
+                    )
+                except WaitTimeout:
+                    self.merge_tool_result(
+                        partial_response,
+                        tool_call,
+                        timed_out_tool_message(tool_call, timeout),
+                        on_result,
+                    )
+                    continue
+            result: Result = self.tool_result(
+                raw_results[i], context_variables, debug, trace, scope
+            )
+            self.merge_tool_result(partial_response, tool_call, result, on_result)
+
+        return partial_response
+
+    def start_early_tools(
+        self,
+        ready: List,
+        agent: Agent,
+        context_variables: dict,
+        debug: bool,
+        early: dict,
+        trace: RunTrace = None,
+    ) -> None:
+        manifest = self.tool_manifest(agent.functions)
+        executor = self.tool_executor()
+        for index, call, arguments in ready:
+            tool_call = tool_call_object(call)
+            func, args = self.resolve_tool_call(
+                tool_call, manifest, context_variables, debug, arguments
+            )
+            if func is None:
+                early[index] = (tool_call, None, None, None)
+                continue
+            debug_print(debug, f"Starting {tool_call.function.name} while streaming.")
+            if inspect.iscoroutinefunction(func):
+                future = executor.submit(
+                    asyncio.run, self.acall_tool(func, args, tool_call, trace)
+                )
+            else:
+                future = executor.submit(self.call_tool, func, args, tool_call, trace)
+            timeout = manifest.timeouts.get(tool_call.function.name, agent.tool_timeout)
+            early[index] = (tool_call, future, timeout, time.monotonic())
+
+    def collect_early_tools(
+        self,
+        early: dict,
+        context_variables: dict,
+        debug: bool,
+        scope: RunScope = None,
+        trace: RunTrace = None,
+        on_result: Optional[Callable[[Response], None]] = None,
+    ) -> Response:
+        partial_response = Response(messages=[], agent=None, context_variables={})
+        # merge in stream order so handoffs stay deterministic
+        for index in sorted(early):
+            tool_call, future, timeout, started = early[index]
+            if future is None:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    missing_tool_message(tool_call),
+                    on_result,
+                )
+                continue
+            try:
+                raw_result = wait_future(future, time_left(started, timeout), scope)
+            except WaitTimeout:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    timed_out_tool_message(tool_call, timeout),
+                    on_result,
+                )
+                continue
+            result: Result = self.tool_result(
+                raw_result, context_variables, debug, trace, scope
+            )
+            self.merge_tool_result(partial_response, tool_call, result, on_result)
         return partial_response
 
     def run_and_stream(
@@ -145,88 +1344,136 @@ class Swarm:
         debug: bool = False,
         max_turns: int = float("inf"),
         execute_tools: bool = True,
+        run_id: str = None,
+        timeout: float = None,
+        cancel_token: CancellationToken = None,
+        budget: RunBudget = None,
     ):
-        active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
-        init_len = len(messages)
-
-        while len(history) - init_len < max_turns:
-
-            message = {
-                "content": "",
-                "sender": agent.name,
-                "role": "assistant",
-                "function_call": None,
-                "tool_calls": defaultdict(
-                    lambda: {
-                        "function": {"arguments": "", "name": ""},
-                        "id": "",
-                        "type": "",
-                    }
-                ),
-            }
+        state = self.start_run(
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            run_id,
+            timeout,
+            cancel_token,
+            budget,
+            stream=True,
+        )
+        # the completion being streamed, if any
+        streaming = None
 
-            # get completion with current history, agent
-            completion = self.get_chat_completion(
-                agent=active_agent,
-                history=history,
-                context_variables=context_variables,
-                model_override=model_override,
-                stream=True,
-                debug=debug,
-            )
+        try:
+            while state.turns_left(max_turns):
+                turn = state.start_turn()
+                accumulator = StreamAccumulator(state.agent.name)
 
-            yield {"delim": "start"}
-            for chunk in completion:
-                delta = json.loads(chunk.choices[0].delta.json())
-                if delta["role"] == "assistant":
-                    delta["sender"] = active_agent.name
-                yield delta
-                delta.pop("role", None)
-                delta.pop("sender", None)
-                merge_chunk(message, delta)
-            yield {"delim": "end"}
-
-            message["tool_calls"] = list(
-                message.get("tool_calls", {}).values())
-            if not message["tool_calls"]:
-                message["tool_calls"] = None
-            debug_print(debug, "Received completion:", message)
-            history.append(message)
-
-            if not message["tool_calls"] or not execute_tools:
-                debug_print(debug, "Ending turn.")
-                break
-
-            # convert tool_calls to objects
-            tool_calls = []
-            for tool_call in message["tool_calls"]:
-                function = Function(
-                    arguments=tool_call["function"]["arguments"],
-                    name=tool_call["function"]["name"],
-                )
-                tool_call_object = ChatCompletionMessageToolCall(
-                    id=tool_call["id"], function=function, type=tool_call["type"]
-                )
-                tool_calls.append(tool_call_object)
-
-            # handle function calls, updating context_variables, and switching agents
-            partial_response = self.handle_tool_calls(
-                tool_calls, active_agent.functions, context_variables, debug
-            )
-            history.extend(partial_response.messages)
-            context_variables.update(partial_response.context_variables)
-            if partial_response.agent:
-                active_agent = partial_response.agent
-
-        yield {
-            "response": Response(
-                messages=history[init_len:],
-                agent=active_agent,
-                context_variables=context_variables,
-            )
-        }
+                # get completion with current history, agent
+                completion = self.get_chat_completion(
+                    agent=state.agent,
+                    history=state.history,
+                    context_variables=state.context_variables,
+                    model_override=model_override,
+                    stream=True,
+                    debug=debug,
+                    turn=turn,
+                    scope=state.scope,
+                )
+
+                streaming = completion
+                yield {"delim": "start"}
+                stream_start, usage = time.perf_counter(), None
+                # tool calls started mid-stream, by stream index
+                early = {} if self.early_tool_execution and execute_tools else None
+                for chunk in completion:
+                    if state.scope is not None:
+                        state.scope.check()
+                    if turn.time_to_first_token is None:
+                        turn.time_to_first_token = (
+                            turn.model_time + time.perf_counter() - stream_start
+                        )
+                    usage = getattr(chunk, "usage", None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    yield delta_event(delta, state.agent.name)
+                    accumulator.add(delta)
+                    if early is not None and delta.tool_calls:
+                        self.start_early_tools(
+                            accumulator.ready_tool_calls(),
+                            state.agent,
+                            state.context_variables,
+                            debug,
+                            early,
+                            state.trace,
+                        )
+                turn.model_time += time.perf_counter() - stream_start
+                streaming = None
+                yield {"delim": "end"}
+
+                message = accumulator.message()
+                state.add_completion(message, turn, usage)
+
+                if not message["tool_calls"] or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    yield {"metrics": turn}
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                progress = state.start_tools()
+                if early is not None:
+                    self.start_early_tools(
+                        accumulator.ready_tool_calls(final=True),
+                        state.agent,
+                        state.context_variables,
+                        debug,
+                        early,
+                        state.trace,
+                    )
+                    partial_response = self.collect_early_tools(
+                        early,
+                        state.context_variables,
+                        debug,
+                        state.scope,
+                        state.trace,
+                        progress,
+                    )
+                else:
+                    partial_response = self.handle_tool_calls(
+                        progress.tool_calls,
+                        state.agent.functions,
+                        state.context_variables,
+                        debug,
+                        concurrent=state.agent.parallel_tool_calls,
+                        trace=state.trace,
+                        arguments=accumulator.parsed_arguments(),
+                        scope=state.scope,
+                        tool_timeout=state.agent.tool_timeout,
+                        on_result=progress,
+                    )
+                state.add_tool_results(partial_response, turn)
+                yield {"metrics": turn}
+            else:
+                state.termination_reason = "max_turns"
+        except RunCancelled as e:
+            state.stop(e.reason)
+            if streaming is not None:
+                close_stream(streaming)
+                # keep the text streamed so far; tool calls may be cut off
+                content = "".join(accumulator.content)
+                if content:
+                    state.history = state.history.append(
+                        Message.assistant(content, state.agent.name)
+                    )
+                yield {"delim": "end"}
+        except Exception as e:
+            state.fail(e)
+            raise
+
+        yield {"response": state.finish()}
 
     def run(
         self,
@@ -238,6 +1485,10 @@ class Swarm:
         debug: bool = False,
         max_turns: int = float("inf"),
         execute_tools: bool = True,
+        run_id: str = None,
+        timeout: float = None,
+        cancel_token: CancellationToken = None,
+        budget: RunBudget = None,
     ) -> Response:
         if stream:
             return self.run_and_stream(
@@ -248,45 +1499,963 @@ class Swarm:
                 debug=debug,
                 max_turns=max_turns,
                 execute_tools=execute_tools,
+                run_id=run_id,
+                timeout=timeout,
+                cancel_token=cancel_token,
+                budget=budget,
+            )
+        state = self.start_run(
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            run_id,
+            timeout,
+            cancel_token,
+            budget,
+            stream=False,
+        )
+        try:
+            while state.turns_left(max_turns) and state.agent:
+                # get completion with current history, agent
+                turn = state.start_turn()
+                completion = self.get_chat_completion(
+                    agent=state.agent,
+                    history=state.history,
+                    context_variables=state.context_variables,
+                    model_override=model_override,
+                    stream=stream,
+                    debug=debug,
+                    turn=turn,
+                    scope=state.scope,
+                )
+                message = completion.choices[0].message
+                state.add_completion(
+                    Message.from_completion(message, state.agent.name),
+                    turn,
+                    completion.usage,
+                )
+
+                if not message.tool_calls or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                progress = state.start_tools()
+                partial_response = self.handle_tool_calls(
+                    message.tool_calls,
+                    state.agent.functions,
+                    state.context_variables,
+                    debug,
+                    concurrent=state.agent.parallel_tool_calls,
+                    trace=state.trace,
+                    scope=state.scope,
+                    tool_timeout=state.agent.tool_timeout,
+                    on_result=progress,
+                )
+                state.add_tool_results(partial_response, turn)
+            else:
+                state.termination_reason = "max_turns"
+        except RunCancelled as e:
+            state.stop(e.reason)
+        except Exception as e:
+            state.fail(e)
+            raise
+
+        return state.finish()
+
+    def resume(
+        self,
+        run_id: str,
+        agents,
+        stream: bool = False,
+        debug: bool = False,
+        timeout: float = None,
+        cancel_token: CancellationToken = None,
+        budget: RunBudget = None,
+    ) -> Response:
+        """
+        Continues a checkpointed run where it stopped. Completions and tool calls
+        already recorded are not re-issued; tool calls of an interrupted turn that
+        have no result yet are run first.
+
+        `agents` holds every agent the run may have been in, as a list, a
+        name-to-agent dict or a compiled `AgentGraph`. The returned `Response` covers the whole run.
+        """
+        checkpoint, agent, caller = self.load_checkpoint(run_id, agents)
+        context_variables = ContextVariables(checkpoint.context_variables)
+        pending = checkpoint.pending_tool_calls() if checkpoint.execute_tools else []
+        scope = run_scope(timeout, cancel_token)
+        if pending:
+            progress = self.resumed_tool_progress(
+                checkpoint, pending, agent, context_variables
+            )
+            try:
+                partial_response = self.handle_tool_calls(
+                    progress.tool_calls,
+                    caller.functions,
+                    context_variables,
+                    debug,
+                    concurrent=caller.parallel_tool_calls,
+                    trace=RunTrace(self.hooks, run_id) if self.hooks else None,
+                    scope=scope,
+                    tool_timeout=caller.tool_timeout,
+                    on_result=progress,
+                )
+            except RunCancelled as e:
+                response = self.stopped_resumed(
+                    checkpoint,
+                    agent,
+                    context_variables,
+                    progress.stopped(e.reason),
+                    e.reason,
+                )
+                return iter([{"response": response}]) if stream else response
+            agent = self.record_resumed_tools(
+                checkpoint, agent, context_variables, partial_response
+            )
+            if scope is not None:
+                # the rest of the run gets what the pending tools left
+                timeout = scope.remaining()
+
+        if run_finished(checkpoint):
+            response = self.finish_resumed(checkpoint, agent)
+            return iter([{"response": response}]) if stream else response
+
+        done = wire_messages(checkpoint.messages[checkpoint.init_len :])
+        response = self.run(
+            agent=agent,
+            messages=checkpoint.messages,
+            context_variables=context_variables.to_dict(),
+            model_override=checkpoint.model_override,
+            stream=stream,
+            debug=debug,
+            max_turns=(
+                checkpoint.max_turns - len(done)
+                if checkpoint.max_turns is not None
+                else float("inf")
+            ),
+            execute_tools=checkpoint.execute_tools,
+            run_id=run_id,
+            timeout=timeout,
+            cancel_token=cancel_token,
+            budget=budget,
+        )
+        if stream:
+            return prepend_messages(response, done)
+        response.messages = done + response.messages
+        return response
+
+    def run_many(
+        self,
+        agent: Agent,
+        conversations: Iterable,
+        max_concurrency: int = 8,
+        ordered: bool = False,
+        retries: int = 2,
+        backoff: float = 0.5,
+        **run_kwargs,
+    ) -> BatchRun:
+        """
+        Runs many independent conversations through `agent` with bounded concurrency.
+
+        Each conversation is a list of messages, or a dict of `run()` kwargs.
+        Returns a `BatchRun` that yields `(index, response)` pairs as they finish
+        (or in input order if `ordered`), and exposes aggregate `stats` afterwards.
+        """
+        return BatchRun(
+            self,
+            agent,
+            conversations,
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            retries=retries,
+            backoff=backoff,
+            run_kwargs=run_kwargs,
+        )
+
+
+class AsyncSwarm(Swarm):
+    def __init__(
+        self,
+        client=None,
+        max_tool_workers: int = None,
+        cache: CompletionCache = None,
+        hooks: List[TraceHook] = None,
+        rate_limiter: RateLimiter = None,
+        policy: CompletionPolicy = None,
+        checkpoint_store: CheckpointStore = None,
+        early_tool_execution: bool = False,
+    ):
+        if not client:
+            client = shared_clients().async_client()
+        super().__init__(
+            client=client,
+            max_tool_workers=max_tool_workers,
+            cache=cache,
+            hooks=hooks,
+            rate_limiter=rate_limiter,
+            policy=policy,
+            checkpoint_store=checkpoint_store,
+            early_tool_execution=early_tool_execution,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    async def get_chat_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+        turn: TurnMetrics = None,
+        scope: RunScope = None,
+    ) -> ChatCompletionMessage:
+        create_params, prompt_tokens, create = self.prepare_completion(
+            agent, history, context_variables, model_override, stream, debug, turn
+        )
+        sent = time.perf_counter()
+        completion = await create(
+            create_params,
+            debug,
+            prompt_tokens=prompt_tokens,
+            turn=turn,
+            policy=agent.policy or self.policy,
+            scope=scope,
+        )
+        if turn is not None:
+            turn.model_time = time.perf_counter() - sent - turn.queue_time
+        return completion
+
+    async def create_routed_completion(
+        self,
+        router: ModelRouter,
+        create_params: dict,
+        debug: bool,
+        prompt_tokens: int = 0,
+        turn: TurnMetrics = None,
+        policy: CompletionPolicy = None,
+        scope: RunScope = None,
+    ):
+        candidates = router.candidates()
+        for index, model in enumerate(candidates):
+            if turn is not None:
+                turn.model = model
+            start = time.perf_counter()
+            try:
+                completion = await self.create_completion(
+                    {**create_params, "model": model},
+                    debug,
+                    prompt_tokens=prompt_tokens,
+                    turn=turn,
+                    policy=policy,
+                    scope=scope,
+                )
+            except router.failover_errors():
+                router.record(model, time.perf_counter() - start, ok=False)
+                if index == len(candidates) - 1:
+                    raise
+                router.record_failover(model)
+                debug_print(
+                    debug, f"{model} failed, failing over to {candidates[index + 1]}"
+                )
+                continue
+            router.record(model, time.perf_counter() - start)
+            return completion
+
+    async def create_completion(
+        self,
+        create_params: dict,
+        debug: bool,
+        prompt_tokens: int = 0,
+        turn: TurnMetrics = None,
+        policy: CompletionPolicy = None,
+        scope: RunScope = None,
+    ):
+        stream = create_params["stream"]
+        if scope is not None:
+            # stop before a request that would go over the run's budget,
+            # priced as the model actually requested
+            scope.admit(create_params["model"], prompt_tokens)
+        if self.cache is not None:
+            key = cache_key(create_params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                debug_print(debug, "Completion cache hit:", key)
+                return async_completion_chunks(cached) if stream else cached
+
+        limiter, client, request_kwargs = self.request_setup(policy, scope)
+
+        async def send():
+            if limiter is not None:
+                waited = await limiter.aacquire(create_params["model"], prompt_tokens)
+                if turn is not None:
+                    turn.queue_time += waited
+            return await client.chat.completions.create(
+                **create_params, **request_kwargs
+            )
+
+        async def request():
+            if policy is None:
+                return await send(), None
+            return await acall_with_policy(policy, send, create_params["model"], stream)
+
+        if scope is None:
+            completion, outcome = await request()
+        else:
+            # a budget alone has nothing to interrupt the request for
+            work = request()
+            try:
+                if scope.bounded:
+                    completion, outcome = await await_bounded(work, scope=scope)
+                else:
+                    completion, outcome = await work
+            except BaseException:
+                scope.release()
+                raise
+        self.record_request(
+            create_params, prompt_tokens, completion, outcome, limiter, turn
+        )
+
+        if self.cache is None:
+            return completion
+        if stream:
+            return async_record_stream(completion, partial(self.cache.set, key))
+        self.cache.set(key, completion)
+        return completion
+
+    async def tool_result(
+        self,
+        raw_result,
+        context_variables: dict,
+        debug: bool,
+        trace: RunTrace = None,
+        scope: RunScope = None,
+    ) -> Result:
+        if isinstance(raw_result, FanOut):
+            raw_result = await self.run_fan_out(
+                raw_result, context_variables, debug, trace, scope
             )
-        active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
-        init_len = len(messages)
+        return self.handle_function_result(raw_result, debug)
 
-        while len(history) - init_len < max_turns and active_agent:
+    async def run_fan_out(
+        self,
+        fan_out: FanOut,
+        context_variables: dict,
+        debug: bool,
+        trace: RunTrace = None,
+        scope: RunScope = None,
+    ):
+        tasks = fan_out.tasks
+        timeout, cancel_token, budget = branch_limits(scope)
+        debug_print(debug, f"Fanning out to {len(tasks)} agents.")
+        if trace is not None:
+            trace.emit("fan_out_start", agents=[task.agent.name for task in tasks])
+        start = time.perf_counter()
+        limit = asyncio.Semaphore(max(1, fan_out.max_concurrency or len(tasks)))
+        client = self.branch_client()
+
+        async def branch(task):
+            async with limit:
+                return await client.run(
+                    agent=task.agent,
+                    messages=task.messages,
+                    context_variables=task_context(context_variables, task),
+                    debug=debug,
+                    max_turns=task.max_turns,
+                    timeout=timeout,
+                    cancel_token=cancel_token,
+                    budget=budget,
+                )
 
-            # get completion with current history, agent
-            completion = self.get_chat_completion(
-                agent=active_agent,
-                history=history,
+        responses = await asyncio.gather(*(branch(task) for task in tasks))
+        if trace is not None:
+            trace.emit(
+                "fan_out_end",
+                agents=[task.agent.name for task in tasks],
+                duration=time.perf_counter() - start,
+            )
+        return fan_out.reduce(context_variables, responses)
+
+    async def arun_tool(
+        self,
+        func: AgentFunction,
+        args: dict,
+        tool_call: ChatCompletionMessageToolCall,
+        trace: RunTrace = None,
+        timeout: Optional[float] = None,
+        scope: RunScope = None,
+    ):
+        bounded = timeout is not None or (scope is not None and scope.bounded)
+        if inspect.iscoroutinefunction(func):
+            work = self.acall_tool(func, args, tool_call, trace)
+        else:
+            # sync functions may block, so they run off the loop: other work
+            # runs meanwhile and a hung function can be abandoned
+            work = asyncio.get_running_loop().run_in_executor(
+                self.tool_executor(),
+                partial(self.call_tool, func, args, tool_call, trace),
+            )
+        raw_result = await await_bounded(work, timeout, scope) if bounded else await work
+        if inspect.isawaitable(raw_result):
+            raw_result = await raw_result
+        return raw_result
+
+    async def handle_tool_calls(
+        self,
+        tool_calls: List[ChatCompletionMessageToolCall],
+        functions: List[AgentFunction],
+        context_variables: dict,
+        debug: bool,
+        concurrent: bool = False,
+        trace: RunTrace = None,
+        arguments: Optional[dict] = None,
+        scope: RunScope = None,
+        tool_timeout: Optional[float] = None,
+        on_result: Optional[Callable[[Response], None]] = None,
+    ) -> Response:
+        manifest = self.tool_manifest(functions)
+        partial_response = Response(
+            messages=[], agent=None, context_variables={})
+        arguments = arguments or {}
+
+        if self.dispatch_concurrently(tool_calls, concurrent):
+            return await self.handle_tool_calls_concurrently(
+                tool_calls,
+                manifest,
+                context_variables,
+                debug,
+                partial_response,
+                trace,
+                arguments,
+                scope,
+                tool_timeout,
+                on_result,
+            )
+
+        for tool_call in tool_calls:
+            func, args = self.resolve_tool_call(
+                tool_call,
+                manifest,
+                context_variables,
+                debug,
+                arguments.get(tool_call.id),
+            )
+            if func is None:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    missing_tool_message(tool_call),
+                    on_result,
+                )
+                continue
+            # await coroutine functions natively
+            timeout = manifest.timeouts.get(tool_call.function.name, tool_timeout)
+            try:
+                raw_result = await self.arun_tool(
+                    func, args, tool_call, trace, timeout, scope
+                )
+            except WaitTimeout:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    timed_out_tool_message(tool_call, timeout),
+                    on_result,
+                )
+                continue
+
+            result: Result = await self.tool_result(
+                raw_result, context_variables, debug, trace, scope
+            )
+            self.merge_tool_result(partial_response, tool_call, result, on_result)
+
+        return partial_response
+
+    async def handle_tool_calls_concurrently(
+        self,
+        tool_calls: List[ChatCompletionMessageToolCall],
+        manifest: ToolManifest,
+        context_variables: dict,
+        debug: bool,
+        partial_response: Response,
+        trace: RunTrace = None,
+        arguments: Optional[dict] = None,
+        scope: RunScope = None,
+        tool_timeout: Optional[float] = None,
+        on_result: Optional[Callable[[Response], None]] = None,
+    ) -> Response:
+        arguments = arguments or {}
+        timeouts = [
+            manifest.timeouts.get(tool_call.function.name, tool_timeout)
+            for tool_call in tool_calls
+        ]
+        resolved = [
+            self.resolve_tool_call(
+                tool_call,
+                manifest,
+                context_variables,
+                debug,
+                arguments.get(tool_call.id),
+            )
+            for tool_call in tool_calls
+        ]
+        debug_print(
+            debug, f"Dispatching {len(tool_calls)} tool calls concurrently.")
+
+        async def call(tool_call, func, args, timeout):
+            if func is None:
+                return None
+            try:
+                return await self.arun_tool(
+                    func, args, tool_call, trace, timeout, scope
+                )
+            except WaitTimeout:
+                return TIMED_OUT
+
+        tasks = [
+            asyncio.ensure_future(call(tool_call, func, args, timeout))
+            for tool_call, (func, args), timeout in zip(tool_calls, resolved, timeouts)
+        ]
+
+        # merge in original tool_call order so handoffs stay deterministic,
+        # each result as soon as it and the ones before it are in
+        try:
+            for tool_call, (func, _), task, timeout in zip(
+                tool_calls, resolved, tasks, timeouts
+            ):
+                raw_result = await task
+                if func is None:
+                    self.merge_tool_result(
+                        partial_response,
+                        tool_call,
+                        missing_tool_message(tool_call),
+                        on_result,
+                    )
+                    continue
+                if raw_result is TIMED_OUT:
+                    self.merge_tool_result(
+                        partial_response,
+                        tool_call,
+                        timed_out_tool_message(tool_call, timeout),
+                        on_result,
+                    )
+                    continue
+                result: Result = await self.tool_result(
+                    raw_result, context_variables, debug, trace, scope
+                )
+                self.merge_tool_result(partial_response, tool_call, result, on_result)
+        finally:
+            # a stopped run leaves nothing running behind it
+            for task in tasks:
+                task.cancel()
+
+        return partial_response
+
+    def start_early_tools(
+        self,
+        ready: List,
+        agent: Agent,
+        context_variables: dict,
+        debug: bool,
+        early: dict,
+        trace: RunTrace = None,
+    ) -> None:
+        manifest = self.tool_manifest(agent.functions)
+        loop = asyncio.get_running_loop()
+        for index, call, arguments in ready:
+            tool_call = tool_call_object(call)
+            func, args = self.resolve_tool_call(
+                tool_call, manifest, context_variables, debug, arguments
+            )
+            if func is None:
+                early[index] = (tool_call, None, None, None)
+                continue
+            debug_print(debug, f"Starting {tool_call.function.name} while streaming.")
+            if inspect.iscoroutinefunction(func):
+                task = asyncio.ensure_future(
+                    self.acall_tool(func, args, tool_call, trace)
+                )
+            else:
+                task = loop.run_in_executor(
+                    self.tool_executor(),
+                    partial(self.call_tool, func, args, tool_call, trace),
+                )
+            timeout = manifest.timeouts.get(tool_call.function.name, agent.tool_timeout)
+            early[index] = (tool_call, task, timeout, time.monotonic())
+
+    async def collect_early_tools(
+        self,
+        early: dict,
+        context_variables: dict,
+        debug: bool,
+        scope: RunScope = None,
+        trace: RunTrace = None,
+        on_result: Optional[Callable[[Response], None]] = None,
+    ) -> Response:
+        partial_response = Response(messages=[], agent=None, context_variables={})
+        for index in sorted(early):
+            tool_call, task, timeout, started = early[index]
+            if task is None:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    missing_tool_message(tool_call),
+                    on_result,
+                )
+                continue
+            try:
+                raw_result = await await_bounded(
+                    task, time_left(started, timeout), scope
+                )
+            except WaitTimeout:
+                self.merge_tool_result(
+                    partial_response,
+                    tool_call,
+                    timed_out_tool_message(tool_call, timeout),
+                    on_result,
+                )
+                continue
+            result: Result = await self.tool_result(
+                raw_result, context_variables, debug, trace, scope
+            )
+            self.merge_tool_result(partial_response, tool_call, result, on_result)
+        return partial_response
+
+    async def run_and_stream(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict = {},
+        model_override: str = None,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+        run_id: str = None,
+        timeout: float = None,
+        cancel_token: CancellationToken = None,
+        budget: RunBudget = None,
+    ):
+        state = self.start_run(
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            run_id,
+            timeout,
+            cancel_token,
+            budget,
+            stream=True,
+        )
+        # the completion being streamed, if any
+        streaming = None
+
+        try:
+            while state.turns_left(max_turns):
+                turn = state.start_turn()
+                accumulator = StreamAccumulator(state.agent.name)
+
+                # get completion with current history, agent
+                completion = await self.get_chat_completion(
+                    agent=state.agent,
+                    history=state.history,
+                    context_variables=state.context_variables,
+                    model_override=model_override,
+                    stream=True,
+                    debug=debug,
+                    turn=turn,
+                    scope=state.scope,
+                )
+
+                streaming = completion
+                yield {"delim": "start"}
+                stream_start, usage = time.perf_counter(), None
+                # tool calls started mid-stream, by stream index
+                early = {} if self.early_tool_execution and execute_tools else None
+                async for chunk in completion:
+                    if state.scope is not None:
+                        state.scope.check()
+                    if turn.time_to_first_token is None:
+                        turn.time_to_first_token = (
+                            turn.model_time + time.perf_counter() - stream_start
+                        )
+                    usage = getattr(chunk, "usage", None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    yield delta_event(delta, state.agent.name)
+                    accumulator.add(delta)
+                    if early is not None and delta.tool_calls:
+                        self.start_early_tools(
+                            accumulator.ready_tool_calls(),
+                            state.agent,
+                            state.context_variables,
+                            debug,
+                            early,
+                            state.trace,
+                        )
+                turn.model_time += time.perf_counter() - stream_start
+                streaming = None
+                yield {"delim": "end"}
+
+                message = accumulator.message()
+                state.add_completion(message, turn, usage)
+
+                if not message["tool_calls"] or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    yield {"metrics": turn}
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                progress = state.start_tools()
+                if early is not None:
+                    self.start_early_tools(
+                        accumulator.ready_tool_calls(final=True),
+                        state.agent,
+                        state.context_variables,
+                        debug,
+                        early,
+                        state.trace,
+                    )
+                    partial_response = await self.collect_early_tools(
+                        early,
+                        state.context_variables,
+                        debug,
+                        state.scope,
+                        state.trace,
+                        progress,
+                    )
+                else:
+                    partial_response = await self.handle_tool_calls(
+                        progress.tool_calls,
+                        state.agent.functions,
+                        state.context_variables,
+                        debug,
+                        concurrent=state.agent.parallel_tool_calls,
+                        trace=state.trace,
+                        arguments=accumulator.parsed_arguments(),
+                        scope=state.scope,
+                        tool_timeout=state.agent.tool_timeout,
+                        on_result=progress,
+                    )
+                state.add_tool_results(partial_response, turn)
+                yield {"metrics": turn}
+            else:
+                state.termination_reason = "max_turns"
+        except RunCancelled as e:
+            state.stop(e.reason)
+            if streaming is not None:
+                await aclose_stream(streaming)
+                # keep the text streamed so far; tool calls may be cut off
+                content = "".join(accumulator.content)
+                if content:
+                    state.history = state.history.append(
+                        Message.assistant(content, state.agent.name)
+                    )
+                yield {"delim": "end"}
+        except Exception as e:
+            state.fail(e)
+            raise
+
+        yield {"response": state.finish()}
+
+    async def run(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict = {},
+        model_override: str = None,
+        stream: bool = False,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+        run_id: str = None,
+        timeout: float = None,
+        cancel_token: CancellationToken = None,
+        budget: RunBudget = None,
+    ) -> Response:
+        if stream:
+            return self.run_and_stream(
+                agent=agent,
+                messages=messages,
                 context_variables=context_variables,
                 model_override=model_override,
-                stream=stream,
                 debug=debug,
+                max_turns=max_turns,
+                execute_tools=execute_tools,
+                run_id=run_id,
+                timeout=timeout,
+                cancel_token=cancel_token,
+                budget=budget,
             )
-            message = completion.choices[0].message
-            debug_print(debug, "Received completion:", message)
-            message.sender = active_agent.name
-            history.append(
-                json.loads(message.model_dump_json())
-            )  # to avoid OpenAI types (?)
+        state = self.start_run(
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            run_id,
+            timeout,
+            cancel_token,
+            budget,
+            stream=False,
+        )
+        try:
+            while state.turns_left(max_turns) and state.agent:
+                # get completion with current history, agent
+                turn = state.start_turn()
+                completion = await self.get_chat_completion(
+                    agent=state.agent,
+                    history=state.history,
+                    context_variables=state.context_variables,
+                    model_override=model_override,
+                    stream=stream,
+                    debug=debug,
+                    turn=turn,
+                    scope=state.scope,
+                )
+                message = completion.choices[0].message
+                state.add_completion(
+                    Message.from_completion(message, state.agent.name),
+                    turn,
+                    completion.usage,
+                )
+
+                if not message.tool_calls or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                progress = state.start_tools()
+                partial_response = await self.handle_tool_calls(
+                    message.tool_calls,
+                    state.agent.functions,
+                    state.context_variables,
+                    debug,
+                    concurrent=state.agent.parallel_tool_calls,
+                    trace=state.trace,
+                    scope=state.scope,
+                    tool_timeout=state.agent.tool_timeout,
+                    on_result=progress,
+                )
+                state.add_tool_results(partial_response, turn)
+            else:
+                state.termination_reason = "max_turns"
+        except RunCancelled as e:
+            state.stop(e.reason)
+        except Exception as e:
+            state.fail(e)
+            raise
 
-            if not message.tool_calls or not execute_tools:
-                debug_print(debug, "Ending turn.")
-                break
+        return state.finish()
 
-            # handle function calls, updating context_variables, and switching agents
-            partial_response = self.handle_tool_calls(
-                message.tool_calls, active_agent.functions, context_variables, debug
+    async def resume(
+        self,
+        run_id: str,
+        agents,
+        stream: bool = False,
+        debug: bool = False,
+        timeout: float = None,
+        cancel_token: CancellationToken = None,
+        budget: RunBudget = None,
+    ) -> Response:
+        checkpoint, agent, caller = self.load_checkpoint(run_id, agents)
+        context_variables = ContextVariables(checkpoint.context_variables)
+        pending = checkpoint.pending_tool_calls() if checkpoint.execute_tools else []
+        scope = run_scope(timeout, cancel_token)
+        if pending:
+            progress = self.resumed_tool_progress(
+                checkpoint, pending, agent, context_variables
+            )
+            try:
+                partial_response = await self.handle_tool_calls(
+                    progress.tool_calls,
+                    caller.functions,
+                    context_variables,
+                    debug,
+                    concurrent=caller.parallel_tool_calls,
+                    trace=RunTrace(self.hooks, run_id) if self.hooks else None,
+                    scope=scope,
+                    tool_timeout=caller.tool_timeout,
+                    on_result=progress,
+                )
+            except RunCancelled as e:
+                response = self.stopped_resumed(
+                    checkpoint,
+                    agent,
+                    context_variables,
+                    progress.stopped(e.reason),
+                    e.reason,
+                )
+                return single_event({"response": response}) if stream else response
+            agent = self.record_resumed_tools(
+                checkpoint, agent, context_variables, partial_response
             )
-            history.extend(partial_response.messages)
-            context_variables.update(partial_response.context_variables)
-            if partial_response.agent:
-                active_agent = partial_response.agent
+            if scope is not None:
+                # the rest of the run gets what the pending tools left
+                timeout = scope.remaining()
 
-        return Response(
-            messages=history[init_len:],
-            agent=active_agent,
-            context_variables=context_variables,
+        if run_finished(checkpoint):
+            response = self.finish_resumed(checkpoint, agent)
+            if stream:
+                return single_event({"response": response})
+            return response
+
+        done = wire_messages(checkpoint.messages[checkpoint.init_len :])
+        response = await self.run(
+            agent=agent,
+            messages=checkpoint.messages,
+            context_variables=context_variables.to_dict(),
+            model_override=checkpoint.model_override,
+            stream=stream,
+            debug=debug,
+            max_turns=(
+                checkpoint.max_turns - len(done)
+                if checkpoint.max_turns is not None
+                else float("inf")
+            ),
+            execute_tools=checkpoint.execute_tools,
+            run_id=run_id,
+            timeout=timeout,
+            cancel_token=cancel_token,
+            budget=budget,
+        )
+        if stream:
+            return aprepend_messages(response, done)
+        response.messages = done + response.messages
+        return response
+
+    def run_many(
+        self,
+        agent: Agent,
+        conversations: Iterable,
+        max_concurrency: int = 64,
+        ordered: bool = False,
+        retries: int = 2,
+        backoff: float = 0.5,
+        **run_kwargs,
+    ) -> AsyncBatchRun:
+        """Like `Swarm.run_many`, but iterated with `async for` on the running event loop."""
+        return AsyncBatchRun(
+            self,
+            agent,
+            conversations,
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            retries=retries,
+            backoff=backoff,
+            run_kwargs=run_kwargs,
         )
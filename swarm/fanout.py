@@ -0,0 +1,116 @@
+import json
+from typing import Callable, List, Mapping, Optional, Union
+
+# Third-party imports
+from pydantic import BaseModel, field_validator
+
+from .history import ContextVariables
+from .types import Agent, Response, Result
+
+_UNSET = object()
+
+
+class FanOutTask(BaseModel):
+    """
+    One branch of a `FanOut`: a run of its own, started from `agent`.
+
+    Attributes:
+        agent (Agent): The agent the branch starts with.
+        messages (list): The branch's conversation; a string becomes one user message.
+        context_variables (dict): Set on top of the branch's copy of the
+            parent's context variables.
+        max_turns (int): Turn limit for the branch.
+    """
+
+    agent: Agent
+    messages: List
+    context_variables: dict = {}
+    max_turns: Union[int, float] = float("inf")
+
+    @field_validator("messages", mode="before")
+    @classmethod
+    def user_message(cls, messages):
+        if isinstance(messages, str):
+            return [{"role": "user", "content": messages}]
+        return messages
+
+
+class FanOut(BaseModel):
+    """
+    Returned by an agent function to run several agents at once. Every task
+    is a separate run with its own copy of the context variables; once all of
+    them finish, `reducer` folds their responses into the function's `Result`.
+
+    Attributes:
+        tasks (list): `FanOutTask`s, or (agent, messages) pairs.
+        reducer (callable): `reducer(context_variables, tasks, responses)`,
+            returning what an agent function would; `merge_responses` by default.
+        max_concurrency (int): Tasks running at once; all of them by default.
+    """
+
+    tasks: List[FanOutTask]
+    reducer: Optional[Callable] = None
+    max_concurrency: Optional[int] = None
+
+    @field_validator("tasks", mode="before")
+    @classmethod
+    def task_pairs(cls, tasks):
+        return [
+            FanOutTask(agent=task[0], messages=task[1]) if isinstance(task, tuple) else task
+            for task in tasks
+        ]
+
+    def reduce(self, context_variables: Mapping, responses: List[Response]):
+        reducer = self.reducer or merge_responses
+        return reducer(context_variables, self.tasks, responses)
+
+
+def task_context(context_variables: Mapping, task: FanOutTask) -> dict:
+    # branches start from the same values; each run copies what it changes
+    return {**ContextVariables(context_variables).to_dict(), **task.context_variables}
+
+
+def context_changes(start: Mapping, final: Mapping) -> dict:
+    """The variables a branch set or changed, relative to what it started with."""
+    changes = {}
+    for key, value in final.items():
+        before = start.get(key, _UNSET)
+        try:
+            same = before is value or bool(before == value)
+        except Exception:
+            same = False
+        if not same:
+            changes[key] = value
+    return changes
+
+
+def final_content(response: Response) -> Optional[str]:
+    for message in reversed(response.messages):
+        if message.get("role") == "assistant" and message.get("content"):
+            return message["content"]
+    return None
+
+
+def merge_responses(
+    context_variables: Mapping, tasks: List[FanOutTask], responses: List[Response]
+) -> Result:
+    """
+    The default reducer: the function result lists each branch's agent and
+    final answer, and the variables each branch changed are copied back to
+    the parent, later tasks winning when two change the same one.
+    """
+    merged = {}
+    for task, response in zip(tasks, responses):
+        merged.update(
+            context_changes(task_context(context_variables, task), response.context_variables)
+        )
+    value = json.dumps(
+        [
+            {
+                "agent": (response.agent or task.agent).name,
+                "content": final_content(response),
+            }
+            for task, response in zip(tasks, responses)
+        ]
+    )
+    return Result(value=value, context_variables=merged)
@@ -0,0 +1,301 @@
+import inspect
+import re
+from types import CodeType, MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .instructions import render_instructions
+from .selection import tool_index
+from .tools import ToolManifest, compile_tools
+from .types import Agent, AgentFunction
+
+_HANDOFF_PREFIX = "transfer_to_"
+
+
+class GraphError(ValueError):
+    """
+    An agent graph failed to compile.
+
+    Attributes:
+        problems (list): One message per invalid agent or function.
+    """
+
+    def __init__(self, problems: List[str]):
+        super().__init__("Agent graph is invalid:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+class AgentNode:
+    """
+    One agent of a compiled graph.
+
+    Attributes:
+        agent (Agent): The agent itself.
+        manifest (ToolManifest): Its prebuilt tool schemas and function map.
+        handoffs (tuple): (function name, target agent name) pairs.
+    """
+
+    __slots__ = ("agent", "manifest", "handoffs", "_functions")
+
+    def __init__(self, agent: Agent, manifest: ToolManifest, handoffs: tuple):
+        self.agent = agent
+        self.manifest = manifest
+        self.handoffs = handoffs
+        # the list the manifest was built from; see `AgentGraph.manifest`
+        self._functions = agent.functions
+
+
+class AgentGraph:
+    """
+    The agents reachable from an entry agent through their handoff functions,
+    with every tool manifest built and validated up front. Returned by
+    `Swarm.compile`; treat it as frozen and compile again after changing an
+    agent.
+
+    Attributes:
+        entry (Agent): The agent runs start with.
+        nodes (Mapping): Agent name to `AgentNode`.
+        cycles (tuple): Groups of agent names that can hand off back to each
+            other, e.g. ("Triage", "Sales") for a triage agent and a sales
+            agent with "transfer back" functions.
+        unreachable (tuple): Names of registry agents no handoff leads to.
+        warnings (tuple): Handoff functions whose target could not be found.
+    """
+
+    __slots__ = ("entry", "nodes", "cycles", "unreachable", "warnings", "_by_functions")
+
+    def __init__(
+        self,
+        entry: Agent,
+        nodes: Dict[str, AgentNode],
+        cycles: tuple,
+        unreachable: tuple,
+        warnings: tuple,
+    ):
+        self.entry = entry
+        self.nodes = MappingProxyType(nodes)
+        self.cycles = cycles
+        self.unreachable = unreachable
+        self.warnings = warnings
+        self._by_functions = {id(node._functions): node for node in nodes.values()}
+
+    @property
+    def agents(self) -> Dict[str, Agent]:
+        """Agent name to agent, e.g. for `Swarm.resume`."""
+        return {name: node.agent for name, node in self.nodes.items()}
+
+    def __contains__(self, agent: Agent) -> bool:
+        node = self.nodes.get(agent.name)
+        return node is not None and node.agent is agent
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def manifest(self, functions: List[AgentFunction]) -> Optional[ToolManifest]:
+        """
+        The prebuilt manifest for an agent's `functions` list, or None if the
+        list doesn't belong to the graph or has changed since it was compiled.
+        """
+        node = self._by_functions.get(id(functions))
+        if node is None or node._functions is not functions:
+            return None
+        compiled = node.manifest.functions
+        if len(functions) != len(compiled):
+            return None
+        for func, compiled_func in zip(functions, compiled):
+            if func is not compiled_func:
+                return None
+        return node.manifest
+
+
+def _code_names(code: CodeType):
+    yield from code.co_names
+    # lambdas and comprehensions inside the function
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_names(const)
+
+
+def _agents_in(value):
+    if isinstance(value, Agent):
+        yield value
+    elif isinstance(value, Mapping):
+        # e.g. `return AGENTS["sales"]`
+        yield from (v for v in value.values() if isinstance(v, Agent))
+    elif isinstance(value, (list, tuple)):
+        yield from (v for v in value if isinstance(v, Agent))
+
+
+def handoff_targets(func: AgentFunction) -> List[Agent]:
+    """
+    The agents `func` refers to through a global name, a closure or a
+    default argument, which is how handoff functions reach the agent they
+    return. Found without calling `func`.
+    """
+    func = inspect.unwrap(getattr(func, "__func__", func))
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return []
+    referenced = []
+    namespace = getattr(func, "__globals__", {})
+    referenced.extend(namespace.get(name) for name in _code_names(code))
+    for cell in func.__closure__ or ():
+        try:
+            referenced.append(cell.cell_contents)
+        except ValueError:  # empty cell
+            pass
+    referenced.extend(func.__defaults__ or ())
+    referenced.extend((func.__kwdefaults__ or {}).values())
+
+    targets, seen = [], set()
+    for value in referenced:
+        for agent in _agents_in(value):
+            if id(agent) not in seen:
+                seen.add(id(agent))
+                targets.append(agent)
+    return targets
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"\W+", "_", name).strip("_").lower()
+
+
+def _strongly_connected(edges: Dict[str, List[str]]) -> List[List[str]]:
+    # Tarjan's algorithm, iterative so deep handoff chains can't hit the recursion limit
+    index, low, on_stack, stack, components = {}, {}, set(), [], []
+    for root in edges:
+        if root in index:
+            continue
+        work = [(root, iter(edges[root]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(edges[successor])))
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component[::-1])
+    return components
+
+
+def compile_graph(
+    entry: Agent,
+    agents=None,
+    context_variables: Optional[dict] = None,
+) -> AgentGraph:
+    """
+    Discovers the agents reachable from `entry` and builds their tool
+    manifests. `agents` is an optional registry (a list, or a dict keyed by
+    name) of agents to include even if no handoff reaches them, and to
+    resolve `transfer_to_<name>` functions whose target can't be found
+    statically. Tool selector indexes (and tool embeddings) are built too,
+    and memoized instruction callables are rendered for `context_variables`,
+    if given, so the first turn of each agent hits the instruction cache.
+
+    Raises `GraphError` listing every agent with tools that can't be
+    compiled, duplicate function names, or a name shared by two agents.
+    """
+    if agents is None:
+        registry = []
+    elif isinstance(agents, Mapping):
+        registry = list(agents.values())
+    else:
+        registry = list(agents)
+    by_slug = {_slug(agent.name): agent for agent in registry}
+
+    problems, warnings = [], []
+    nodes: Dict[str, AgentNode] = {}
+    edges: Dict[str, List[str]] = {}
+    pending = [entry, *registry]
+    while pending:
+        agent = pending.pop(0)
+        existing = nodes.get(agent.name)
+        if existing is not None:
+            if existing.agent is not agent:
+                problems.append(f"Two different agents are named {agent.name!r}")
+            continue
+
+        names = [getattr(f, "__name__", repr(f)) for f in agent.functions]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            problems.append(
+                f"Agent {agent.name!r} has more than one function named "
+                + ", ".join(repr(name) for name in duplicates)
+            )
+        try:
+            manifest = compile_tools(agent.functions)
+        except Exception as e:
+            problems.append(f"Agent {agent.name!r} has tools that can't be compiled: {e}")
+            manifest = None
+
+        handoffs: List[Tuple[str, str]] = []
+        found: List[Agent] = []
+        for func, name in zip(agent.functions, names):
+            targets = handoff_targets(func)
+            if not targets and name.startswith(_HANDOFF_PREFIX):
+                target = by_slug.get(_slug(name[len(_HANDOFF_PREFIX) :]))
+                if target is None:
+                    warnings.append(
+                        f"{agent.name}.{name}: no target agent found; "
+                        "pass it in the registry"
+                    )
+                    continue
+                targets = [target]
+            handoffs.extend((name, target.name) for target in targets)
+            found.extend(targets)
+
+        # depth first, in function order
+        pending[0:0] = found
+        nodes[agent.name] = AgentNode(agent, manifest, tuple(handoffs))
+        edges[agent.name] = list(dict.fromkeys(target for _, target in handoffs))
+
+    if problems:
+        raise GraphError(problems)
+
+    # everything the entry agent leads to, following the finished edges
+    reachable, frontier = {entry.name}, [entry.name]
+    while frontier:
+        for target in edges[frontier.pop()]:
+            if target not in reachable:
+                reachable.add(target)
+                frontier.append(target)
+    unreachable = tuple(name for name in nodes if name not in reachable)
+    cycles = tuple(
+        tuple(component)
+        for component in _strongly_connected(edges)
+        if len(component) > 1 or component[0] in edges[component[0]]
+    )
+
+    for node in nodes.values():
+        selector = node.agent.tool_selector
+        if selector is not None:
+            index = tool_index(node.manifest)
+            if selector.embed is not None:
+                index.vectors(selector.embed)
+
+    if context_variables is not None:
+        for node in nodes.values():
+            instructions = node.agent.instructions
+            if callable(instructions) and node.agent.memoize_instructions:
+                render_instructions(instructions, context_variables)
+
+    return AgentGraph(entry, nodes, cycles, unreachable, tuple(warnings))
@@ -0,0 +1,207 @@
+import copy
+from collections.abc import Mapping, Sequence
+from itertools import chain, islice
+from typing import Iterable, Optional
+
+# values that can be shared with the caller as they are
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, type(None), frozenset, range)
+
+
+class History(Sequence):
+    """
+    An immutable, append-only message history.
+
+    `append` and `extend` return a new `History` that points back at the one
+    it was built from instead of copying it, so a run only allocates for the
+    messages it adds. Message dicts are shared, never copied or mutated.
+    """
+
+    __slots__ = ("_parent", "_items", "_len")
+
+    def __init__(self, messages: Iterable = (), parent: Optional["History"] = None):
+        if parent is None and isinstance(messages, History):
+            parent, messages = messages, ()
+        self._parent = parent
+        self._items = tuple(messages)
+        self._len = (len(parent) if parent else 0) + len(self._items)
+
+    def append(self, message: dict) -> "History":
+        return History((message,), parent=self)
+
+    def extend(self, messages: Iterable) -> "History":
+        messages = tuple(messages)
+        return History(messages, parent=self) if messages else self
+
+    def _chunks(self):
+        chunks, node = [], self
+        while node is not None:
+            if node._items:
+                chunks.append(node._items)
+            node = node._parent
+        return reversed(chunks)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._chunks())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            # walk back only as far as the slice needs, usually just the tail
+            chunks, node = [], self
+            while node is not None and node._len > start:
+                offset = node._len - len(node._items)
+                chunks.append(node._items[max(start - offset, 0):])
+                node = node._parent
+            return list(islice(chain.from_iterable(reversed(chunks)), max(stop - start, 0)))
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("History index out of range")
+        node = self
+        while node is not None:
+            offset = node._len - len(node._items)
+            if index >= offset:
+                return node._items[index - offset]
+            node = node._parent
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (History, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other: Iterable) -> "History":
+        return self.extend(other)
+
+    def __repr__(self) -> str:
+        return f"History({list(self)!r})"
+
+
+def _private_copy(value):
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+
+class ContextVariables(dict):
+    """
+    A copy-on-write copy of the caller's `context_variables`.
+
+    It is a real dict, so agent functions can `.copy()` it, `json.dumps` it
+    or check `isinstance(..., dict)`, but it starts out sharing the caller's
+    values: anything that isn't a plain immutable value (dicts, lists, custom
+    objects) is deep-copied the first time it is read, so in-place edits by
+    agent functions stay local to the run while values that are never
+    accessed are never copied. Values that can't be deep-copied, such as
+    clients or locks, stay shared.
+    """
+
+    __slots__ = ("_shared",)
+
+    def __init__(self, base: Mapping = None):
+        if isinstance(base, ContextVariables):
+            base = base.to_dict()
+        base = base if base is not None else {}
+        super().__init__(base)
+        # keys whose value is still the caller's object
+        self._shared = {k for k, v in base.items() if not isinstance(v, _IMMUTABLE_TYPES)}
+
+    def _own(self, key) -> None:
+        if key in self._shared:
+            self._shared.discard(key)
+            dict.__setitem__(self, key, _private_copy(dict.__getitem__(self, key)))
+
+    def _own_all(self) -> None:
+        for key in list(self._shared):
+            self._own(key)
+
+    def __getitem__(self, key):
+        self._own(key)
+        return dict.__getitem__(self, key)
+
+    def __iter__(self):
+        # not dict's own iterator, so dict(cv), {**cv} and dict.update(cv)
+        # read values through __getitem__ instead of copying them raw
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value) -> None:
+        self._shared.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key) -> None:
+        self._shared.discard(key)
+        dict.__delitem__(self, key)
+
+    def pop(self, key, *default):
+        self._own(key)
+        self._shared.discard(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        if key in self._shared:
+            self._shared.discard(key)
+            value = _private_copy(value)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __or__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = self.copy()
+        merged.update(other)
+        return merged
+
+    def __ror__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = dict(other)
+        merged.update(self)
+        return merged
+
+    def clear(self) -> None:
+        self._shared.clear()
+        dict.clear(self)
+
+    def values(self):
+        self._own_all()
+        return dict.values(self)
+
+    def items(self):
+        self._own_all()
+        return dict.items(self)
+
+    def copy(self) -> dict:
+        self._own_all()
+        return self.to_dict()
+
+    def to_dict(self) -> dict:
+        """A plain dict of the current values; untouched values are shared with the base."""
+        # dict.copy(self) would go through __iter__ and __getitem__ as well
+        return dict(dict.items(self))
+
+    def __reduce__(self):
+        return (ContextVariables, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"ContextVariables({self.to_dict()!r})"
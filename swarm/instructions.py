@@ -0,0 +1,215 @@
+import copy
+import threading
+import time
+import weakref
+from collections import namedtuple
+from typing import Callable, Mapping
+
+InstructionCacheInfo = namedtuple(
+    "InstructionCacheInfo", ("hits", "misses", "currsize", "render_time")
+)
+
+# recorded for keys the instructions looked up but that weren't set
+MISSING = object()
+# snapshot of a value that can't be copied; it never matches, so never goes stale
+_UNCOPIABLE = object()
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, type(None), frozenset, range)
+
+
+class RecordingContext(dict):
+    """
+    The `defaultdict(str, context_variables)` instructions are called with,
+    recording which keys they read and the values they saw. Reading the
+    whole mapping (iterating, `len`, `copy`, ...) sets `whole`.
+    """
+
+    __slots__ = ("accessed", "whole")
+
+    def __init__(self, context_variables: Mapping):
+        super().__init__(context_variables)
+        self.accessed = {}
+        self.whole = False
+
+    def _seen(self, key):
+        if dict.__contains__(self, key):
+            value = dict.__getitem__(self, key)
+            self.accessed.setdefault(key, value)
+            return value
+        self.accessed.setdefault(key, MISSING)
+        return MISSING
+
+    def __getitem__(self, key):
+        value = self._seen(key)
+        if value is MISSING:
+            # defaultdict(str) behavior
+            dict.__setitem__(self, key, "")
+            return ""
+        return value
+
+    def get(self, key, default=None):
+        value = self._seen(key)
+        return default if value is MISSING else value
+
+    def __contains__(self, key) -> bool:
+        return self._seen(key) is not MISSING
+
+    # reading the whole mapping makes the result depend on all of it
+    def __iter__(self):
+        self.whole = True
+        return dict.__iter__(self)
+
+    def __len__(self) -> int:
+        self.whole = True
+        return dict.__len__(self)
+
+    def keys(self):
+        self.whole = True
+        return dict.keys(self)
+
+    def values(self):
+        self.whole = True
+        return dict.values(self)
+
+    def items(self):
+        self.whole = True
+        return dict.items(self)
+
+    def copy(self) -> dict:
+        self.whole = True
+        return dict(dict.items(self))
+
+    def __repr__(self) -> str:
+        self.whole = True
+        return dict.__repr__(self)
+
+
+def _snapshot(value):
+    # a later in-place edit, to a container or any other object, must not make
+    # a stale entry look current
+    if value is MISSING or isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return _UNCOPIABLE
+
+
+def _same(current, expected) -> bool:
+    try:
+        return current is expected or bool(current == expected)
+    except Exception:
+        return False
+
+
+class _Entry:
+    __slots__ = ("keys", "values", "instructions")
+
+    def __init__(self, recording: RecordingContext, instructions: str):
+        if recording.whole:
+            self.keys = None
+            self.values = {k: _snapshot(v) for k, v in dict.items(recording)}
+            # keys defaulted to "" during the call weren't really there
+            for key, value in recording.accessed.items():
+                if value is MISSING:
+                    self.values.pop(key, None)
+        else:
+            self.keys = tuple(recording.accessed)
+            self.values = tuple(_snapshot(v) for v in recording.accessed.values())
+        self.instructions = instructions
+
+    def matches(self, context_variables: Mapping) -> bool:
+        if self.keys is None:
+            if len(context_variables) != len(self.values):
+                return False
+            return all(
+                _same(context_variables.get(key, MISSING), value)
+                for key, value in self.values.items()
+            )
+        return all(
+            _same(context_variables.get(key, MISSING), value)
+            for key, value in zip(self.keys, self.values)
+        )
+
+
+class InstructionCache:
+    """
+    Memoizes instruction callables on the context variables they read.
+
+    Each render records the keys the callable looked up and the values it
+    saw; later calls reuse the result while those values are unchanged, so
+    a callable that reads `user_name` isn't re-run when `flight_id` changes.
+    Callables must be pure functions of `context_variables`. Values other
+    than plain immutables are compared by `==` against a deep copy, so an
+    object without `__eq__` always re-renders.
+
+    Attributes:
+        maxsize (int): Results kept per callable, most recently used first.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._entries = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._render_time = 0.0
+
+    def render(self, instructions: Callable, context_variables: Mapping) -> str:
+        try:
+            with self._lock:
+                entries = self._entries.setdefault(instructions, [])
+        except TypeError:  # not weak-referenceable, render uncached
+            return instructions(RecordingContext(context_variables))
+
+        with self._lock:
+            candidates = list(entries)
+        for entry in candidates:
+            if entry.matches(context_variables):
+                with self._lock:
+                    self._hits += 1
+                    if entry in entries:
+                        entries.remove(entry)
+                        entries.insert(0, entry)
+                return entry.instructions
+
+        start = time.perf_counter()
+        recording = RecordingContext(context_variables)
+        rendered = instructions(recording)
+        entry = _Entry(recording, rendered)
+        with self._lock:
+            self._misses += 1
+            self._render_time += time.perf_counter() - start
+            entries.insert(0, entry)
+            del entries[self.maxsize :]
+        return rendered
+
+    def info(self) -> InstructionCacheInfo:
+        with self._lock:
+            return InstructionCacheInfo(
+                self._hits,
+                self._misses,
+                sum(len(entries) for entries in self._entries.values()),
+                self._render_time,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+            self._render_time = 0.0
+
+
+_cache = InstructionCache()
+
+
+def render_instructions(instructions: Callable, context_variables: Mapping) -> str:
+    return _cache.render(instructions, context_variables)
+
+
+def instruction_cache_info() -> InstructionCacheInfo:
+    """Hits, misses, cached results and total seconds spent rendering on misses."""
+    return _cache.info()
+
+
+def clear_instruction_cache() -> None:
+    _cache.clear()
@@ -0,0 +1,261 @@
+import json
+import re
+from typing import Any, List, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# a run of string characters that need no special handling
+_STRING_RUN = re.compile(r'[^"\\\x00-\x1f]*')
+_NUMBER_RUN = re.compile(r"[-+0-9.eE]*")
+_LITERAL_RUN = re.compile(r"[a-z]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+# parser states
+_VALUE = 0  # expecting a value
+_VALUE_OR_CLOSE = 1  # just after "["
+_KEY = 2  # expecting a property name
+_KEY_OR_CLOSE = 3  # just after "{"
+_COLON = 4
+_AFTER_VALUE = 5  # expecting "," or a closing bracket
+_STRING = 6
+_NUMBER_TOKEN = 7
+_LITERAL_TOKEN = 8
+_DONE = 9
+
+
+class IncrementalJSONParser:
+    """
+    Parses one JSON value that arrives in fragments, such as a tool call's
+    streamed arguments.
+
+    Each fragment is scanned once and the parser keeps its place between
+    calls to `feed`, so the total cost is linear in the length of the value
+    however it is split. Malformed input raises `json.JSONDecodeError` from
+    the `feed` call that contains the first bad character. `partial()`
+    exposes the fields parsed so far; `value()` returns the finished value.
+    """
+
+    __slots__ = (
+        "_state",
+        "_stack",
+        "_root",
+        "_buffer",
+        "_escaped",
+        "_is_key",
+        "_placeholder",
+        "_offset",
+        "error",
+    )
+
+    def __init__(self):
+        self._state = _VALUE
+        # one [container, key] frame per open object or array
+        self._stack: List[list] = []
+        self._root: Any = None
+        # pieces of the string, number or literal being read
+        self._buffer: List[str] = []
+        self._escaped = False
+        self._is_key = False
+        self._placeholder = False
+        self._offset = 0
+        self.error: Optional[json.JSONDecodeError] = None
+
+    @property
+    def complete(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, fragment: str) -> None:
+        if self.error is not None:
+            raise self.error
+        try:
+            self._scan(fragment)
+        except json.JSONDecodeError as e:
+            self.error = e
+            raise
+        self._offset += len(fragment)
+
+    def _fail(self, message: str, index: int):
+        raise json.JSONDecodeError(message, "", self._offset + index)
+
+    def _scan(self, text: str) -> None:
+        i, n = 0, len(text)
+        while i < n:
+            state = self._state
+            if state == _STRING:
+                if self._escaped:
+                    # the character after a backslash never ends the string
+                    self._buffer.append(text[i])
+                    self._escaped = False
+                    i += 1
+                    continue
+                match = _STRING_RUN.match(text, i)
+                if match.end() > i:
+                    self._buffer.append(match.group())
+                    i = match.end()
+                    if i == n:
+                        break
+                char = text[i]
+                if char == '"':
+                    self._end_string(i)
+                elif char == "\\":
+                    self._buffer.append(char)
+                    self._escaped = True
+                else:
+                    self._fail("Invalid control character at", i)
+                i += 1
+                continue
+            if state == _NUMBER_TOKEN or state == _LITERAL_TOKEN:
+                run = _NUMBER_RUN if state == _NUMBER_TOKEN else _LITERAL_RUN
+                match = run.match(text, i)
+                self._buffer.append(match.group())
+                i = match.end()
+                if state == _LITERAL_TOKEN and not any(
+                    literal.startswith("".join(self._buffer)) for literal in _LITERALS
+                ):
+                    self._fail("Expecting value", i - len(match.group()))
+                if i == n:
+                    break
+                self._end_token(i)
+                continue
+
+            i = _WHITESPACE.match(text, i).end()
+            if i == n:
+                break
+            char = text[i]
+            if state == _VALUE or state == _VALUE_OR_CLOSE:
+                if char == "]" and state == _VALUE_OR_CLOSE:
+                    self._close()
+                elif char == "{":
+                    self._open({}, _KEY_OR_CLOSE)
+                elif char == "[":
+                    self._open([], _VALUE_OR_CLOSE)
+                elif char == '"':
+                    self._start_string(is_key=False)
+                elif char == "-" or "0" <= char <= "9":
+                    self._state = _NUMBER_TOKEN
+                    continue
+                elif char in "tfn":
+                    self._state = _LITERAL_TOKEN
+                    continue
+                else:
+                    self._fail("Expecting value", i)
+            elif state == _KEY or state == _KEY_OR_CLOSE:
+                if char == '"':
+                    self._start_string(is_key=True)
+                elif char == "}" and state == _KEY_OR_CLOSE:
+                    self._close()
+                else:
+                    self._fail("Expecting property name enclosed in double quotes", i)
+            elif state == _COLON:
+                if char != ":":
+                    self._fail("Expecting ':' delimiter", i)
+                self._state = _VALUE
+            elif state == _AFTER_VALUE:
+                container = self._stack[-1][0]
+                if char == ",":
+                    self._state = _KEY if isinstance(container, dict) else _VALUE
+                elif char == ("}" if isinstance(container, dict) else "]"):
+                    self._close()
+                else:
+                    self._fail("Expecting ',' delimiter", i)
+            else:
+                self._fail("Extra data", i)
+            i += 1
+
+    def _open(self, container, state: int) -> None:
+        # containers join their parent as soon as they open, so `partial()` sees them
+        self._attach(container)
+        self._stack.append([container, None])
+        self._state = state
+
+    def _close(self) -> None:
+        self._stack.pop()
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+    def _attach(self, value) -> None:
+        if not self._stack:
+            self._root = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, dict):
+            container[frame[1]] = value
+        elif self._placeholder:
+            container[-1] = value
+        else:
+            container.append(value)
+        self._placeholder = False
+
+    def _start_string(self, is_key: bool) -> None:
+        self._state = _STRING
+        self._is_key = is_key
+        self._buffer = []
+
+    def _end_string(self, index: int) -> None:
+        raw = "".join(self._buffer)
+        self._buffer = []
+        if "\\" in raw:
+            # escapes are rare in arguments; decode just this string
+            try:
+                raw = json.loads(f'"{raw}"')
+            except json.JSONDecodeError:
+                self._fail("Invalid \\escape", index)
+        if self._is_key:
+            self._stack[-1][1] = raw
+            self._state = _COLON
+            return
+        self._attach(raw)
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+    def _end_token(self, index: int) -> None:
+        token = "".join(self._buffer)
+        self._buffer = []
+        if self._state == _LITERAL_TOKEN:
+            if token not in _LITERALS:
+                self._fail("Expecting value", index - len(token))
+            value = _LITERALS[token]
+        else:
+            match = _NUMBER.fullmatch(token)
+            if match is None:
+                self._fail("Expecting value", index - len(token))
+            value = float(token) if match.group(1) or match.group(2) else int(token)
+        self._attach(value)
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+    def partial(self) -> Any:
+        """
+        The value parsed so far, including a string still being read. Open
+        objects and arrays hold only their finished members; the result is
+        live, so copy it before changing it.
+        """
+        if self._state == _STRING and not self._is_key:
+            raw = "".join(self._buffer)
+            if self._escaped:
+                raw = raw[:-1]
+            try:
+                text = json.loads(f'"{raw}"') if "\\" in raw else raw
+            except json.JSONDecodeError:
+                text = raw
+            if self._stack:
+                frame = self._stack[-1]
+                if isinstance(frame[0], list) and not self._placeholder:
+                    frame[0].append(text)
+                    self._placeholder = True
+                else:
+                    self._attach(text)
+                    self._placeholder = isinstance(frame[0], list)
+            else:
+                return text
+        return self._root
+
+    def value(self) -> Any:
+        """The parsed value; raises `json.JSONDecodeError` if it isn't complete."""
+        if self.error is not None:
+            raise self.error
+        if not self._stack and self._state in (_NUMBER_TOKEN, _LITERAL_TOKEN):
+            # a top-level number only ends with the input
+            self._end_token(0)
+        if self._state != _DONE:
+            self.error = json.JSONDecodeError("Unterminated JSON value", "", self._offset)
+            raise self.error
+        return self._root
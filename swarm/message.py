@@ -0,0 +1,140 @@
+import sys
+from collections import namedtuple
+from collections.abc import Mapping
+from typing import Iterable, List, Optional
+
+# one compact record per tool call; `to_dict` rebuilds the nested wire shape
+ToolCall = namedtuple("ToolCall", ("id", "name", "arguments", "type"))
+
+_ASSISTANT_KEYS = ("content", "sender", "role", "function_call", "tool_calls")
+_TOOL_KEYS = ("role", "tool_call_id", "tool_name", "content")
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # roles, senders and tool names repeat on every turn; keep one copy of each
+    return sys.intern(value) if value else value
+
+
+class Message(Mapping):
+    """
+    A compact, read-only chat message produced by a run.
+
+    Behaves like the message dict it stands for (`message["content"]`,
+    `message.get("tool_calls")`, `message == {...}`), but stores its fields
+    in slots, tool calls as tuples and roles/senders as interned strings.
+    `to_dict()` builds the wire dict, which happens only when a request is
+    assembled. Fields other than the common ones live in `extra`.
+    """
+
+    __slots__ = ("role", "content", "sender", "tool_calls", "tool_call_id", "tool_name", "extra")
+
+    def __init__(
+        self,
+        role: str,
+        content=None,
+        sender: Optional[str] = None,
+        tool_calls: Iterable[ToolCall] = (),
+        tool_call_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        extra: Optional[dict] = None,
+    ):
+        self.role = _intern(role)
+        self.content = content
+        self.sender = _intern(sender)
+        self.tool_calls = tuple(tool_calls)
+        self.tool_call_id = tool_call_id
+        self.tool_name = _intern(tool_name)
+        self.extra = extra or None
+
+    @classmethod
+    def assistant(
+        cls,
+        content,
+        sender: Optional[str],
+        tool_calls: Iterable[ToolCall] = (),
+        extra: Optional[dict] = None,
+    ) -> "Message":
+        return cls("assistant", content, sender, tool_calls, extra=extra)
+
+    @classmethod
+    def tool(cls, tool_call_id: str, tool_name: str, content) -> "Message":
+        return cls("tool", content, tool_call_id=tool_call_id, tool_name=tool_name)
+
+    @classmethod
+    def from_completion(cls, message, sender: Optional[str]) -> "Message":
+        """Reads a `ChatCompletionMessage` field by field, without a JSON round trip."""
+        tool_calls = [
+            ToolCall(
+                tool_call.id,
+                _intern(tool_call.function.name),
+                tool_call.function.arguments,
+                tool_call.type,
+            )
+            for tool_call in message.tool_calls or ()
+        ]
+        extra = {}
+        for name in ("refusal", "audio", "function_call"):
+            value = getattr(message, name, None)
+            if value is not None:
+                extra[name] = value.model_dump() if hasattr(value, "model_dump") else value
+        return cls("assistant", message.content, sender, tool_calls, extra=extra)
+
+    def _keys(self) -> tuple:
+        keys = _TOOL_KEYS if self.role == "tool" else _ASSISTANT_KEYS
+        if self.extra:
+            keys += tuple(key for key in self.extra if key not in keys)
+        return keys
+
+    def __getitem__(self, key: str):
+        if key == "tool_calls" and self.role != "tool":
+            return [
+                {
+                    "function": {"arguments": call.arguments, "name": call.name},
+                    "id": call.id,
+                    "type": call.type,
+                }
+                for call in self.tool_calls
+            ] or None
+        if key not in self._keys():
+            raise KeyError(key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return getattr(self, key, None)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def to_dict(self) -> dict:
+        if self.role == "tool":
+            message = {
+                "role": self.role,
+                "tool_call_id": self.tool_call_id,
+                "tool_name": self.tool_name,
+                "content": self.content,
+            }
+        else:
+            message = {
+                "content": self.content,
+                "sender": self.sender,
+                "role": self.role,
+                "function_call": None,
+                "tool_calls": self["tool_calls"],
+            }
+        if self.extra:
+            message.update(self.extra)
+        return message
+
+    def __repr__(self) -> str:
+        return f"Message({self.to_dict()!r})"
+
+
+def wire_message(message) -> dict:
+    return message.to_dict() if isinstance(message, Message) else message
+
+
+def wire_messages(messages: Iterable) -> List[dict]:
+    """Plain message dicts, e.g. for a request or `json.dumps`."""
+    return [wire_message(message) for message in messages]
@@ -0,0 +1,90 @@
+from typing import List, Optional
+
+# Third-party imports
+from pydantic import BaseModel
+
+from .util import estimate_tokens
+
+
+class TurnMetrics(BaseModel):
+    """
+    Timing and usage for a single completion turn. Times are in seconds.
+
+    Attributes:
+        agent (str): Name of the agent that handled the turn.
+        model (str): Model the completion was requested from.
+        build_time (float): Framework time spent building the request.
+        queue_time (float): Time spent waiting on the client-side rate limiter.
+        model_time (float): Time from sending the request to the full completion.
+        time_to_first_token (float): Streaming only, time until the first chunk.
+        attempts (int): Requests made for the completion, counting retries.
+        hedged (bool): Whether a hedged duplicate request was sent.
+        tool_time (float): Time spent executing the turn's tool calls.
+        tool_calls (int): Number of tool calls the turn produced.
+        prompt_tokens (int): Input tokens, from `usage` or estimated.
+        completion_tokens (int): Output tokens, from `usage` or estimated.
+        estimated_usage (bool): Whether token counts were estimated locally.
+        tool_selection_time (float): Time the agent's `tool_selector` took.
+        tool_tokens_saved (int): Estimated tool schema tokens left out by the selector.
+    """
+
+    agent: str = ""
+    model: str = ""
+    build_time: float = 0.0
+    queue_time: float = 0.0
+    model_time: float = 0.0
+    time_to_first_token: Optional[float] = None
+    attempts: int = 1
+    hedged: bool = False
+    tool_time: float = 0.0
+    tool_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_usage: bool = True
+    tool_selection_time: float = 0.0
+    tool_tokens_saved: int = 0
+
+    def record_usage(self, usage, message: dict) -> None:
+        if usage is not None and getattr(usage, "completion_tokens", None) is not None:
+            self.prompt_tokens = usage.prompt_tokens
+            self.completion_tokens = usage.completion_tokens
+            self.estimated_usage = False
+        else:
+            # prompt_tokens keeps the request-time estimate
+            self.completion_tokens = estimate_tokens(message)
+        self.tool_calls = len(message.get("tool_calls") or ())
+
+
+class RunMetrics(BaseModel):
+    """
+    Per-turn records plus a summary for a whole run. Times are in seconds.
+
+    `overhead_time` is wall time not spent waiting on the model or in tools.
+    """
+
+    turns: List[TurnMetrics] = []
+    wall_time: float = 0.0
+    model_time: float = 0.0
+    tool_time: float = 0.0
+    build_time: float = 0.0
+    overhead_time: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_per_second: float = 0.0
+    tool_time_share: float = 0.0
+    tool_tokens_saved: int = 0
+
+    def finish(self, wall_time: float) -> "RunMetrics":
+        self.wall_time = wall_time
+        self.model_time = sum(t.model_time for t in self.turns)
+        self.tool_time = sum(t.tool_time for t in self.turns)
+        self.build_time = sum(t.build_time for t in self.turns)
+        self.overhead_time = max(wall_time - self.model_time - self.tool_time, 0.0)
+        self.prompt_tokens = sum(t.prompt_tokens for t in self.turns)
+        self.completion_tokens = sum(t.completion_tokens for t in self.turns)
+        self.tool_tokens_saved = sum(t.tool_tokens_saved for t in self.turns)
+        self.tokens_per_second = (
+            self.completion_tokens / self.model_time if self.model_time else 0.0
+        )
+        self.tool_time_share = self.tool_time / wall_time if wall_time else 0.0
+        return self
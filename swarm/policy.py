@@ -0,0 +1,291 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Literal, Optional, Union
+
+# Third-party imports
+from pydantic import BaseModel, PrivateAttr
+
+from .cancel import SharedPool
+
+
+class FirstChunkTimeout(TimeoutError):
+    """A streamed completion produced no chunk within the policy's deadline."""
+
+
+@lru_cache(maxsize=None)
+def transient_errors() -> tuple:
+    """Errors worth retrying a completion (or a whole conversation) for."""
+    # openai is imported on first use rather than with `import swarm`
+    import openai
+
+    return (
+        openai.APIConnectionError,
+        openai.APITimeoutError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        ConnectionError,
+        TimeoutError,
+    )
+
+# hedged requests and first-chunk waits run here, never on the caller's thread;
+# a hedged request keeps two workers busy
+_pool = SharedPool("swarm-policy", per_run=2)
+
+
+def policy_executor() -> ThreadPoolExecutor:
+    return _pool.executor()
+
+
+# clients with the SDK's own retries turned off, so a policy's attempts are the only ones
+_single_attempt_clients = weakref.WeakKeyDictionary()
+_single_attempt_lock = threading.Lock()
+
+
+def single_attempt_client(client):
+    """
+    `client` with its built-in retries turned off, for requests under a
+    policy: `max_attempts` then counts every request sent and `timeout`
+    bounds each one. Clients without `with_options` (e.g. mocks) are used as is.
+    """
+    if getattr(type(client), "with_options", None) is None:
+        return client
+    with _single_attempt_lock:
+        try:
+            single = _single_attempt_clients.get(client)
+        except TypeError:  # not weak-referenceable
+            return client.with_options(max_retries=0)
+        if single is None:
+            single = _single_attempt_clients[client] = client.with_options(max_retries=0)
+        return single
+
+
+class CompletionPolicy(BaseModel):
+    """
+    Retry, timeout and hedging policy for completion requests.
+
+    Attributes:
+        timeout (float): Per-attempt request timeout in seconds.
+        first_chunk_timeout (float): Streaming only, max wait for the first chunk.
+        max_attempts (int): Attempts per completion, including the first.
+        backoff_base (float): Base delay for exponential backoff, in seconds.
+        backoff_max (float): Cap on a single backoff delay.
+        jitter (bool): Use full jitter on backoff delays.
+        retry_budget (float): Retries allowed as a fraction of requests made,
+            on top of `retry_budget_min`, so a failing upstream isn't hammered.
+        retry_budget_min (int): Retries always allowed regardless of the ratio.
+        hedge_after (float or "p95"): Send a duplicate non-streamed request if the
+            first hasn't answered after this many seconds (or the model's observed
+            p95 latency) and take whichever answers first.
+        hedge_min_samples (int): Latency samples needed before "p95" hedging starts.
+        retry_on (tuple): Exception types that are retried, by default
+            `transient_errors()`.
+    """
+
+    timeout: Optional[float] = None
+    first_chunk_timeout: Optional[float] = None
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    jitter: bool = True
+    retry_budget: float = 0.2
+    retry_budget_min: int = 10
+    hedge_after: Union[float, Literal["p95"], None] = None
+    hedge_min_samples: int = 20
+    retry_on: Optional[tuple] = None
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _latencies: dict = PrivateAttr(default_factory=lambda: defaultdict(lambda: deque(maxlen=200)))
+    _requests: int = PrivateAttr(default=0)
+    _retries: int = PrivateAttr(default=0)
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def observe(self, model: str, latency: float) -> None:
+        with self._lock:
+            self._latencies[model].append(latency)
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        if self.hedge_after != "p95":
+            return self.hedge_after
+        with self._lock:
+            samples = sorted(self._latencies[model])
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+
+    def start_request(self) -> None:
+        with self._lock:
+            self._requests += 1
+
+    def allow_retry(self) -> bool:
+        with self._lock:
+            if self._retries >= self.retry_budget_min + self.retry_budget * self._requests:
+                return False
+            self._retries += 1
+            return True
+
+    def retryable(self) -> tuple:
+        return self.retry_on if self.retry_on is not None else transient_errors()
+
+    def request_kwargs(self) -> dict:
+        return {"timeout": self.timeout} if self.timeout is not None else {}
+
+
+class PolicyOutcome:
+    __slots__ = ("attempts", "hedged")
+
+    def __init__(self):
+        self.attempts = 0
+        self.hedged = False
+
+
+def close_stream(stream) -> None:
+    close = getattr(stream, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+async def aclose_stream(stream) -> None:
+    close = getattr(stream, "close", None)
+    if close is not None:
+        try:
+            await close()
+        except Exception:
+            pass
+
+
+def first_chunk(stream, timeout: float):
+    iterator = iter(stream)
+    future = policy_executor().submit(next, iterator, None)
+    try:
+        chunk = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        close_stream(stream)
+        raise FirstChunkTimeout(f"No chunk received within {timeout}s")
+    return chain((chunk,), iterator) if chunk is not None else iter(())
+
+
+def hedged(send: Callable, delay: float, outcome: PolicyOutcome):
+    executor = policy_executor()
+    primary = executor.submit(send)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+    outcome.hedged = True
+    pending = {primary, executor.submit(send)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def call_with_policy(policy: CompletionPolicy, send: Callable, model: str, stream: bool):
+    """Calls `send()` under `policy`. Returns `(completion, outcome)`."""
+    outcome = PolicyOutcome()
+    while True:
+        outcome.attempts += 1
+        policy.start_request()
+        start = time.perf_counter()
+        try:
+            delay = None if stream else policy.hedge_delay(model)
+            completion = hedged(send, delay, outcome) if delay is not None else send()
+            if stream and policy.first_chunk_timeout is not None:
+                completion = first_chunk(completion, policy.first_chunk_timeout)
+            if not stream:
+                policy.observe(model, time.perf_counter() - start)
+            return completion, outcome
+        except policy.retryable():
+            if outcome.attempts >= policy.max_attempts or not policy.allow_retry():
+                raise
+        time.sleep(policy.backoff(outcome.attempts))
+
+
+async def afirst_chunk(stream, timeout: float):
+    iterator = stream.__aiter__()
+    try:
+        chunk = await asyncio.wait_for(iterator.__anext__(), timeout)
+    except StopAsyncIteration:
+        chunk = None
+    except asyncio.TimeoutError:
+        await aclose_stream(stream)
+        raise FirstChunkTimeout(f"No chunk received within {timeout}s")
+
+    async def chunks():
+        if chunk is None:
+            return
+        yield chunk
+        async for rest in iterator:
+            yield rest
+
+    return chunks()
+
+
+async def ahedged(send: Callable, delay: float, outcome: PolicyOutcome):
+    primary = asyncio.ensure_future(send())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+    outcome.hedged = True
+    pending = {primary, asyncio.ensure_future(send())}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def acall_with_policy(
+    policy: CompletionPolicy, send: Callable, model: str, stream: bool
+):
+    """The async counterpart of `call_with_policy`; `send` is a coroutine function."""
+    outcome = PolicyOutcome()
+
+    async def attempt():
+        if policy.timeout is None:
+            return await send()
+        return await asyncio.wait_for(send(), policy.timeout)
+
+    while True:
+        outcome.attempts += 1
+        policy.start_request()
+        start = time.perf_counter()
+        try:
+            delay = None if stream else policy.hedge_delay(model)
+            if delay is not None:
+                completion = await ahedged(attempt, delay, outcome)
+            else:
+                completion = await attempt()
+            if stream and policy.first_chunk_timeout is not None:
+                completion = await afirst_chunk(completion, policy.first_chunk_timeout)
+            if not stream:
+                policy.observe(model, time.perf_counter() - start)
+            return completion, outcome
+        except (asyncio.TimeoutError, *policy.retryable()):
+            if outcome.attempts >= policy.max_attempts or not policy.allow_retry():
+                raise
+        await asyncio.sleep(policy.backoff(outcome.attempts))
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+# Third-party imports
+from pydantic import BaseModel
+
+
+class RateLimits(BaseModel):
+    """
+    Client-side limits for one model.
+
+    Attributes:
+        rpm (int): Requests per minute, or None for no request limit.
+        tpm (int): Estimated tokens per minute, or None for no token limit.
+    """
+
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+
+
+class TokenBucket:
+    """A bucket holding up to `capacity` units, refilled continuously over a minute."""
+
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def deficit_wait(self, amount: float) -> float:
+        # seconds until `amount` units are available (amount is capped at capacity)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class ModelLimiter:
+    __slots__ = (
+        "requests",
+        "tokens",
+        "waiting",
+        "max_waiting",
+        "total_requests",
+        "total_tokens",
+        "throttled",
+        "wait_time",
+    )
+
+    def __init__(self, limits: RateLimits):
+        self.requests = TokenBucket(limits.rpm) if limits.rpm else None
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm else None
+        self.waiting = 0
+        self.max_waiting = 0
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+    def try_acquire(self, tokens: int) -> float:
+        """Takes capacity and returns 0, or returns how long to wait before retrying."""
+        now = time.monotonic()
+        wait = 0.0
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                wait = max(wait, bucket.deficit_wait(amount))
+        if wait > 0:
+            return wait
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+        self.total_requests += 1
+        self.total_tokens += tokens
+        return 0.0
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter keyed by model, safe to share across threads,
+    event loops and `Swarm` instances.
+
+    `acquire` blocks (and `aacquire` awaits) until both the requests/min and
+    the estimated tokens/min buckets for the model have room.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, RateLimits] = None,
+        default: Optional[RateLimits] = None,
+    ):
+        self.limits = dict(limits or {})
+        self.default = default
+        self._models: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, model: str) -> Optional[ModelLimiter]:
+        limiter = self._models.get(model)
+        if limiter is None:
+            limits = self.limits.get(model, self.default)
+            if limits is None:
+                return None
+            limiter = self._models.setdefault(model, ModelLimiter(limits))
+        return limiter
+
+    def _try(self, model: str, tokens: int, queued: bool):
+        with self._lock:
+            limiter = self._limiter(model)
+            if limiter is None:
+                return None, 0.0
+            wait = limiter.try_acquire(tokens)
+            if wait > 0 and not queued:
+                limiter.waiting += 1
+                limiter.throttled += 1
+                limiter.max_waiting = max(limiter.max_waiting, limiter.waiting)
+            return limiter, wait
+
+    def _done(self, limiter: ModelLimiter, waited: float) -> None:
+        with self._lock:
+            limiter.waiting -= 1
+            limiter.wait_time += waited
+
+    def acquire(self, model: str, tokens: int = 0) -> float:
+        """Blocks until the request may be sent. Returns the seconds spent waiting."""
+        start, queued = time.monotonic(), False
+        while True:
+            limiter, wait = self._try(model, tokens, queued)
+            if wait <= 0:
+                if not queued:
+                    return 0.0
+                waited = time.monotonic() - start
+                self._done(limiter, waited)
+                return waited
+            queued = True
+            time.sleep(wait)
+
+    async def aacquire(self, model: str, tokens: int = 0) -> float:
+        """Awaits until the request may be sent. Returns the seconds spent waiting."""
+        start, queued = time.monotonic(), False
+        while True:
+            limiter, wait = self._try(model, tokens, queued)
+            if wait <= 0:
+                if not queued:
+                    return 0.0
+                waited = time.monotonic() - start
+                self._done(limiter, waited)
+                return waited
+            queued = True
+            await asyncio.sleep(wait)
+
+    def settle(self, model: str, estimated: int, actual: int) -> None:
+        """Corrects the token bucket once the real usage of a request is known."""
+        with self._lock:
+            limiter = self._models.get(model)
+            if limiter is None or limiter.tokens is None:
+                return
+            difference = actual - estimated
+            limiter.tokens.level = min(
+                limiter.tokens.capacity, limiter.tokens.level - difference
+            )
+            limiter.total_tokens += difference
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-model queue depth and throughput counters."""
+        with self._lock:
+            return {
+                model: {
+                    "waiting": limiter.waiting,
+                    "max_waiting": limiter.max_waiting,
+                    "requests": limiter.total_requests,
+                    "tokens": limiter.total_tokens,
+                    "throttled": limiter.throttled,
+                    "wait_time": limiter.wait_time,
+                }
+                for model, limiter in self._models.items()
+            }
+
+
+_shared_rate_limiter: Optional[RateLimiter] = None
+
+
+def configure_rate_limits(
+    limits: Dict[str, RateLimits] = None, default: Optional[RateLimits] = None
+) -> RateLimiter:
+    """Installs the process-wide limiter used by every `Swarm` without its own."""
+    global _shared_rate_limiter
+    _shared_rate_limiter = RateLimiter(limits, default)
+    return _shared_rate_limiter
+
+
+def shared_rate_limiter() -> Optional[RateLimiter]:
+    return _shared_rate_limiter
+
+
+def reset_rate_limits() -> None:
+    global _shared_rate_limiter
+    _shared_rate_limiter = None
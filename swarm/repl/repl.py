@@ -1,6 +1,7 @@
 import json
 
 from swarm import Swarm
+from swarm.history import History
 
 
 def process_and_print_streaming_response(response):
@@ -63,12 +64,12 @@ def run_demo_loop(
     client = Swarm()
     print("Starting Swarm CLI 🐝")
 
-    messages = []
+    messages = History()
     agent = starting_agent
 
     while True:
         user_input = input("\033[90mUser\033[0m: ")
-        messages.append({"role": "user", "content": user_input})
+        messages = messages.append({"role": "user", "content": user_input})
 
         response = client.run(
             agent=agent,
@@ -83,5 +84,5 @@ def run_demo_loop(
         else:
             pretty_print_messages(response.messages)
 
-        messages.extend(response.messages)
+        messages = messages.extend(response.messages)
         agent = response.agent
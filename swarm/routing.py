@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Literal, Optional
+
+# Third-party imports
+from pydantic import BaseModel, PrivateAttr
+
+from .policy import transient_errors
+
+
+class ModelStats:
+    """Rolling latency and error record for one model."""
+
+    __slots__ = ("outcomes", "tripped_at", "requests", "errors", "failovers")
+
+    def __init__(self, window: int):
+        # (latency, ok) for the last `window` requests
+        self.outcomes = deque(maxlen=window)
+        self.tripped_at: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.failovers = 0
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, ok in self.outcomes if not ok) / len(self.outcomes)
+
+    def latency(self) -> Optional[float]:
+        latencies = [latency for latency, ok in self.outcomes if ok]
+        return sum(latencies) / len(latencies) if latencies else None
+
+
+class ModelRouter(BaseModel):
+    """
+    Picks the model for each of an agent's requests from an ordered list,
+    failing over to the next model on errors and steering away from models
+    that are erroring or breaching their latency SLO.
+
+    Attributes:
+        models (List[str]): Candidate models, most preferred (e.g. cheapest) first.
+        strategy (str): "ordered" keeps the declared order among healthy models;
+            "fastest" prefers the healthy model with the lowest mean latency.
+        latency_slo (float): Mean latency in seconds above which a model is
+            considered unhealthy.
+        error_threshold (float): Error rate above which a model is unhealthy.
+        window (int): Number of recent requests the stats are computed over.
+        min_samples (int): Requests needed before a model can be marked unhealthy.
+        cooldown (float): Seconds an unhealthy model is demoted before it is
+            tried again with fresh stats.
+        failover_on (tuple): Exception types that move on to the next model, by
+            default `transient_errors()`.
+    """
+
+    models: List[str]
+    strategy: Literal["ordered", "fastest"] = "ordered"
+    latency_slo: Optional[float] = None
+    error_threshold: float = 0.5
+    window: int = 50
+    min_samples: int = 5
+    cooldown: float = 30.0
+    failover_on: Optional[tuple] = None
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, ModelStats] = PrivateAttr(default_factory=dict)
+
+    def _model_stats(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats.setdefault(model, ModelStats(self.window))
+        return stats
+
+    def _healthy(self, stats: ModelStats, now: float) -> bool:
+        if stats.tripped_at is None:
+            return True
+        if now - stats.tripped_at >= self.cooldown:
+            # half-open: start over and let traffic decide again
+            stats.tripped_at = None
+            stats.outcomes.clear()
+            return True
+        return False
+
+    def candidates(self) -> List[str]:
+        """Models to try for the next request, in order."""
+        now = time.monotonic()
+        with self._lock:
+            healthy, demoted = [], []
+            for model in self.models:
+                stats = self._model_stats(model)
+                (healthy if self._healthy(stats, now) else demoted).append(model)
+            if self.strategy == "fastest":
+                # unmeasured models sort first so they get measured
+                healthy.sort(key=lambda m: self._stats[m].latency() or 0.0)
+        # demoted models are still a last resort
+        return healthy + demoted
+
+    def record(self, model: str, latency: float, ok: bool = True) -> None:
+        with self._lock:
+            stats = self._model_stats(model)
+            stats.requests += 1
+            stats.errors += not ok
+            stats.outcomes.append((latency, ok))
+            if len(stats.outcomes) < self.min_samples:
+                return
+            mean = stats.latency()
+            breached = stats.error_rate() > self.error_threshold or (
+                self.latency_slo is not None and mean is not None and mean > self.latency_slo
+            )
+            if breached and stats.tripped_at is None:
+                stats.tripped_at = time.monotonic()
+
+    def failover_errors(self) -> tuple:
+        return self.failover_on if self.failover_on is not None else transient_errors()
+
+    def record_failover(self, model: str) -> None:
+        with self._lock:
+            self._model_stats(model).failovers += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-model rolling latency, error rate and health."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model: {
+                    "healthy": stats.tripped_at is None
+                    or now - stats.tripped_at >= self.cooldown,
+                    "latency": stats.latency(),
+                    "error_rate": stats.error_rate(),
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "failovers": stats.failovers,
+                }
+                for model, stats in self._stats.items()
+            }
@@ -0,0 +1,199 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence
+
+# Third-party imports
+from pydantic import BaseModel
+
+from .util import estimate_text_tokens
+
+ToolSelection = namedtuple(
+    "ToolSelection", ("tools", "names", "tokens", "tokens_saved", "time")
+)
+
+# splits snake_case, camelCase and prose alike
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from get i in is it me my of on or "
+    "please the this that to was what with you your".split()
+)
+_HANDOFF_PREFIX = "transfer_to_"
+
+
+def tokenize(text: str) -> List[str]:
+    terms = []
+    for word in _WORD.findall(text or ""):
+        word = word.lower()
+        if word in _STOPWORDS:
+            continue
+        # "orders" and "order" should match
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class BM25:
+    """Okapi BM25 over a fixed set of tokenized documents."""
+
+    __slots__ = ("k1", "b", "term_counts", "lengths", "average_length", "idf")
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(document) for document in documents]
+        self.lengths = [len(document) for document in documents]
+        self.average_length = sum(self.lengths) / len(documents) if documents else 0.0
+        frequency = Counter(term for counts in self.term_counts for term in counts)
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in frequency.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        terms = [term for term in set(query) if term in self.idf]
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+
+def tool_text(tool: dict) -> str:
+    function = tool["function"]
+    parameters = function.get("parameters", {}).get("properties", {})
+    # the name counts twice: it is the most telling part of a tool
+    return " ".join(
+        [function["name"], function["name"], function.get("description", ""), *parameters]
+    )
+
+
+class ToolIndex:
+    """
+    Per-manifest data for tool selection, built once: the BM25 index, each
+    tool's token estimate, which tools hand off, and embeddings per `embed`.
+    """
+
+    def __init__(self, manifest):
+        from .graph import handoff_targets
+
+        self.names = [tool["function"]["name"] for tool in manifest.tools]
+        self.texts = [tool_text(tool) for tool in manifest.tools]
+        self.bm25 = BM25([tokenize(text) for text in self.texts])
+        self.tokens = [estimate_text_tokens(json.dumps(tool)) for tool in manifest.tools]
+        self.handoffs = frozenset(
+            name
+            for name, func in manifest.function_map.items()
+            if name.startswith(_HANDOFF_PREFIX) or handoff_targets(func)
+        )
+        self._vectors = {}
+        self._lock = threading.Lock()
+
+    def vectors(self, embed: Callable) -> List[Sequence[float]]:
+        with self._lock:
+            vectors = self._vectors.get(embed)
+        if vectors is None:
+            vectors = list(embed(self.texts))
+            with self._lock:
+                self._vectors[embed] = vectors
+        return vectors
+
+
+@lru_cache(maxsize=1024)
+def tool_index(manifest) -> ToolIndex:
+    return ToolIndex(manifest)
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _text(content) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text") or "" for part in content if isinstance(part, dict))
+    return content or ""
+
+
+class ToolSelector(BaseModel):
+    """
+    Sends an agent's most relevant tools instead of all of them, ranked by
+    how well each tool's name, description and parameters match the end of
+    the conversation. Handoff tools, `pinned` tools and tools called within
+    the scored messages are always sent. When nothing matches, every tool is
+    sent.
+
+    Attributes:
+        top_k (int): Ranked tools sent besides the always-sent ones.
+        window (int): Trailing messages, system prompt excluded, to match against.
+        pinned (list): Names of functions to always send.
+        embed (callable): Optional `embed(texts) -> vectors`, to rank by cosine
+            similarity instead of BM25. Tool vectors are computed once per
+            manifest; the conversation tail is embedded every turn.
+    """
+
+    top_k: int = 8
+    window: int = 4
+    pinned: List[str] = []
+    embed: Optional[Callable] = None
+
+    def select(self, manifest, messages: List[dict]) -> ToolSelection:
+        start = time.perf_counter()
+        index = tool_index(manifest)
+        if len(index.names) <= self.top_k:
+            elapsed = time.perf_counter() - start
+            return ToolSelection(manifest.tools, index.names, sum(index.tokens), 0, elapsed)
+
+        tail = [m for m in messages if m.get("role") != "system"][-self.window :]
+        query = " ".join(_text(m.get("content")) for m in tail)
+        # a tool in the middle of being used stays available
+        keep = set(self.pinned) | index.handoffs
+        for message in tail:
+            for tool_call in message.get("tool_calls") or ():
+                keep.add(tool_call["function"]["name"])
+            if message.get("role") == "tool":
+                keep.add(message.get("tool_name"))
+
+        if self.embed is not None:
+            vectors = index.vectors(self.embed)
+            query_vector = list(self.embed([query]))[0] if query else None
+            scores = [
+                _cosine(query_vector, vector) if query_vector is not None else 0.0
+                for vector in vectors
+            ]
+        else:
+            scores = index.bm25.scores(tokenize(query))
+
+        ranked = sorted(
+            (i for i, name in enumerate(index.names) if name not in keep),
+            key=lambda i: -scores[i],
+        )
+        if not ranked or scores[ranked[0]] <= 0:
+            chosen = range(len(index.names))
+        else:
+            chosen = sorted(
+                {i for i, name in enumerate(index.names) if name in keep}
+                | {i for i in ranked[: self.top_k] if scores[i] > 0}
+            )
+        # the manifest's order, so the tools list stays stable across turns
+        tools = [manifest.tools[i] for i in chosen]
+        tokens = sum(index.tokens[i] for i in chosen)
+        return ToolSelection(
+            tools,
+            [index.names[i] for i in chosen],
+            tokens,
+            sum(index.tokens) - tokens,
+            time.perf_counter() - start,
+        )
@@ -0,0 +1,139 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from .jsonstream import IncrementalJSONParser
+from .message import Message, ToolCall
+
+
+class ToolCallBuffer:
+    __slots__ = ("id", "type", "name", "arguments", "parser")
+
+    def __init__(self):
+        self.id = ""
+        self.type = ""
+        self.name: List[str] = []
+        self.arguments: List[str] = []
+        self.parser = IncrementalJSONParser()
+
+    def add_arguments(self, fragment: str) -> None:
+        self.arguments.append(fragment)
+        if self.parser.error is None:
+            try:
+                self.parser.feed(fragment)
+            except json.JSONDecodeError:
+                # kept on the parser; raised when the call is resolved
+                pass
+
+    def arguments_complete(self) -> bool:
+        # malformed arguments are final too, so the error surfaces early
+        return self.parser.complete or self.parser.error is not None
+
+    def parsed_arguments(self) -> Optional[Any]:
+        return self.parser.value() if self.parser.complete else None
+
+    def to_tool_call(self) -> ToolCall:
+        return ToolCall(self.id, "".join(self.name), "".join(self.arguments), self.type)
+
+
+class StreamAccumulator:
+    """
+    Builds the assistant message for one streamed turn.
+
+    Reads delta attributes directly and appends content and tool call
+    fragments to list buffers, which are joined once in `message()`.
+    """
+
+    __slots__ = ("sender", "content", "tool_calls", "dispatched")
+
+    def __init__(self, sender: str):
+        self.sender = sender
+        self.content: List[str] = []
+        self.tool_calls: dict = {}
+        self.dispatched: set = set()
+
+    def add(self, delta) -> None:
+        if delta.content:
+            self.content.append(delta.content)
+        for tool_call in delta.tool_calls or ():
+            buffer = self.tool_calls.get(tool_call.index)
+            if buffer is None:
+                buffer = self.tool_calls[tool_call.index] = ToolCallBuffer()
+            if tool_call.id:
+                buffer.id += tool_call.id
+            if tool_call.type:
+                buffer.type += tool_call.type
+            function = tool_call.function
+            if function is not None:
+                if function.name:
+                    buffer.name.append(function.name)
+                if function.arguments:
+                    buffer.add_arguments(function.arguments)
+
+    def ready_tool_calls(self, final: bool = False) -> List[Tuple[int, ToolCall, Any]]:
+        """
+        Tool calls whose arguments are complete and that haven't been handed
+        out yet, with their parsed arguments (None if they didn't parse): any
+        call followed by a newer index, a call whose arguments form a whole
+        JSON value or are already malformed, or, once the stream has ended
+        (`final`), all.
+        """
+        ready = []
+        latest = max(self.tool_calls, default=None)
+        for index in sorted(self.tool_calls):
+            if index in self.dispatched:
+                continue
+            buffer = self.tool_calls[index]
+            if final or index < latest or buffer.arguments_complete():
+                self.dispatched.add(index)
+                ready.append((index, buffer.to_tool_call(), buffer.parsed_arguments()))
+        return ready
+
+    def partial_arguments(self, index: int) -> Any:
+        """The arguments of tool call `index` parsed so far, e.g. to show progress."""
+        return self.tool_calls[index].parser.partial()
+
+    def parsed_arguments(self) -> Dict[str, Any]:
+        """Parsed arguments by tool call id, for the calls whose arguments are complete."""
+        return {
+            buffer.id: buffer.parsed_arguments()
+            for buffer in self.tool_calls.values()
+            if buffer.parser.complete
+        }
+
+    def message(self) -> Message:
+        return Message.assistant(
+            "".join(self.content),
+            self.sender,
+            [self.tool_calls[index].to_tool_call() for index in sorted(self.tool_calls)],
+        )
+
+
+def tool_call_delta_dict(tool_call) -> dict:
+    function = tool_call.function
+    return {
+        "index": tool_call.index,
+        "id": tool_call.id,
+        "function": {
+            "arguments": function.arguments if function else None,
+            "name": function.name if function else None,
+        },
+        "type": tool_call.type,
+    }
+
+
+def delta_event(delta, sender: Optional[str]) -> dict:
+    """
+    The event yielded to stream consumers for a delta: the same shape as the
+    delta's JSON form, built from attributes instead of a JSON round trip.
+    """
+    event = {}
+    for name in type(delta).model_fields:
+        value = getattr(delta, name)
+        if name == "tool_calls" and value is not None:
+            value = [tool_call_delta_dict(tool_call) for tool_call in value]
+        elif hasattr(value, "model_dump"):
+            value = value.model_dump()
+        event[name] = value
+    if event.get("role") == "assistant":
+        event["sender"] = sender
+    return event
@@ -0,0 +1,97 @@
+import json
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from .types import AgentFunction
+from .util import estimate_text_tokens, function_to_json
+
+__CTX_VARS_NAME__ = "context_variables"
+__TIMEOUT_ATTR__ = "__tool_timeout__"
+
+
+def tool_timeout(seconds: Optional[float]) -> Callable:
+    """
+    Declares how long a function may run as a tool before the run gives up on
+    it and tells the model it timed out. Overrides `Agent.tool_timeout`.
+
+        @tool_timeout(10)
+        def search_flights(origin, destination): ...
+    """
+
+    def decorate(func):
+        setattr(func, __TIMEOUT_ATTR__, seconds)
+        return func
+
+    return decorate
+
+
+class ToolManifest:
+    """
+    The compiled, per-turn-invariant view of an agent's functions.
+
+    Attributes:
+        tools (list): Chat Completions `tools` schemas, with `context_variables` hidden.
+        function_map (dict): Function name to function.
+        context_functions (frozenset): Names of functions that take `context_variables`.
+        timeouts (dict): Function name to the timeout declared with `tool_timeout`.
+        tokens (int): Estimated prompt tokens the tool schemas add to a request.
+    """
+
+    __slots__ = (
+        "functions",
+        "tools",
+        "function_map",
+        "context_functions",
+        "timeouts",
+        "tokens",
+    )
+
+    def __init__(self, functions: Tuple[AgentFunction, ...]):
+        self.functions = functions
+        self.tools = [function_to_json(f) for f in functions]
+        # hide context_variables from model
+        for tool in self.tools:
+            params = tool["function"]["parameters"]
+            params["properties"].pop(__CTX_VARS_NAME__, None)
+            if __CTX_VARS_NAME__ in params["required"]:
+                params["required"].remove(__CTX_VARS_NAME__)
+
+        self.function_map = {f.__name__: f for f in functions}
+        self.context_functions = frozenset(
+            f.__name__
+            for f in functions
+            if __CTX_VARS_NAME__ in f.__code__.co_varnames
+        )
+        self.timeouts = {
+            f.__name__: getattr(f, __TIMEOUT_ATTR__)
+            for f in functions
+            if hasattr(f, __TIMEOUT_ATTR__)
+        }
+        self.tokens = estimate_text_tokens(json.dumps(self.tools)) if self.tools else 0
+
+
+@lru_cache(maxsize=1024)
+def _compile_tools(functions: Tuple[AgentFunction, ...]) -> ToolManifest:
+    return ToolManifest(functions)
+
+
+def compile_tools(functions: List[AgentFunction]) -> ToolManifest:
+    """
+    Returns the ToolManifest for a list of agent functions.
+
+    Manifests are cached on the tuple of functions, so reassigning or
+    mutating `Agent.functions` naturally produces a new manifest.
+    """
+    functions = tuple(functions)
+    try:
+        return _compile_tools(functions)
+    except TypeError:  # unhashable callable, compile uncached
+        return ToolManifest(functions)
+
+
+def tool_cache_info():
+    return _compile_tools.cache_info()
+
+
+def clear_tool_cache() -> None:
+    _compile_tools.cache_clear()
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, List, Optional
+
+# a hook is any callable taking one event dict
+TraceHook = Callable[[dict], None]
+
+
+class RunTrace:
+    """
+    Emits events for a single run to the registered hooks.
+
+    Every event carries `event`, `run_id` and a wall-clock `time`; `*_end`
+    and `completion_response` events also carry a `duration` in seconds.
+    """
+
+    __slots__ = ("hooks", "run_id")
+
+    def __init__(self, hooks: List[TraceHook], run_id: Optional[str] = None):
+        self.hooks = hooks
+        self.run_id = run_id or uuid.uuid4().hex
+
+    def emit(self, event: str, **fields) -> None:
+        record = {"event": event, "run_id": self.run_id, "time": time.time(), **fields}
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                # tracing must never break a run
+                pass
+
+
+def start_trace(
+    hooks: List[TraceHook], run_id: Optional[str] = None, **fields
+) -> Optional[RunTrace]:
+    # no hooks, no trace: callers guard every emit on `trace is not None`
+    if not hooks:
+        return None
+    trace = RunTrace(hooks, run_id)
+    trace.emit("run_start", **fields)
+    return trace
+
+
+class JSONLExporter:
+    """Appends each event as one JSON line to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1)
+
+    def __call__(self, event: dict) -> None:
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RingBufferExporter:
+    """Keeps the last `capacity` events in memory."""
+
+    def __init__(self, capacity: int = 10_000):
+        self.buffer = deque(maxlen=capacity)
+
+    def __call__(self, event: dict) -> None:
+        self.buffer.append(event)
+
+    def events(self, event: Optional[str] = None, run_id: Optional[str] = None) -> List[dict]:
+        return [
+            e
+            for e in list(self.buffer)
+            if (event is None or e["event"] == event)
+            and (run_id is None or e["run_id"] == run_id)
+        ]
+
+    def clear(self) -> None:
+        self.buffer.clear()
@@ -0,0 +1,266 @@
+import asyncio
+import importlib
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Optional
+
+# Third-party imports
+from pydantic import BaseModel
+
+
+class PoolConfig(BaseModel):
+    """
+    Connection pool settings for the process-wide OpenAI clients.
+
+    Attributes:
+        max_connections (int): Cap on open connections per client.
+        max_keepalive_connections (int): Idle connections kept open for reuse.
+        keepalive_expiry (float): Seconds an idle connection is kept alive.
+        http2 (bool): Negotiate HTTP/2 when the `h2` package is installed.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def http_library():
+    """
+    The HTTP package the installed `openai` is built on: `httpx`, or `httpx2`
+    in newer releases. None if it can't be told.
+    """
+    try:
+        from openai import DefaultHttpxClient
+    except ImportError:
+        return None
+    for cls in DefaultHttpxClient.__mro__[1:]:
+        package = cls.__module__.partition(".")[0]
+        if package not in ("openai", "builtins"):
+            return importlib.import_module(package)
+    return None
+
+
+class PoolStats:
+    """Request counters fed by the pooled clients' transports."""
+
+    __slots__ = ("_lock", "requests", "in_flight", "max_in_flight")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def started(self, request=None) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finished(self, response=None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+class CountingTransport:
+    """
+    Wraps a pooled client's transport to count its requests, including the
+    ones that end in a connection error or a timeout.
+    """
+
+    def __init__(self, transport, stats: PoolStats):
+        self.transport = transport
+        self.stats = stats
+
+    def handle_request(self, request):
+        self.stats.started(request)
+        try:
+            return self.transport.handle_request(request)
+        finally:
+            self.stats.finished()
+
+    async def handle_async_request(self, request):
+        self.stats.started(request)
+        try:
+            return await self.transport.handle_async_request(request)
+        finally:
+            self.stats.finished()
+
+    def __getattr__(self, name):
+        # close(), aclose() and the connection pool
+        return getattr(self.transport, name)
+
+    def __enter__(self):
+        self.transport.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.transport.__exit__(*exc_info)
+
+    async def __aenter__(self):
+        await self.transport.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.transport.__aexit__(*exc_info)
+
+
+def pool_connections(http_client) -> Optional[list]:
+    # the pool sits behind the HTTP client's private transport; best effort only
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    return list(connections) if connections is not None else None
+
+
+class ClientRegistry:
+    """
+    Hands out shared `OpenAI` / `AsyncOpenAI` clients over one tuned keep-alive
+    pool, so every `Swarm()` built without a client reuses connections and TLS
+    sessions. Clients are keyed on the API key and base URL in the environment;
+    async clients are also keyed on the event loop they were created in, since
+    pooled connections can't move between loops, and dropped with their loop.
+    Falls back to plain clients if the HTTP package `openai` uses can't be
+    tuned.
+    """
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        self.config = config or PoolConfig()
+        self.pool_stats = PoolStats()
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._loopless_async_clients = {}
+        self._http_clients = weakref.WeakSet()
+
+    def _key(self):
+        return os.environ.get("OPENAI_API_KEY"), os.environ.get("OPENAI_BASE_URL")
+
+    def _transport(self, is_async: bool) -> Optional[CountingTransport]:
+        http = http_library()
+        transport_class = getattr(
+            http, "AsyncHTTPTransport" if is_async else "HTTPTransport", None
+        )
+        if transport_class is None or not hasattr(http, "Limits"):
+            return None
+        limits = http.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        transport = transport_class(
+            limits=limits, http2=self.config.http2 and http2_available()
+        )
+        return CountingTransport(transport, self.pool_stats)
+
+    def client(self):
+        """The shared `OpenAI` client for the current environment."""
+        from openai import DefaultHttpxClient, OpenAI
+
+        key = self._key()
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                transport = self._transport(is_async=False)
+                if transport is None:
+                    client = OpenAI()
+                else:
+                    http_client = DefaultHttpxClient(transport=transport)
+                    self._http_clients.add(http_client)
+                    client = OpenAI(http_client=http_client)
+                self._clients[key] = client
+            return client
+
+    def async_client(self):
+        """The shared `AsyncOpenAI` client for the current environment and loop."""
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        key = self._key()
+        with self._lock:
+            # a closed loop's connections are unusable; let its clients go
+            for closed in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed]
+            if loop is None:
+                clients = self._loopless_async_clients
+            else:
+                clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                transport = self._transport(is_async=True)
+                if transport is None:
+                    client = AsyncOpenAI()
+                else:
+                    http_client = DefaultAsyncHttpxClient(transport=transport)
+                    self._http_clients.add(http_client)
+                    client = AsyncOpenAI(http_client=http_client)
+                clients[key] = client
+            return client
+
+    def stats(self) -> dict:
+        """Pool configuration, request concurrency and connection counts."""
+        connections = idle = 0
+        with self._lock:
+            http_clients = list(self._http_clients)
+        for http_client in http_clients:
+            for connection in pool_connections(http_client) or ():
+                connections += 1
+                is_idle = getattr(connection, "is_idle", None)
+                idle += bool(is_idle and is_idle())
+        return {
+            "clients": len(http_clients),
+            "max_connections": self.config.max_connections,
+            "max_keepalive_connections": self.config.max_keepalive_connections,
+            "http2": self.config.http2 and http2_available(),
+            "connections": connections,
+            "idle_connections": idle,
+            "requests": self.pool_stats.requests,
+            "in_flight": self.pool_stats.in_flight,
+            "max_in_flight": self.pool_stats.max_in_flight,
+        }
+
+    def close(self) -> None:
+        """Closes the sync clients' pools and forgets every client."""
+        with self._lock:
+            http_clients, self._http_clients = list(self._http_clients), weakref.WeakSet()
+            self._clients.clear()
+            self._async_clients.clear()
+            self._loopless_async_clients.clear()
+        for http_client in http_clients:
+            # async pools close with their event loop
+            close = getattr(http_client, "close", None)
+            if close is not None and not asyncio.iscoroutinefunction(close):
+                close()
+
+
+_shared_registry: Optional[ClientRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def configure_transport(config: Optional[PoolConfig] = None) -> ClientRegistry:
+    """Replaces the process-wide client registry; existing clients keep working."""
+    global _shared_registry
+    with _shared_registry_lock:
+        _shared_registry = ClientRegistry(config)
+        return _shared_registry
+
+
+def shared_clients() -> ClientRegistry:
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = ClientRegistry()
+        return _shared_registry
+
+
+def transport_stats() -> dict:
+    return shared_clients().stats()
@@ -1,12 +1,39 @@
-from openai.types.chat import ChatCompletionMessage
-from openai.types.chat.chat_completion_message_tool_call import (
-    ChatCompletionMessageToolCall,
-    Function,
-)
-from typing import List, Callable, Union, Optional
+import importlib
+from typing import TYPE_CHECKING, List, Callable, Union, Optional
 
 # Third-party imports
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer, field_validator
+
+from .budget import BudgetUsage
+from .message import wire_messages
+from .metrics import RunMetrics
+from .policy import CompletionPolicy
+from .routing import ModelRouter
+from .selection import ToolSelector
+from .window import ContextWindow
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessage
+    from openai.types.chat.chat_completion_message_tool_call import (
+        ChatCompletionMessageToolCall,
+        Function,
+    )
+
+# re-exported openai types, imported on first access so `import swarm` stays light
+_OPENAI_TYPES = {
+    "ChatCompletionMessage": "openai.types.chat",
+    "ChatCompletionMessageToolCall": "openai.types.chat.chat_completion_message_tool_call",
+    "Function": "openai.types.chat.chat_completion_message_tool_call",
+}
+
+
+def __getattr__(name: str):
+    module = _OPENAI_TYPES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
 AgentFunction = Callable[[], Union[str, "Agent", dict]]
 
@@ -18,12 +45,35 @@ class Agent(BaseModel):
     functions: List[AgentFunction] = []
     tool_choice: str = None
     parallel_tool_calls: bool = True
+    context_window: Optional[ContextWindow] = None
+    policy: Optional[CompletionPolicy] = None
+    models: Optional[ModelRouter] = None
+    tool_timeout: Optional[float] = None
+    memoize_instructions: bool = False
+    tool_selector: Optional[ToolSelector] = None
+
+    @field_validator("models", mode="before")
+    @classmethod
+    def route_model_list(cls, models):
+        # a plain list of model names gets a router with the default settings
+        if isinstance(models, (list, tuple)):
+            return ModelRouter(models=list(models))
+        return models
 
 
 class Response(BaseModel):
     messages: List = []
     agent: Optional[Agent] = None
     context_variables: dict = {}
+    metrics: Optional[RunMetrics] = None
+    run_id: Optional[str] = None
+    termination_reason: Optional[str] = None
+    usage: Optional[BudgetUsage] = None
+
+    @field_serializer("messages")
+    def serialize_messages(self, messages: List) -> List[dict]:
+        # compact `Message`s dump as the plain dicts they stand for
+        return wire_messages(messages)
 
 
 class Result(BaseModel):
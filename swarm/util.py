@@ -85,3 +85,41 @@ def function_to_json(func) -> dict:
             },
         },
     }
+
+
+# rough local estimate: ~4 characters per token plus per-message framing
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_text_tokens(text) -> int:
+    if not text:
+        return 0
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def estimate_tokens(message) -> int:
+    """
+    Estimates the prompt tokens a chat message will use, without a tokenizer.
+
+    Args:
+        message: A chat message dict (or a plain string).
+
+    Returns:
+        The estimated token count.
+    """
+    if isinstance(message, str):
+        return estimate_text_tokens(message)
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    content = message.get("content")
+    if isinstance(content, list):
+        for part in content:
+            if isinstance(part, dict):
+                tokens += estimate_text_tokens(part.get("text"))
+    else:
+        tokens += estimate_text_tokens(content)
+    for tool_call in message.get("tool_calls") or ():
+        function = tool_call.get("function") or {}
+        tokens += estimate_text_tokens(function.get("name"))
+        tokens += estimate_text_tokens(function.get("arguments"))
+    return tokens
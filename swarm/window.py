@@ -0,0 +1,106 @@
+from typing import Callable, List, Literal
+
+# Third-party imports
+from pydantic import BaseModel
+
+from .util import estimate_tokens
+
+
+def summarize_locally(messages: List[dict], max_tokens: int) -> str:
+    """
+    Default summarizer: an extractive digest of the dropped messages, built
+    locally so trimming never costs an extra model round trip.
+    """
+    budget = max_tokens * 4
+    per_message = max(budget // max(len(messages), 1), 40)
+    lines = []
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, str) or not content:
+            names = [
+                (tool_call.get("function") or {}).get("name", "")
+                for tool_call in message.get("tool_calls") or ()
+            ]
+            if not names:
+                continue
+            content = f"called {', '.join(names)}"
+        sender = message.get("sender") or message.get("tool_name") or message["role"]
+        lines.append(f"{sender}: {content[:per_message]}")
+    return "\n".join(lines)[:budget]
+
+
+def group_tool_pairs(history: List[dict]) -> List[List[dict]]:
+    """
+    Splits history into units that must be kept or dropped together: an
+    assistant message with tool_calls plus the tool results that answer it.
+    """
+    units = []
+    for message in history:
+        if message.get("role") == "tool" and units and units[-1][0].get("tool_calls"):
+            units[-1].append(message)
+        else:
+            units.append([message])
+    return units
+
+
+class ContextWindow(BaseModel):
+    """
+    Keeps an agent's prompt within a token budget.
+
+    Attributes:
+        max_tokens (int): Budget for the system prompt plus history.
+        strategy (str): `"drop_oldest"` or `"summarize_oldest"`.
+        pin_system (bool): Never drop system messages found in the history.
+        summary_max_tokens (int): Budget reserved for the summary message.
+        summarizer (Callable): `summarizer(messages, max_tokens) -> str`.
+        estimator (Callable): `estimator(message) -> int` token estimate.
+    """
+
+    max_tokens: int
+    strategy: Literal["drop_oldest", "summarize_oldest"] = "drop_oldest"
+    pin_system: bool = True
+    summary_max_tokens: int = 256
+    summarizer: Callable[[List[dict], int], str] = summarize_locally
+    estimator: Callable[[dict], int] = estimate_tokens
+
+    def fit(self, system_message: dict, history: List[dict]) -> List[dict]:
+        """Returns the (possibly trimmed) history to send after `system_message`."""
+        estimate = self.estimator
+        budget = self.max_tokens - estimate(system_message)
+        units = group_tool_pairs(history)
+        costs = [sum(estimate(m) for m in unit) for unit in units]
+        if sum(costs) <= budget:
+            return history
+
+        if self.strategy == "summarize_oldest":
+            budget -= self.summary_max_tokens
+
+        pinned = [
+            self.pin_system and unit[0].get("role") == "system" for unit in units
+        ]
+        budget -= sum(cost for cost, pin in zip(costs, pinned) if pin)
+
+        # keep the newest units that fit; the latest one is always kept
+        keep = list(pinned)
+        for i in range(len(units) - 1, -1, -1):
+            if keep[i]:
+                continue
+            if costs[i] > budget and i != len(units) - 1:
+                break
+            keep[i] = True
+            budget -= costs[i]
+
+        kept = [m for unit, k in zip(units, keep) for m in unit if k]
+        dropped = [m for unit, k in zip(units, keep) for m in unit if not k]
+        if self.strategy != "summarize_oldest" or not dropped:
+            return kept
+
+        summary = self.summarizer(dropped, self.summary_max_tokens)
+        return [
+            {"role": "system", "content": f"Summary of earlier conversation:\n{summary}"},
+            *kept,
+        ]
+
+    def tokens(self, messages: List[dict]) -> int:
+        return sum(self.estimator(m) for m in messages)
+
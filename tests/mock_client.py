@@ -1,8 +1,16 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from swarm.types import ChatCompletionMessage, ChatCompletionMessageToolCall, Function
 from openai import OpenAI
 from openai.types.chat.chat_completion import ChatCompletion, Choice
+from openai.types.chat.chat_completion_chunk import (
+    ChatCompletionChunk,
+    Choice as ChunkChoice,
+    ChoiceDelta,
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
 import json
+import re
 
 
 def create_mock_response(message, function_calls=[], model="gpt-4o"):
@@ -41,6 +49,56 @@ def create_mock_response(message, function_calls=[], model="gpt-4o"):
     )
 
 
+def create_mock_stream(content="", function_calls=[], model="gpt-4o"):
+    deltas = [ChoiceDelta(role="assistant", content="")]
+    deltas += [ChoiceDelta(content=token) for token in re.findall(r"\S+\s*", content)]
+    for index, call in enumerate(function_calls):
+        arguments = json.dumps(call.get("args", {}))
+        deltas.append(
+            ChoiceDelta(
+                tool_calls=[
+                    ChoiceDeltaToolCall(
+                        index=index,
+                        id=f"mock_tc_id_{index}",
+                        type="function",
+                        function=ChoiceDeltaToolCallFunction(
+                            name=call.get("name", ""), arguments=""
+                        ),
+                    )
+                ]
+            )
+        )
+        # split arguments into two fragments, like the API does
+        half = len(arguments) // 2
+        for fragment in (arguments[:half], arguments[half:]):
+            deltas.append(
+                ChoiceDelta(
+                    tool_calls=[
+                        ChoiceDeltaToolCall(
+                            index=index,
+                            function=ChoiceDeltaToolCallFunction(arguments=fragment),
+                        )
+                    ]
+                )
+            )
+
+    return [
+        ChatCompletionChunk(
+            id="mock_cc_id",
+            created=1234567890,
+            model=model,
+            object="chat.completion.chunk",
+            choices=[ChunkChoice(delta=delta, index=0, finish_reason=None)],
+        )
+        for delta in deltas
+    ]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
 class MockOpenAIClient:
     def __init__(self):
         self.chat = MagicMock()
@@ -64,6 +122,20 @@ class MockOpenAIClient:
         self.chat.completions.create.assert_called_with(**kwargs)
 
 
+class MockAsyncOpenAIClient(MockOpenAIClient):
+    def __init__(self):
+        self.chat = MagicMock()
+        self.chat.completions = MagicMock()
+        self.chat.completions.create = AsyncMock()
+
+    def set_stream_responses(self, streams: list[list[ChatCompletionChunk]]):
+        """
+        Set the mock to return async chunk streams sequentially.
+        :param streams: A list of chunk lists, one per completion.
+        """
+        self.chat.completions.create.side_effect = [_aiter(s) for s in streams]
+
+
 # Initialize the mock client
 client = MockOpenAIClient()
 
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+from swarm import Swarm, AsyncSwarm, Agent
+from tests.mock_client import (
+    MockOpenAIClient,
+    MockAsyncOpenAIClient,
+    create_mock_response,
+)
+
+
+def echo_responses(client, fail_first=()):
+    lock = threading.Lock()
+    failed = set()
+
+    def create(**params):
+        content = params["messages"][-1]["content"]
+        with lock:
+            if content in fail_first and content not in failed:
+                failed.add(content)
+                raise ConnectionError("connection reset")
+        return create_mock_response({"role": "assistant", "content": f"echo {content}"})
+
+    client.chat.completions.create.side_effect = create
+
+
+def test_run_many_ordered_with_retries():
+    mock_client = MockOpenAIClient()
+    echo_responses(mock_client, fail_first={"3"})
+    client = Swarm(client=mock_client)
+    conversations = [[{"role": "user", "content": str(i)}] for i in range(10)]
+
+    batch = client.run_many(
+        Agent(), conversations, max_concurrency=4, ordered=True, backoff=0
+    )
+    results = list(batch)
+
+    assert [index for index, _ in results] == list(range(10))
+    assert [r.messages[-1]["content"] for _, r in results] == [
+        f"echo {i}" for i in range(10)
+    ]
+    assert batch.stats.total == 10
+    assert batch.stats.succeeded == 10
+    assert batch.stats.retries == 1
+    assert batch.stats.throughput > 0
+    assert batch.stats.latency_p50 <= batch.stats.latency_p99 <= batch.stats.latency_max
+
+
+def test_run_many_yields_exceptions_after_retries():
+    mock_client = MockOpenAIClient()
+    mock_client.chat.completions.create.side_effect = ConnectionError("down")
+    client = Swarm(client=mock_client)
+
+    batch = client.run_many(
+        Agent(), [[{"role": "user", "content": "hi"}]], retries=1, backoff=0
+    )
+    [(index, result)] = list(batch)
+
+    assert index == 0
+    assert isinstance(result, ConnectionError)
+    assert batch.stats.failed == 1
+    assert batch.stats.retries == 1
+
+
+def test_async_run_many():
+    mock_client = MockAsyncOpenAIClient()
+    echo_responses(mock_client)
+    client = AsyncSwarm(client=mock_client)
+    conversations = [
+        {"messages": [{"role": "user", "content": str(i)}], "max_turns": 1}
+        for i in range(5)
+    ]
+
+    async def consume():
+        batch = client.run_many(Agent(), conversations, max_concurrency=2)
+        return batch, {index: r async for index, r in batch}
+
+    batch, results = asyncio.run(consume())
+
+    assert {i: r.messages[-1]["content"] for i, r in results.items()} == {
+        i: f"echo {i}" for i in range(5)
+    }
+    assert batch.stats.succeeded == 5
+
+
+def test_run_many_conversation_can_name_its_agent():
+    mock_client = MockOpenAIClient()
+    echo_responses(mock_client)
+    client = Swarm(client=mock_client)
+    conversations = [
+        [{"role": "user", "content": "a"}],
+        {"agent": Agent(name="Other"), "messages": [{"role": "user", "content": "b"}]},
+    ]
+
+    results = dict(client.run_many(Agent(name="Default"), conversations, ordered=True))
+
+    assert results[0].agent.name == "Default"
+    assert results[1].agent.name == "Other"
+
+
+def test_bounded_runs_are_not_capped_by_the_request_pool():
+    # every conversation must be in flight at once to get past the barrier
+    conversations = 80
+    barrier = threading.Barrier(conversations, timeout=5)
+    mock_client = MockOpenAIClient()
+
+    def create(**params):
+        barrier.wait()
+        return create_mock_response({"role": "assistant", "content": "done"})
+
+    mock_client.chat.completions.create.side_effect = create
+    client = Swarm(client=mock_client)
+
+    batch = client.run_many(
+        Agent(),
+        [[{"role": "user", "content": str(i)}] for i in range(conversations)],
+        max_concurrency=conversations,
+        retries=0,
+        timeout=30,
+    )
+    results = list(batch)
+
+    assert batch.stats.succeeded == conversations
+    assert all(r.messages[-1]["content"] == "done" for _, r in results)
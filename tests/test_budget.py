@@ -0,0 +1,185 @@
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from swarm import Swarm, Agent
+from swarm.budget import BudgetTracker, RunBudget
+from swarm.cancel import RunCancelled
+from swarm.metrics import TurnMetrics
+from swarm.routing import ModelRouter
+from tests.mock_client import MockOpenAIClient, create_mock_response, create_mock_stream
+
+MESSAGES = [{"role": "user", "content": "Check every order."}]
+
+
+def lookup_call(count=1):
+    return create_mock_response(
+        {"role": "assistant", "content": ""},
+        [{"name": "lookup_order", "args": {"order_id": i}} for i in range(count)],
+    )
+
+
+def lookup_order(order_id):
+    return "shipped"
+
+
+def looping_client(count=1):
+    # the model never stops calling tools
+    mock = MockOpenAIClient()
+    mock.chat.completions.create.side_effect = lambda **kwargs: lookup_call(count)
+    return mock
+
+
+def test_max_completions_counts_model_turns():
+    mock = looping_client(count=3)
+    response = Swarm(client=mock).run(
+        agent=Agent(functions=[lookup_order]),
+        messages=MESSAGES,
+        budget=RunBudget(max_completions=2),
+    )
+
+    assert mock.chat.completions.create.call_count == 2
+    assert response.termination_reason == "max_completions"
+    # both turns finish with their tool results, however many calls they made
+    assert [m["role"] for m in response.messages] == ["assistant"] + ["tool"] * 3 + [
+        "assistant"
+    ] + ["tool"] * 3
+    assert response.usage.completions == 2
+
+
+def test_max_turns_is_reported():
+    response = Swarm(client=looping_client()).run(
+        agent=Agent(functions=[lookup_order]), messages=MESSAGES, max_turns=4
+    )
+    assert response.termination_reason == "max_turns"
+    assert response.usage is None
+
+
+def test_max_input_tokens_stops_before_request():
+    mock = looping_client()
+    response = Swarm(client=mock).run(
+        agent=Agent(functions=[lookup_order]),
+        messages=MESSAGES,
+        budget=RunBudget(max_input_tokens=200),
+    )
+
+    assert response.termination_reason == "max_input_tokens"
+    assert 0 < response.usage.input_tokens <= 200
+
+
+def test_max_cost_aggregates_across_handoffs():
+    billing = Agent(name="Billing", model="cheap", functions=[lookup_order])
+
+    def transfer_to_billing():
+        return billing
+
+    triage = Agent(name="Triage", model="pricey", functions=[transfer_to_billing])
+    mock = MockOpenAIClient()
+    handoff = create_mock_response(
+        {"role": "assistant", "content": ""}, [{"name": "transfer_to_billing"}]
+    )
+    mock.chat.completions.create.side_effect = [handoff] + [lookup_call()] * 50
+    budget = RunBudget(
+        max_cost=0.01, prices={"pricey": (100.0, 100.0), "cheap": (10.0, 10.0)}
+    )
+
+    response = Swarm(client=mock).run(agent=triage, messages=MESSAGES, budget=budget)
+
+    usage = response.usage
+    assert response.termination_reason == "max_cost"
+    assert usage.cost <= 0.01
+    assert set(usage.by_agent) == {"Triage", "Billing"}
+    assert usage.by_agent["Triage"].completions == 1
+    assert usage.completions == 1 + usage.by_agent["Billing"].completions
+    assert usage.cost == pytest.approx(sum(a.cost for a in usage.by_agent.values()))
+
+
+def test_max_time():
+    def slow_lookup(order_id):
+        time.sleep(0.05)
+        return "shipped"
+
+    response = Swarm(client=looping_client()).run(
+        agent=Agent(functions=[slow_lookup]),
+        messages=MESSAGES,
+        timeout=10,
+        budget=RunBudget(max_time=0.1),
+    )
+    assert response.termination_reason == "max_time"
+
+
+def test_budget_applies_to_streams():
+    mock = MockOpenAIClient()
+    mock.chat.completions.create.side_effect = lambda **kwargs: iter(
+        create_mock_stream("", [{"name": "lookup_order", "args": {"order_id": 1}}])
+    )
+    events = list(
+        Swarm(client=mock).run(
+            agent=Agent(functions=[lookup_order]),
+            messages=MESSAGES,
+            stream=True,
+            budget=RunBudget(max_completions=3),
+        )
+    )
+    response = events[-1]["response"]
+    assert response.termination_reason == "max_completions"
+    assert response.usage.completions == 3
+
+
+def test_prices_match_dated_models():
+    budget = RunBudget(prices={"gpt-4o": (2.5, 10.0), "gpt-4o-mini": (0.15, 0.6)})
+    assert budget.price("gpt-4o-2024-08-06") == (2.5, 10.0)
+    assert budget.price("gpt-4o-mini-2024-07-18") == (0.15, 0.6)
+    assert budget.price("other") is None
+    assert budget.cost("gpt-4o", 1_000_000, 100_000) == pytest.approx(3.5)
+
+
+def test_max_cost_needs_prices():
+    with pytest.raises(ValidationError):
+        RunBudget(max_cost=1.0, prices={})
+
+
+def test_tracker_admits_until_output_budget_is_spent():
+    tracker = BudgetTracker(RunBudget(max_output_tokens=100))
+    tracker.admit("gpt-4o", 50)
+    tracker.record(TurnMetrics(agent="A", model="gpt-4o", prompt_tokens=50, completion_tokens=120))
+    with pytest.raises(RunCancelled) as error:
+        tracker.admit("gpt-4o", 50)
+    assert error.value.reason == "max_output_tokens"
+
+
+def test_tracker_counts_completions_in_flight():
+    tracker = BudgetTracker(RunBudget(max_completions=2))
+    # two concurrent branches take the last slots before either records
+    tracker.admit("gpt-4o", 10)
+    tracker.admit("gpt-4o", 10)
+    with pytest.raises(RunCancelled) as error:
+        tracker.admit("gpt-4o", 10)
+    assert error.value.reason == "max_completions"
+
+    # a request that failed gives its slot back
+    tracker.release()
+    tracker.admit("gpt-4o", 10)
+
+
+def test_max_cost_prices_the_routed_model():
+    mock = looping_client()
+    budget = RunBudget(max_cost=0.01, prices={"routed": (100.0, 100.0)})
+    agent = Agent(
+        model="unpriced", models=ModelRouter(models=["routed"]), functions=[lookup_order]
+    )
+
+    response = Swarm(client=mock).run(agent=agent, messages=MESSAGES, budget=budget)
+
+    assert response.termination_reason == "max_cost"
+    assert response.usage.cost > 0
+
+
+def test_max_cost_rejects_unpriced_models():
+    with pytest.raises(ValueError, match="'unpriced'"):
+        Swarm(client=looping_client()).run(
+            agent=Agent(model="unpriced", functions=[lookup_order]),
+            messages=MESSAGES,
+            budget=RunBudget(max_cost=0.01),
+        )
@@ -0,0 +1,105 @@
+import time
+
+from swarm import Swarm, Agent
+from swarm.cache import MemoryCache, SQLiteCache, TieredCache, cache_key
+from tests.mock_client import (
+    MockOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
+
+RESPONSE = create_mock_response({"role": "assistant", "content": "cached content"})
+
+
+def test_cache_key_is_canonical():
+    a = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}], "stream": False}
+    b = {"stream": True, "messages": [{"content": "hi", "role": "user"}], "model": "gpt-4o"}
+    c = {**a, "model": "gpt-4o-mini"}
+
+    assert cache_key(a) == cache_key(b)
+    assert cache_key(a) != cache_key(c)
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", RESPONSE)
+    cache.set("b", RESPONSE)
+    cache.get("a")
+    cache.set("c", RESPONSE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats.evictions == 1
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+    expiring = MemoryCache(ttl=0.01)
+    expiring.set("a", RESPONSE)
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "completions.db")
+    cache = SQLiteCache(path, max_entries=2)
+    cache.set("a", RESPONSE)
+    cache.set("b", RESPONSE)
+    cache.set("c", RESPONSE)
+    assert len(cache) == 2
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("c") == RESPONSE
+    assert reopened.get("a") is None
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "completions.db"))
+    disk.set("a", RESPONSE)
+    cache = TieredCache(MemoryCache(), disk)
+
+    assert cache.get("a") == RESPONSE
+    assert len(cache.memory) == 1
+
+
+def test_swarm_reuses_cached_completions():
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(RESPONSE)
+    client = Swarm(client=mock_client, cache=MemoryCache())
+    messages = [{"role": "user", "content": "Hello"}]
+
+    first = client.run(agent=Agent(), messages=messages)
+    second = client.run(agent=Agent(), messages=messages)
+
+    assert mock_client.chat.completions.create.call_count == 1
+    assert first.messages == second.messages
+    assert client.cache.stats.hits == 1
+
+
+def test_stream_is_recorded_and_replayed():
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses([create_mock_stream("streamed content")])
+    client = Swarm(client=mock_client, cache=MemoryCache())
+    messages = [{"role": "user", "content": "Hello"}]
+
+    first = list(client.run(agent=Agent(), messages=messages, stream=True))
+    second = list(client.run(agent=Agent(), messages=messages, stream=True))
+    non_streamed = client.run(agent=Agent(), messages=messages)
+
+    assert mock_client.chat.completions.create.call_count == 1
+    assert first[-1]["response"].messages == second[-1]["response"].messages
+    assert second[-1]["response"].messages[-1]["content"] == "streamed content"
+    assert non_streamed.messages[-1]["content"] == "streamed content"
+
+
+def test_sqlite_cache_evicts_least_recently_read(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "completions.db"), max_entries=2)
+    cache.set("a", RESPONSE)
+    cache.set("b", RESPONSE)
+    # the read is only buffered, but still counts before evicting
+    assert cache.get("a") == RESPONSE
+    cache.set("c", RESPONSE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == RESPONSE
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
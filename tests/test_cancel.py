@@ -0,0 +1,266 @@
+import asyncio
+import threading
+import time
+
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.budget import RunBudget
+from swarm.cancel import CancellationToken
+from swarm.checkpoint import MemoryCheckpointStore
+from swarm.tools import tool_timeout
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
+
+MESSAGES = [{"role": "user", "content": "What's the weather in SF?"}]
+
+
+def weather_call(*names):
+    return create_mock_response(
+        {"role": "assistant", "content": ""},
+        [{"name": name, "args": {"location": "SF"}} for name in names or ["get_weather"]],
+    )
+
+
+def final_answer():
+    return create_mock_response({"role": "assistant", "content": "Sunny."})
+
+
+def hung(seconds=2):
+    def get_weather(location):
+        time.sleep(seconds)
+        return "sunny"
+
+    return get_weather
+
+
+def test_deadline_returns_partial_history():
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+    agent = Agent(functions=[hung()])
+
+    start = time.perf_counter()
+    response = Swarm(client=mock).run(agent=agent, messages=MESSAGES, timeout=0.2)
+
+    assert time.perf_counter() - start < 1
+    assert response.termination_reason == "deadline"
+    # the completion that asked for the tool is kept, with the call answered
+    assert [m["role"] for m in response.messages] == ["assistant", "tool"]
+    assert response.messages[0]["tool_calls"][0]["function"]["name"] == "get_weather"
+    tool_call = response.messages[0]["tool_calls"][0]
+    assert response.messages[1]["tool_call_id"] == tool_call["id"]
+    assert response.messages[1]["content"] == (
+        "Error: Tool get_weather did not finish, the run stopped (deadline)."
+    )
+
+
+def test_stopped_run_keeps_finished_tool_results():
+    def get_time(location):
+        return "noon"
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call("get_time", "get_weather"), final_answer()])
+    agent = Agent(functions=[get_time, hung(0.5)], parallel_tool_calls=False)
+
+    response = Swarm(client=mock).run(agent=agent, messages=MESSAGES, timeout=0.2)
+
+    assert response.termination_reason == "deadline"
+    assert [m["content"] for m in response.messages[1:]] == [
+        "noon",
+        "Error: Tool get_weather did not finish, the run stopped (deadline).",
+    ]
+
+
+def test_cancel_token_interrupts_completion():
+    mock = MockOpenAIClient()
+
+    def slow_completion(**kwargs):
+        time.sleep(2)
+        return final_answer()
+
+    mock.chat.completions.create.side_effect = slow_completion
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+
+    start = time.perf_counter()
+    response = Swarm(client=mock).run(
+        agent=Agent(), messages=MESSAGES, cancel_token=token
+    )
+
+    assert time.perf_counter() - start < 1
+    assert response.termination_reason == "cancelled"
+    assert response.messages == []
+
+
+def test_unbounded_run_has_no_termination_reason():
+    mock = MockOpenAIClient()
+    mock.set_response(final_answer())
+    response = Swarm(client=mock).run(agent=Agent(), messages=MESSAGES)
+    assert response.termination_reason is None
+
+
+def test_budget_only_run_calls_tools_on_the_caller_thread():
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+    threads = []
+
+    def get_weather(location):
+        threads.append(threading.current_thread())
+        return "sunny"
+
+    Swarm(client=mock).run(
+        agent=Agent(functions=[get_weather]),
+        messages=MESSAGES,
+        budget=RunBudget(max_completions=5),
+    )
+    assert threads == [threading.current_thread()]
+
+
+def test_budget_only_run_requests_on_the_caller_thread():
+    mock = MockOpenAIClient()
+    threads = []
+
+    def create(**params):
+        threads.append(threading.current_thread())
+        return final_answer()
+
+    mock.chat.completions.create.side_effect = create
+    Swarm(client=mock).run(
+        agent=Agent(), messages=MESSAGES, budget=RunBudget(max_completions=5)
+    )
+    assert threads == [threading.current_thread()]
+
+
+def test_tool_timeout_on_function():
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+    agent = Agent(functions=[tool_timeout(0.05)(hung())])
+
+    response = Swarm(client=mock).run(agent=agent, messages=MESSAGES)
+
+    assert response.termination_reason is None
+    assert response.messages[1]["content"] == "Error: Tool get_weather timed out after 0.05s."
+    assert response.messages[-1]["content"] == "Sunny."
+
+
+def test_function_timeout_overrides_agent_timeout():
+    def get_time(location):
+        time.sleep(0.1)
+        return "noon"
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call("get_weather", "get_time"), final_answer()])
+    agent = Agent(
+        functions=[hung(), tool_timeout(1)(get_time)],
+        tool_timeout=0.05,
+        parallel_tool_calls=False,
+    )
+
+    response = Swarm(client=mock).run(agent=agent, messages=MESSAGES)
+
+    assert "timed out" in response.messages[1]["content"]
+    assert response.messages[2]["content"] == "noon"
+
+
+def test_concurrent_tools_time_out_individually():
+    def get_time(location):
+        return "noon"
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call("get_weather", "get_time"), final_answer()])
+    agent = Agent(functions=[hung(), get_time], tool_timeout=0.1)
+
+    start = time.perf_counter()
+    response = Swarm(client=mock, max_tool_workers=4).run(agent=agent, messages=MESSAGES)
+
+    assert time.perf_counter() - start < 1
+    assert "timed out" in response.messages[1]["content"]
+    assert response.messages[2]["content"] == "noon"
+
+
+def test_cancel_mid_stream_keeps_streamed_text():
+    token = CancellationToken()
+
+    def chunks():
+        for i, chunk in enumerate(create_mock_stream("one two three four five")):
+            if i == 3:
+                token.cancel()
+            yield chunk
+
+    mock = MockOpenAIClient()
+    mock.set_response(chunks())
+    events = list(
+        Swarm(client=mock).run(
+            agent=Agent(), messages=MESSAGES, stream=True, cancel_token=token
+        )
+    )
+
+    assert {"delim": "end"} in events
+    response = events[-1]["response"]
+    assert response.termination_reason == "cancelled"
+    assert response.messages[0]["content"] == "one two "
+
+
+def test_async_deadline_cancels_hung_tool():
+    cancelled = []
+
+    async def get_weather(location):
+        try:
+            await asyncio.sleep(2)
+        except asyncio.CancelledError:
+            cancelled.append(location)
+            raise
+        return "sunny"
+
+    mock = MockAsyncOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+
+    async def scenario():
+        return await AsyncSwarm(client=mock).run(
+            agent=Agent(functions=[get_weather]), messages=MESSAGES, timeout=0.2
+        )
+
+    response = asyncio.run(scenario())
+    assert response.termination_reason == "deadline"
+    assert cancelled == ["SF"]
+    assert "did not finish" in response.messages[-1]["content"]
+
+
+def test_async_tool_timeout():
+    async def get_weather(location):
+        await asyncio.sleep(2)
+
+    mock = MockAsyncOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+
+    async def scenario():
+        return await AsyncSwarm(client=mock).run(
+            agent=Agent(functions=[get_weather], tool_timeout=0.05), messages=MESSAGES
+        )
+
+    response = asyncio.run(scenario())
+    assert "timed out" in response.messages[1]["content"]
+    assert response.messages[-1]["content"] == "Sunny."
+
+
+def test_interrupted_run_can_be_resumed():
+    store = MemoryCheckpointStore()
+    calls = []
+
+    def get_weather(location):
+        calls.append(location)
+        time.sleep(0.3 if len(calls) == 1 else 0)
+        return "sunny"
+
+    agent = Agent(name="Weather", functions=[get_weather])
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+    swarm = Swarm(client=mock, checkpoint_store=store)
+    first = swarm.run(agent=agent, messages=MESSAGES, timeout=0.1)
+    assert store.load(first.run_id).status == "running"
+
+    response = swarm.resume(first.run_id, [agent])
+    assert response.termination_reason is None
+    assert response.messages[-1]["content"] == "Sunny."
@@ -0,0 +1,318 @@
+import asyncio
+import time
+
+import pytest
+
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.checkpoint import MemoryCheckpointStore, SQLiteCheckpointStore
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
+
+MESSAGES = [{"role": "user", "content": "What's the weather in SF?"}]
+
+
+def weather_call():
+    return create_mock_response(
+        {"role": "assistant", "content": ""},
+        [{"name": "get_weather", "args": {"location": "SF"}}],
+    )
+
+
+def final_answer():
+    return create_mock_response({"role": "assistant", "content": "Sunny."})
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "runs.db"))
+    yield store
+    store.close()
+
+
+def make_agent(calls):
+    def get_weather(location):
+        calls.append(location)
+        return "sunny"
+
+    return Agent(name="Weather", functions=[get_weather])
+
+
+def test_finished_run_is_checkpointed(store):
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), final_answer()])
+    calls = []
+
+    response = Swarm(client=mock, checkpoint_store=store).run(
+        agent=make_agent(calls), messages=MESSAGES, context_variables={"user": "ada"}
+    )
+
+    checkpoint = store.load(response.run_id)
+    assert checkpoint.status == "finished"
+    assert checkpoint.agent == "Weather"
+    assert checkpoint.init_len == 1
+    assert checkpoint.messages[1:] == response.messages
+    assert checkpoint.context_variables == {"user": "ada"}
+    assert store.runs(status="finished") == [response.run_id]
+
+
+def test_resume_after_failed_completion(store):
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), ConnectionError("worker died")])
+    calls = []
+    agent = make_agent(calls)
+
+    with pytest.raises(ConnectionError):
+        Swarm(client=mock, checkpoint_store=store).run(
+            agent=agent, messages=MESSAGES, run_id="run-1"
+        )
+    assert store.runs(status="running") == ["run-1"]
+
+    # a new process picks the run up without re-running the first turn
+    mock = MockOpenAIClient()
+    mock.set_response(final_answer())
+    response = Swarm(client=mock, checkpoint_store=store).resume("run-1", [agent])
+
+    assert mock.chat.completions.create.call_count == 1
+    assert calls == ["SF"]
+    assert [m["role"] for m in response.messages] == ["assistant", "tool", "assistant"]
+    assert response.messages[-1]["content"] == "Sunny."
+    assert store.load("run-1").status == "finished"
+
+
+@pytest.mark.parametrize("sqlite", [False, True])
+def test_repeated_resume_keeps_the_original_turn_limit(tmp_path, sqlite):
+    store = (
+        SQLiteCheckpointStore(str(tmp_path / "runs.db"))
+        if sqlite
+        else MemoryCheckpointStore()
+    )
+    calls = []
+    agent = make_agent(calls)
+    died = ConnectionError("worker died")
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), weather_call(), died])
+    with pytest.raises(ConnectionError):
+        Swarm(client=mock, checkpoint_store=store).run(
+            agent=agent, messages=MESSAGES, max_turns=10, run_id="run-turns"
+        )
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), died])
+    with pytest.raises(ConnectionError):
+        Swarm(client=mock, checkpoint_store=store).resume("run-turns", [agent])
+    assert store.load("run-turns").max_turns == 10
+
+    mock = MockOpenAIClient()
+    mock.set_response(final_answer())
+    response = Swarm(client=mock, checkpoint_store=store).resume("run-turns", [agent])
+
+    assert mock.chat.completions.create.call_count == 1
+    assert len(response.messages) == 7
+    assert response.messages[-1]["content"] == "Sunny."
+    assert store.load("run-turns").status == "finished"
+
+
+def test_resume_runs_unanswered_tool_calls(store):
+    mock = MockOpenAIClient()
+    mock.set_response(weather_call())
+    attempts = []
+
+    def get_weather(location):
+        attempts.append(location)
+        if len(attempts) == 1:
+            raise RuntimeError("worker died")
+        return "sunny"
+
+    agent = Agent(name="Weather", functions=[get_weather])
+    with pytest.raises(RuntimeError):
+        Swarm(client=mock, checkpoint_store=store).run(
+            agent=agent, messages=MESSAGES, run_id="run-2"
+        )
+
+    mock = MockOpenAIClient()
+    mock.set_response(final_answer())
+    response = Swarm(client=mock, checkpoint_store=store).resume("run-2", [agent])
+
+    assert attempts == ["SF", "SF"]
+    assert mock.chat.completions.create.call_count == 1
+    assert response.messages[1]["content"] == "sunny"
+
+
+def two_calls():
+    response = create_mock_response(
+        {"role": "assistant", "content": ""},
+        [
+            {"name": "get_time", "args": {"location": "SF"}},
+            {"name": "get_weather", "args": {"location": "SF"}},
+        ],
+    )
+    for index, tool_call in enumerate(response.choices[0].message.tool_calls):
+        tool_call.id = f"call_{index}"
+    return response
+
+
+def test_resume_skips_tools_answered_before_the_crash(store):
+    calls = []
+
+    def get_time(location):
+        calls.append("time")
+        return "noon"
+
+    def get_weather(location):
+        calls.append("weather")
+        if calls.count("weather") == 1:
+            raise RuntimeError("worker died")
+        return "sunny"
+
+    agent = Agent(
+        name="Weather", functions=[get_time, get_weather], parallel_tool_calls=False
+    )
+    mock = MockOpenAIClient()
+    mock.set_response(two_calls())
+    with pytest.raises(RuntimeError):
+        Swarm(client=mock, checkpoint_store=store).run(
+            agent=agent, messages=MESSAGES, run_id="run-5"
+        )
+    assert store.load("run-5").messages[-1]["content"] == "noon"
+
+    mock = MockOpenAIClient()
+    mock.set_response(final_answer())
+    response = Swarm(client=mock, checkpoint_store=store).resume("run-5", [agent])
+
+    assert calls == ["time", "weather", "weather"]
+    assert [m["content"] for m in response.messages[1:]] == ["noon", "sunny", "Sunny."]
+
+
+def test_resumed_tools_respect_the_timeout(store):
+    attempts = []
+
+    def get_weather(location):
+        attempts.append(location)
+        if len(attempts) == 1:
+            raise RuntimeError("worker died")
+        time.sleep(0.3)
+
+    agent = Agent(name="Weather", functions=[get_weather])
+    mock = MockOpenAIClient()
+    mock.set_response(weather_call())
+    swarm = Swarm(client=mock, checkpoint_store=store)
+    with pytest.raises(RuntimeError):
+        swarm.run(agent=agent, messages=MESSAGES, run_id="run-6")
+
+    start = time.perf_counter()
+    response = swarm.resume("run-6", [agent], timeout=0.05)
+
+    assert time.perf_counter() - start < 0.25
+    assert response.termination_reason == "deadline"
+    assert "did not finish" in response.messages[-1]["content"]
+    assert store.load("run-6").status == "running"
+
+
+def test_resume_finished_run_makes_no_calls():
+    store = MemoryCheckpointStore()
+    mock = MockOpenAIClient()
+    mock.set_response(final_answer())
+    agent = Agent()
+    first = Swarm(client=mock, checkpoint_store=store).run(agent=agent, messages=MESSAGES)
+
+    response = Swarm(client=mock, checkpoint_store=store).resume(first.run_id, [agent])
+
+    assert mock.chat.completions.create.call_count == 1
+    assert response.messages == first.messages
+
+
+def test_resume_continues_in_handed_off_agent():
+    store = MemoryCheckpointStore()
+    spanish = Agent(name="Spanish")
+
+    def transfer_to_spanish():
+        return spanish
+
+    english = Agent(name="English", functions=[transfer_to_spanish])
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses(
+        [
+            create_mock_response(
+                {"role": "assistant", "content": ""}, [{"name": "transfer_to_spanish"}]
+            ),
+            ConnectionError(),
+        ]
+    )
+    with pytest.raises(ConnectionError):
+        Swarm(client=mock, checkpoint_store=store).run(
+            agent=english, messages=MESSAGES, run_id="run-3"
+        )
+
+    with pytest.raises(ValueError):
+        Swarm(client=mock, checkpoint_store=store).resume("run-3", [english])
+
+    mock.set_sequential_responses([final_answer()])
+    response = Swarm(client=mock, checkpoint_store=store).resume(
+        "run-3", {"English": english, "Spanish": spanish}
+    )
+    assert response.agent.name == "Spanish"
+    assert response.messages[-1]["sender"] == "Spanish"
+
+
+def test_resume_stream(store):
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses([weather_call(), ConnectionError()])
+    calls = []
+    agent = make_agent(calls)
+    with pytest.raises(ConnectionError):
+        Swarm(client=mock, checkpoint_store=store).run(
+            agent=agent, messages=MESSAGES, run_id="run-4"
+        )
+
+    mock.set_sequential_responses([iter(create_mock_stream("Sunny."))])
+    events = list(
+        Swarm(client=mock, checkpoint_store=store).resume("run-4", [agent], stream=True)
+    )
+
+    response = events[-1]["response"]
+    assert [m["role"] for m in response.messages] == ["assistant", "tool", "assistant"]
+    assert response.messages[-1]["content"] == "Sunny."
+
+
+def test_async_resume(store):
+    mock = MockAsyncOpenAIClient()
+    mock.set_sequential_responses([weather_call(), ConnectionError()])
+    calls = []
+    agent = make_agent(calls)
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await AsyncSwarm(client=mock, checkpoint_store=store).run(
+                agent=agent, messages=MESSAGES, run_id="run-5"
+            )
+        mock.set_sequential_responses([final_answer()])
+        return await AsyncSwarm(client=mock, checkpoint_store=store).resume(
+            "run-5", [agent]
+        )
+
+    response = asyncio.run(scenario())
+    assert calls == ["SF"]
+    assert response.messages[-1]["content"] == "Sunny."
+
+
+def test_sqlite_store_appends_only_new_messages(store):
+    from swarm.checkpoint import Checkpoint
+
+    checkpoint = Checkpoint(
+        run_id="r", agent="A", messages=[{"role": "user", "content": "hi"}], init_len=1
+    )
+    store.save(checkpoint)
+    checkpoint.messages.append({"role": "assistant", "content": "hello"})
+    checkpoint.init_len = 2  # ignored: fixed by the first save
+    store.save(checkpoint)
+
+    loaded = store.load("r")
+    assert loaded.messages == checkpoint.messages
+    assert loaded.init_len == 1
+    store.delete("r")
+    assert store.load("r") is None
@@ -1,6 +1,14 @@
+import asyncio
+import threading
 import pytest
-from swarm import Swarm, Agent
-from tests.mock_client import MockOpenAIClient, create_mock_response
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.types import Result
+from tests.mock_client import (
+    MockOpenAIClient,
+    MockAsyncOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
 from unittest.mock import Mock
 import json
 
@@ -143,3 +151,312 @@ def test_handoff(mock_openai_client: MockOpenAIClient):
     assert response.agent == agent2
     assert response.messages[-1]["role"] == "assistant"
     assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_async_run_awaits_async_functions():
+    get_weather_mock = Mock()
+
+    async def get_weather(location):
+        get_weather_mock(location=location)
+        return "It's sunny today."
+
+    def transfer_to_agent2():
+        return agent2
+
+    agent1 = Agent(name="Test Agent 1", functions=[get_weather, transfer_to_agent2])
+    agent2 = Agent(name="Test Agent 2")
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "get_weather", "args": {"location": "Paris"}},
+                    {"name": "transfer_to_agent2"},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = AsyncSwarm(client=mock_client)
+    messages = [{"role": "user", "content": "Weather in Paris?"}]
+    response = asyncio.run(client.run(agent=agent1, messages=messages))
+
+    get_weather_mock.assert_called_once_with(location="Paris")
+    assert response.agent == agent2
+    assert response.messages[1]["content"] == "It's sunny today."
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+    assert response.messages[-1]["sender"] == "Test Agent 2"
+
+
+def test_async_run_keeps_blocking_tools_off_the_loop():
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_lookup():
+        started.set()
+        # the loop can only release it if the call isn't blocking the loop
+        return "found" if release.wait(1) else "blocked the loop"
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                {"role": "assistant", "content": ""}, [{"name": "blocking_lookup"}]
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+    client = AsyncSwarm(client=mock_client)
+
+    async def main():
+        run = asyncio.ensure_future(
+            client.run(
+                agent=Agent(functions=[blocking_lookup], parallel_tool_calls=False),
+                messages=[{"role": "user", "content": "Look it up"}],
+            )
+        )
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        release.set()
+        return await run
+
+    response = asyncio.run(main())
+    assert response.messages[1]["content"] == "found"
+
+
+def test_async_run_and_stream():
+    def get_weather(location):
+        return f"It's sunny in {location}."
+
+    agent = Agent(name="Test Agent", functions=[get_weather])
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_stream_responses(
+        [
+            create_mock_stream(
+                function_calls=[{"name": "get_weather", "args": {"location": "Rome"}}]
+            ),
+            create_mock_stream(DEFAULT_RESPONSE_CONTENT),
+        ]
+    )
+
+    client = AsyncSwarm(client=mock_client)
+    messages = [{"role": "user", "content": "Weather in Rome?"}]
+
+    async def consume():
+        return [chunk async for chunk in await client.run(agent, messages, stream=True)]
+
+    chunks = asyncio.run(consume())
+    response = chunks[-1]["response"]
+
+    assert [c["delim"] for c in chunks if "delim" in c] == ["start", "end"] * 2
+    assert response.messages[0]["tool_calls"][0]["function"]["arguments"] == (
+        json.dumps({"location": "Rome"})
+    )
+    assert response.messages[1]["content"] == "It's sunny in Rome."
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_concurrent_tool_calls_preserve_order(mock_openai_client: MockOpenAIClient):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slow_lookup(key):
+        # both calls must be in flight at once to get past the barrier
+        barrier.wait()
+        return f"value for {key}"
+
+    async def async_lookup(key):
+        await asyncio.sleep(0)
+        return Result(value=f"async {key}", context_variables={"seen": key})
+
+    def transfer_to_agent2():
+        return agent2
+
+    agent1 = Agent(
+        name="Test Agent 1",
+        functions=[slow_lookup, async_lookup, transfer_to_agent2],
+    )
+    agent2 = Agent(name="Test Agent 2")
+
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "slow_lookup", "args": {"key": "a"}},
+                    {"name": "async_lookup", "args": {"key": "b"}},
+                    {"name": "missing_tool"},
+                    {"name": "slow_lookup", "args": {"key": "c"}},
+                    {"name": "transfer_to_agent2"},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = Swarm(client=mock_openai_client, max_tool_workers=4)
+    messages = [{"role": "user", "content": "Look things up"}]
+    response = client.run(agent=agent1, messages=messages)
+
+    tool_contents = [m["content"] for m in response.messages if m["role"] == "tool"]
+    assert tool_contents == [
+        "value for a",
+        "async b",
+        "Error: Tool missing_tool not found.",
+        "value for c",
+        json.dumps({"assistant": "Test Agent 2"}),
+    ]
+    assert response.context_variables == {"seen": "b"}
+    assert response.agent == agent2
+
+
+def test_concurrent_async_tools_inside_a_running_loop(
+    mock_openai_client: MockOpenAIClient,
+):
+    async def async_lookup(key):
+        await asyncio.sleep(0)
+        return f"async {key}"
+
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "async_lookup", "args": {"key": "a"}},
+                    {"name": "async_lookup", "args": {"key": "b"}},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+    client = Swarm(client=mock_openai_client, max_tool_workers=4)
+
+    async def handler():
+        # e.g. a notebook cell or an async web handler calling the sync client
+        return client.run(
+            agent=Agent(functions=[async_lookup]),
+            messages=[{"role": "user", "content": "Look things up"}],
+        )
+
+    response = asyncio.run(handler())
+    tool_contents = [m["content"] for m in response.messages if m["role"] == "tool"]
+    assert tool_contents == ["async a", "async b"]
+
+
+def test_async_concurrent_tool_calls():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slow_lookup(key):
+        barrier.wait()
+        return f"value for {key}"
+
+    agent = Agent(name="Test Agent", functions=[slow_lookup])
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "slow_lookup", "args": {"key": "a"}},
+                    {"name": "slow_lookup", "args": {"key": "b"}},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = AsyncSwarm(client=mock_client, max_tool_workers=2)
+    messages = [{"role": "user", "content": "Look things up"}]
+    response = asyncio.run(client.run(agent=agent, messages=messages))
+
+    tool_contents = [m["content"] for m in response.messages if m["role"] == "tool"]
+    assert tool_contents == ["value for a", "value for b"]
+
+
+def test_run_does_not_mutate_caller_state(mock_openai_client: MockOpenAIClient):
+    def add_to_cart(item, context_variables):
+        context_variables["cart"].append(item)
+        return Result(value="Added", context_variables={"last_item": item})
+
+    agent = Agent(name="Test Agent", functions=[add_to_cart])
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[{"name": "add_to_cart", "args": {"item": "pear"}}],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = Swarm(client=mock_openai_client)
+    messages = [{"role": "user", "content": "Add a pear"}]
+    context_variables = {"cart": ["apple"]}
+    response = client.run(
+        agent=agent, messages=messages, context_variables=context_variables
+    )
+
+    assert messages == [{"role": "user", "content": "Add a pear"}]
+    assert context_variables == {"cart": ["apple"]}
+    assert response.context_variables == {
+        "cart": ["apple", "pear"],
+        "last_item": "pear",
+    }
+    assert len(response.messages) == 3
+
+
+def test_run_and_stream(mock_openai_client: MockOpenAIClient):
+    def get_weather(location):
+        return f"It's sunny in {location}."
+
+    agent = Agent(name="Test Agent", functions=[get_weather])
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_stream(
+                function_calls=[{"name": "get_weather", "args": {"location": "Rome"}}]
+            ),
+            create_mock_stream(DEFAULT_RESPONSE_CONTENT),
+        ]
+    )
+
+    client = Swarm(client=mock_openai_client)
+    messages = [{"role": "user", "content": "Weather in Rome?"}]
+    chunks = list(client.run(agent, messages, stream=True))
+    response = chunks[-1]["response"]
+
+    deltas = [c for c in chunks if "content" in c]
+    assert deltas[0]["role"] == "assistant"
+    assert deltas[0]["sender"] == "Test Agent"
+    assert "".join(c["content"] or "" for c in deltas) == DEFAULT_RESPONSE_CONTENT
+    assert response.messages[1]["content"] == "It's sunny in Rome."
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_tool_pools_are_shared_or_closed(mock_openai_client: MockOpenAIClient):
+    # clients without max_tool_workers don't each start their own threads
+    assert (
+        Swarm(client=mock_openai_client).tool_executor()
+        is Swarm(client=mock_openai_client).tool_executor()
+    )
+
+    with Swarm(client=mock_openai_client, max_tool_workers=2) as client:
+        executor = client.tool_executor()
+        assert executor.submit(lambda: 1).result() == 1
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda: 1)
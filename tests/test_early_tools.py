@@ -0,0 +1,162 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.stream import StreamAccumulator
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_stream,
+)
+
+MESSAGES = [{"role": "user", "content": "Weather in SF and NYC?"}]
+CALLS = [
+    {"name": "get_weather", "args": {"location": "SF"}},
+    {"name": "get_weather", "args": {"location": "NYC"}},
+]
+
+
+def slow_stream(chunks, events, delay=0.02):
+    for chunk in chunks:
+        time.sleep(delay)
+        yield chunk
+    events.append(("stream_end", None, time.perf_counter()))
+
+
+async def aslow_stream(chunks, events, delay=0.02):
+    for chunk in chunks:
+        await asyncio.sleep(delay)
+        yield chunk
+    events.append(("stream_end", None, time.perf_counter()))
+
+
+def make_agent(events):
+    def get_weather(location):
+        events.append(("tool_start", location, time.perf_counter()))
+        time.sleep(0.05)
+        return f"sunny in {location}"
+
+    return Agent(name="Weather", functions=[get_weather])
+
+
+def run_stream(swarm, agent, responses):
+    swarm.client.set_sequential_responses(responses)
+    events = list(swarm.run(agent=agent, messages=MESSAGES, stream=True))
+    return events[-1]["response"]
+
+
+def test_ready_tool_calls():
+    accumulator = StreamAccumulator("Weather")
+    chunks = create_mock_stream("", CALLS)
+    ready = []
+    for chunk in chunks:
+        accumulator.add(chunk.choices[0].delta)
+        ready += accumulator.ready_tool_calls()
+    # both calls complete as JSON before the stream ends, each handed out once
+    assert [index for index, _, _ in ready] == [0, 1]
+    assert [call.arguments for _, call, _ in ready] == ['{"location": "SF"}', '{"location": "NYC"}']
+    assert [arguments for _, _, arguments in ready] == [{"location": "SF"}, {"location": "NYC"}]
+    assert accumulator.ready_tool_calls(final=True) == []
+
+
+def test_tools_start_before_stream_ends():
+    events = []
+    swarm = Swarm(client=MockOpenAIClient(), early_tool_execution=True)
+    response = run_stream(
+        swarm,
+        make_agent(events),
+        [
+            slow_stream(create_mock_stream("", CALLS), events),
+            iter(create_mock_stream("Sunny in both.")),
+        ],
+    )
+
+    starts = {location: at for kind, location, at in events if kind == "tool_start"}
+    (stream_end,) = [at for kind, _, at in events if kind == "stream_end"]
+    assert starts["SF"] < stream_end
+    # results are merged in stream order regardless of completion order
+    tools = [m for m in response.messages if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tools] == ["mock_tc_id_0", "mock_tc_id_1"]
+    assert [m["content"] for m in tools] == ["sunny in SF", "sunny in NYC"]
+    assert response.messages[-1]["content"] == "Sunny in both."
+
+
+def test_disabled_by_default():
+    events = []
+    swarm = Swarm(client=MockOpenAIClient())
+    response = run_stream(
+        swarm,
+        make_agent(events),
+        [
+            slow_stream(create_mock_stream("", CALLS), events),
+            iter(create_mock_stream("Sunny in both.")),
+        ],
+    )
+
+    assert events[0][0] == "stream_end"
+    assert [m["content"] for m in response.messages if m["role"] == "tool"] == [
+        "sunny in SF",
+        "sunny in NYC",
+    ]
+
+
+def test_missing_tool_is_reported_in_order():
+    swarm = Swarm(client=MockOpenAIClient(), early_tool_execution=True)
+    calls = [{"name": "get_forecast", "args": {}}] + CALLS[:1]
+    response = run_stream(
+        swarm,
+        make_agent([]),
+        [iter(create_mock_stream("", calls)), iter(create_mock_stream("Done."))],
+    )
+
+    tools = [m for m in response.messages if m["role"] == "tool"]
+    assert [m["tool_name"] for m in tools] == ["get_forecast", "get_weather"]
+    assert "not found" in tools[0]["content"]
+
+
+def test_async_tools_start_before_stream_ends():
+    events = []
+
+    async def get_weather(location):
+        events.append(("tool_start", location, time.perf_counter()))
+        await asyncio.sleep(0.05)
+        return f"sunny in {location}"
+
+    agent = Agent(name="Weather", functions=[get_weather])
+    mock = MockAsyncOpenAIClient()
+    mock.set_sequential_responses(
+        [
+            aslow_stream(create_mock_stream("", CALLS), events),
+            aslow_stream(create_mock_stream("Sunny in both."), [], delay=0),
+        ]
+    )
+
+    async def scenario():
+        swarm = AsyncSwarm(client=mock, early_tool_execution=True)
+        stream = await swarm.run(agent=agent, messages=MESSAGES, stream=True)
+        return [event async for event in stream]
+
+    response = asyncio.run(scenario())[-1]["response"]
+    starts = {location: at for kind, location, at in events if kind == "tool_start"}
+    (stream_end,) = [at for kind, _, at in events if kind == "stream_end"]
+    assert starts["SF"] < stream_end
+    assert [m["content"] for m in response.messages if m["role"] == "tool"] == [
+        "sunny in SF",
+        "sunny in NYC",
+    ]
+
+
+def test_malformed_arguments_fail_before_stream_ends():
+    chunks = create_mock_stream("", CALLS)
+    # the first argument fragment of the first call is already invalid
+    chunks[2].choices[0].delta.tool_calls[0].function.arguments = '{"location" "S'
+    events = []
+    swarm = Swarm(client=MockOpenAIClient(), early_tool_execution=True)
+    swarm.client.set_sequential_responses([slow_stream(chunks, events, delay=0)])
+
+    with pytest.raises(json.JSONDecodeError):
+        list(swarm.run(agent=make_agent(events), messages=MESSAGES, stream=True))
+    assert events == []
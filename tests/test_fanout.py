@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.budget import RunBudget
+from swarm.checkpoint import MemoryCheckpointStore
+from swarm.fanout import FanOut, FanOutTask, context_changes
+from swarm.types import Result
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_response,
+)
+
+MESSAGES = [{"role": "user", "content": "Build the shop"}]
+
+
+def make_agents(reducer=None):
+    def record_api(context_variables):
+        return Result(value="recorded", context_variables={"api": "done"})
+
+    backend = Agent(name="Backend", instructions="backend", functions=[record_api])
+    frontend = Agent(name="Frontend", instructions="frontend")
+
+    def split_work():
+        return FanOut(
+            tasks=[
+                (backend, "Build the API"),
+                FanOutTask(
+                    agent=frontend,
+                    messages="Build the UI",
+                    context_variables={"section": "ui"},
+                ),
+            ],
+            reducer=reducer,
+        )
+
+    lead = Agent(name="Lead", instructions="lead", functions=[split_work])
+    return lead
+
+
+def respond(barrier):
+    # answers by agent, so concurrent branches can share one mock
+    def create(**params):
+        system = params["messages"][0]["content"]
+        last = params["messages"][-1]
+        if system == "lead":
+            if last["role"] == "user":
+                return create_mock_response(
+                    {"role": "assistant", "content": ""}, [{"name": "split_work"}]
+                )
+            return create_mock_response({"role": "assistant", "content": "All done"})
+        if last["role"] == "user":
+            # both branches must be in flight at once to get past this
+            barrier.wait()
+        if system == "backend" and last["role"] == "user":
+            return create_mock_response(
+                {"role": "assistant", "content": ""}, [{"name": "record_api"}]
+            )
+        answer = "API ready" if system == "backend" else "UI ready"
+        return create_mock_response({"role": "assistant", "content": answer})
+
+    return create
+
+
+def test_fan_out_runs_branches_concurrently_and_merges():
+    mock_client = MockOpenAIClient()
+    mock_client.chat.completions.create.side_effect = respond(threading.Barrier(2, timeout=5))
+    client = Swarm(client=mock_client)
+
+    response = client.run(
+        agent=make_agents(), messages=MESSAGES, context_variables={"project": "shop"}
+    )
+
+    tool_message = response.messages[1]
+    assert tool_message["tool_name"] == "split_work"
+    assert json.loads(tool_message["content"]) == [
+        {"agent": "Backend", "content": "API ready"},
+        {"agent": "Frontend", "content": "UI ready"},
+    ]
+    assert response.messages[-1]["content"] == "All done"
+    # the frontend's own "section" stays in its branch
+    assert response.context_variables == {"project": "shop", "api": "done"}
+    assert response.agent.name == "Lead"
+
+
+def test_branches_spend_from_the_parent_budget():
+    mock_client = MockOpenAIClient()
+    mock_client.chat.completions.create.side_effect = respond(threading.Barrier(2, timeout=5))
+    client = Swarm(client=mock_client)
+
+    response = client.run(
+        agent=make_agents(), messages=MESSAGES, budget=RunBudget(max_completions=10)
+    )
+    usage = response.usage
+    assert usage.completions == 5
+    assert {name: agent.completions for name, agent in usage.by_agent.items()} == {
+        "Lead": 2,
+        "Backend": 2,
+        "Frontend": 1,
+    }
+
+    # the lead's turn and both branches' first turns use up the budget
+    response = client.run(
+        agent=make_agents(), messages=MESSAGES, budget=RunBudget(max_completions=3)
+    )
+    assert response.termination_reason == "max_completions"
+    assert response.usage.completions == 3
+
+
+def test_branches_do_not_checkpoint():
+    mock_client = MockOpenAIClient()
+    mock_client.chat.completions.create.side_effect = respond(threading.Barrier(2, timeout=5))
+    store = MemoryCheckpointStore()
+
+    response = Swarm(client=mock_client, checkpoint_store=store).run(
+        agent=make_agents(), messages=MESSAGES
+    )
+
+    assert store.runs() == [response.run_id]
+    assert store.load(response.run_id).status == "finished"
+
+
+def test_custom_reducer():
+    seen = {}
+
+    def reducer(context_variables, tasks, responses):
+        seen["context"] = dict(context_variables)
+        seen["agents"] = [task.agent.name for task in tasks]
+        return Result(
+            value=" / ".join(r.messages[-1]["content"] for r in responses),
+            context_variables={"branches": len(responses)},
+        )
+
+    mock_client = MockOpenAIClient()
+    mock_client.chat.completions.create.side_effect = respond(threading.Barrier(2, timeout=5))
+    response = Swarm(client=mock_client).run(
+        agent=make_agents(reducer), messages=MESSAGES, context_variables={"project": "shop"}
+    )
+
+    assert response.messages[1]["content"] == "API ready / UI ready"
+    assert response.context_variables == {"project": "shop", "branches": 2}
+    assert seen == {"context": {"project": "shop"}, "agents": ["Backend", "Frontend"]}
+
+
+def test_async_fan_out():
+    barrier = threading.Barrier(2, timeout=5)
+    create = respond(barrier)
+
+    async def acreate(**params):
+        # off the loop, so the barrier can't block the other branch
+        return await asyncio.to_thread(create, **params)
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.chat.completions.create.side_effect = acreate
+    client = AsyncSwarm(client=mock_client)
+
+    response = asyncio.run(client.run(agent=make_agents(), messages=MESSAGES))
+
+    assert json.loads(response.messages[1]["content"])[1] == {
+        "agent": "Frontend",
+        "content": "UI ready",
+    }
+    assert response.context_variables == {"api": "done"}
+
+
+def test_async_branches_do_not_checkpoint():
+    create = respond(threading.Barrier(2, timeout=5))
+
+    async def acreate(**params):
+        return await asyncio.to_thread(create, **params)
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.chat.completions.create.side_effect = acreate
+    store = MemoryCheckpointStore()
+    client = AsyncSwarm(client=mock_client, checkpoint_store=store)
+
+    response = asyncio.run(client.run(agent=make_agents(), messages=MESSAGES))
+
+    assert store.runs() == [response.run_id]
+
+
+def test_context_changes():
+    assert context_changes({"a": 1, "b": [1]}, {"a": 1, "b": [1, 2], "c": 3}) == {
+        "b": [1, 2],
+        "c": 3,
+    }
@@ -0,0 +1,138 @@
+from unittest.mock import patch
+
+import pytest
+
+from swarm import Swarm, Agent
+from swarm.graph import GraphError, compile_graph, handoff_targets
+from swarm.types import Result
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+refunds_agent = Agent(name="Refunds Agent")
+
+
+def transfer_to_refunds():
+    return refunds_agent
+
+
+def make_agents():
+    def transfer_to_sales():
+        return sales_agent
+
+    def transfer_back_to_triage():
+        return Result(value="Back to triage", agent=triage_agent)
+
+    def lookup_order(order_id: int):
+        return "shipped"
+
+    triage_agent = Agent(name="Triage Agent", functions=[transfer_to_sales, transfer_to_refunds])
+    sales_agent = Agent(name="Sales Agent", functions=[lookup_order, transfer_back_to_triage])
+    return triage_agent, sales_agent
+
+
+def test_handoff_targets_found_without_calling():
+    calls = []
+
+    def transfer_to_refunds_logged():
+        calls.append(1)
+        return transfer_to_refunds()
+
+    assert handoff_targets(transfer_to_refunds) == [refunds_agent]
+    assert handoff_targets(lambda agent=refunds_agent: agent) == [refunds_agent]
+    assert handoff_targets(transfer_to_refunds_logged) == []
+    assert calls == []
+
+
+def test_compile_discovers_reachable_agents_and_cycles():
+    triage_agent, sales_agent = make_agents()
+    graph = compile_graph(triage_agent)
+
+    assert list(graph.nodes) == ["Triage Agent", "Sales Agent", "Refunds Agent"]
+    assert graph.nodes["Triage Agent"].handoffs == (
+        ("transfer_to_sales", "Sales Agent"),
+        ("transfer_to_refunds", "Refunds Agent"),
+    )
+    assert graph.cycles == (("Triage Agent", "Sales Agent"),)
+    assert graph.unreachable == ()
+    assert graph.warnings == ()
+    assert sales_agent in graph
+    assert Agent(name="Sales Agent") not in graph
+    assert [t["function"]["name"] for t in graph.nodes["Sales Agent"].manifest.tools] == [
+        "lookup_order",
+        "transfer_back_to_triage",
+    ]
+
+
+def test_registry_resolves_dynamic_handoffs_and_reports_unreachable():
+    agents = {}
+
+    def transfer_to_billing():
+        return agents.get("billing")
+
+    billing_agent = Agent(name="Billing")
+    audit_agent = Agent(name="Audit")
+    entry = Agent(name="Entry", functions=[transfer_to_billing])
+    # `agents` is filled after the function is defined, as a lazy registry would be
+    agents.update(billing=billing_agent)
+
+    graph = compile_graph(entry, agents=[billing_agent, audit_agent])
+    assert graph.nodes["Entry"].handoffs == (("transfer_to_billing", "Billing"),)
+    assert graph.unreachable == ("Audit",)
+
+    def transfer_to_nowhere():
+        return None
+
+    graph = compile_graph(Agent(name="Lost", functions=[transfer_to_nowhere]))
+    assert graph.warnings == (
+        "Lost.transfer_to_nowhere: no target agent found; pass it in the registry",
+    )
+
+
+def test_compile_reports_every_problem():
+    def helper():
+        return "a"
+
+    def other():
+        return "b"
+
+    other.__name__ = "helper"
+    twin = Agent(name="Triage Agent")
+
+    def transfer_to_twin():
+        return twin
+
+    entry = Agent(name="Triage Agent", functions=[helper, other, transfer_to_twin])
+    with pytest.raises(GraphError) as error:
+        compile_graph(entry)
+    assert error.value.problems == [
+        "Agent 'Triage Agent' has more than one function named 'helper'",
+        "Two different agents are named 'Triage Agent'",
+    ]
+
+
+def test_runs_reuse_compiled_manifests():
+    triage_agent, sales_agent = make_agents()
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                {"role": "assistant", "content": ""},
+                function_calls=[{"name": "transfer_to_sales"}],
+            ),
+            create_mock_response({"role": "assistant", "content": "Hi from sales"}),
+        ]
+    )
+    client = Swarm(client=mock_client)
+    graph = client.compile(triage_agent)
+    assert client.graph is graph
+
+    with patch("swarm.core.compile_tools") as compile_tools:
+        response = client.run(
+            agent=triage_agent, messages=[{"role": "user", "content": "sales"}]
+        )
+    assert response.agent is sales_agent
+    compile_tools.assert_not_called()
+
+    # a changed agent no longer matches its compiled manifest
+    sales_agent.functions.append(transfer_to_refunds)
+    assert graph.manifest(sales_agent.functions) is None
+    assert len(client.tool_manifest(sales_agent.functions).tools) == 3
@@ -0,0 +1,129 @@
+import json
+import pickle
+
+import pytest
+
+from swarm.history import ContextVariables, History
+
+
+def test_history_shares_structure():
+    base = History([{"role": "user", "content": "hi"}])
+    extended = base.append({"role": "assistant", "content": "hello"})
+
+    assert len(base) == 1
+    assert len(extended) == 2
+    assert extended._parent is base
+    assert extended[0] is base[0]
+    assert extended == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+
+
+def test_history_indexing_and_slicing():
+    history = History([1, 2, 3]).append(4).extend([5, 6]).append(7)
+    expected = [1, 2, 3, 4, 5, 6, 7]
+
+    for start in range(-8, 8):
+        assert history[start:] == expected[start:]
+        for stop in range(-8, 8):
+            assert history[start:stop] == expected[start:stop]
+    for i in range(-7, 7):
+        assert history[i] == expected[i]
+    with pytest.raises(IndexError):
+        history[7]
+
+
+def test_history_from_list_is_isolated():
+    messages = [{"role": "user", "content": "hi"}]
+    history = History(messages)
+    messages.append({"role": "user", "content": "later"})
+
+    assert len(history) == 1
+
+
+def test_context_variables_copy_on_write():
+    base = {"user": "John", "cart": ["apple"], "removed": 1}
+    context_variables = ContextVariables(base)
+
+    context_variables["cart"].append("pear")
+    context_variables["user"] = "Jane"
+    context_variables["new"] = True
+    del context_variables["removed"]
+
+    assert base == {"user": "John", "cart": ["apple"], "removed": 1}
+    assert context_variables.to_dict() == {
+        "user": "Jane",
+        "cart": ["apple", "pear"],
+        "new": True,
+    }
+    assert list(context_variables) == ["user", "cart", "new"]
+    assert "removed" not in context_variables
+
+
+def test_context_variables_share_untouched_values():
+    payload = {"large": list(range(1000))}
+    context_variables = ContextVariables({"payload": payload, "user": "John"})
+    context_variables["user"] = "Jane"
+
+    assert context_variables.to_dict()["payload"] is payload
+
+
+class Cart:
+    def __init__(self):
+        self.items = ["apple"]
+
+
+def test_context_variables_are_a_dict():
+    cart, tags = Cart(), ["vip"]
+    base = {"cart": cart, "tags": tags, "user": "John"}
+    context_variables = ContextVariables(base)
+
+    context_variables["cart"].items.append("pear")
+    snapshot = context_variables.copy()
+    snapshot["tags"].append("new")
+
+    assert isinstance(context_variables, dict)
+    assert cart.items == ["apple"] and tags == ["vip"]
+    assert json.loads(json.dumps({k: v for k, v in snapshot.items() if k != "cart"})) == {
+        "tags": ["vip", "new"],
+        "user": "John",
+    }
+    assert json.dumps(ContextVariables({"user": "John"})) == '{"user": "John"}'
+    restored = pickle.loads(pickle.dumps(context_variables))
+    assert type(restored) is ContextVariables
+    assert restored["cart"].items == ["apple", "pear"]
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        dict,
+        lambda cv: {**cv},
+        lambda cv: cv | {},
+        lambda cv: {} | cv,
+        lambda cv: cv.copy(),
+        lambda cv: dict(cv.items()),
+        lambda cv: {"other": 1, **cv},
+    ],
+    ids=["dict", "unpack", "or", "ror", "copy", "items", "unpack-into"],
+)
+def test_context_variables_copies_never_share_the_callers_values(read):
+    cart = ["apple"]
+    context_variables = ContextVariables({"cart": cart, "user": "John"})
+
+    copied = read(context_variables)
+    copied["cart"].append("pear")
+
+    assert type(copied) is dict
+    assert cart == ["apple"]
+    assert copied["user"] == "John"
+
+
+def test_dict_update_from_context_variables_copies_values():
+    cart = ["apple"]
+    target = {}
+    target.update(ContextVariables({"cart": cart}))
+    target["cart"].append("pear")
+
+    assert cart == ["apple"]
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def modules_after(statement: str) -> set:
+    probe = f"{statement}; import sys; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import swarm",
+        "from swarm import Swarm, AsyncSwarm, Agent, Response",
+        "from swarm import Swarm; Swarm(client=object())",
+    ],
+)
+def test_openai_is_imported_lazily(statement):
+    assert "openai" not in modules_after(statement)
+
+
+def test_reexported_openai_types_resolve():
+    from openai.types.chat import ChatCompletionMessage
+
+    import swarm.types
+
+    assert swarm.types.ChatCompletionMessage is ChatCompletionMessage
+    with pytest.raises(AttributeError):
+        swarm.types.NotAType
+
+
+def test_unknown_attribute_raises():
+    import swarm
+
+    with pytest.raises(AttributeError):
+        swarm.NotAnExport
+    assert "Swarm" in dir(swarm)
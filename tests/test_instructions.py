@@ -0,0 +1,158 @@
+import pytest
+
+from swarm import Swarm, Agent
+from swarm.instructions import (
+    InstructionCache,
+    clear_instruction_cache,
+    instruction_cache_info,
+)
+from swarm.history import ContextVariables
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+@pytest.fixture
+def cache():
+    return InstructionCache()
+
+
+def counting(render):
+    calls = []
+
+    def instructions(context_variables):
+        calls.append(1)
+        return render(context_variables)
+
+    return instructions, calls
+
+
+def test_rerenders_only_when_read_keys_change(cache):
+    instructions, calls = counting(lambda cv: f"Help {cv['user']}.")
+
+    assert cache.render(instructions, {"user": "Ada", "flight": 1}) == "Help Ada."
+    assert cache.render(instructions, {"user": "Ada", "flight": 2}) == "Help Ada."
+    assert cache.render(instructions, {"user": "Bob", "flight": 2}) == "Help Bob."
+    assert cache.render(instructions, {"user": "Ada", "flight": 3}) == "Help Ada."
+    assert len(calls) == 2
+    assert cache.info()[:3] == (2, 2, 2)
+
+
+def test_missing_keys_default_to_empty_and_are_tracked(cache):
+    instructions, calls = counting(
+        lambda cv: f"User: {cv['user'] or 'unknown'}, tier: {cv.get('tier', 'basic')}"
+    )
+
+    assert cache.render(instructions, {}) == "User: unknown, tier: basic"
+    assert cache.render(instructions, {"other": 1}) == "User: unknown, tier: basic"
+    assert cache.render(instructions, {"tier": "gold"}) == "User: unknown, tier: gold"
+    assert len(calls) == 2
+
+
+def test_branches_record_only_keys_they_read(cache):
+    instructions, calls = counting(
+        lambda cv: f"VIP {cv['name']}" if cv["vip"] else "Standard"
+    )
+
+    cache.render(instructions, {"vip": False, "name": "Ada"})
+    cache.render(instructions, {"vip": False, "name": "Bob"})
+    assert len(calls) == 1
+    assert cache.render(instructions, {"vip": True, "name": "Bob"}) == "VIP Bob"
+    assert len(calls) == 2
+
+
+def test_reading_everything_depends_on_everything(cache):
+    instructions, calls = counting(lambda cv: str(sorted(cv.items())))
+
+    cache.render(instructions, {"a": 1})
+    cache.render(instructions, {"a": 1})
+    cache.render(instructions, {"a": 1, "b": 2})
+    assert len(calls) == 2
+
+
+def test_in_place_edits_are_noticed(cache):
+    instructions, calls = counting(lambda cv: ", ".join(cv["items"]))
+    context_variables = {"items": ["a"]}
+
+    assert cache.render(instructions, context_variables) == "a"
+    context_variables["items"].append("b")
+    assert cache.render(instructions, context_variables) == "a, b"
+    assert len(calls) == 2
+
+
+class Profile:
+    def __init__(self, tier):
+        self.tier = tier
+
+    def __eq__(self, other):
+        return isinstance(other, Profile) and other.tier == self.tier
+
+
+def test_in_place_edits_to_objects_are_noticed(cache):
+    instructions, calls = counting(lambda cv: f"Tier: {cv['profile'].tier}")
+    profile = Profile("basic")
+
+    assert cache.render(instructions, {"profile": profile}) == "Tier: basic"
+    assert cache.render(instructions, {"profile": profile}) == "Tier: basic"
+    profile.tier = "gold"
+    assert cache.render(instructions, {"profile": profile}) == "Tier: gold"
+    assert len(calls) == 2
+
+
+def test_objects_without_equality_always_rerender(cache):
+    instructions, calls = counting(lambda cv: f"Session {id(cv['session'])}")
+    session = object()
+
+    cache.render(instructions, {"session": session})
+    cache.render(instructions, {"session": session})
+    assert len(calls) == 2
+
+
+def test_works_with_copy_on_write_context(cache):
+    instructions, calls = counting(lambda cv: cv["user"])
+    context_variables = ContextVariables({"user": "Ada"})
+
+    cache.render(instructions, context_variables)
+    context_variables["flight"] = 1
+    cache.render(instructions, context_variables)
+    assert len(calls) == 1
+
+
+def test_run_memoizes_across_turns():
+    clear_instruction_cache()
+    instructions, calls = counting(lambda cv: f"Help {cv['user_name']}.")
+
+    def set_flight(context_variables):
+        context_variables["flight"] = "UA1"
+        return "ok"
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses(
+        [
+            create_mock_response(
+                {"role": "assistant", "content": ""}, [{"name": "set_flight"}]
+            ),
+            create_mock_response({"role": "assistant", "content": "Done."}),
+        ]
+    )
+    agent = Agent(
+        instructions=instructions, functions=[set_flight], memoize_instructions=True
+    )
+    Swarm(client=mock).run(
+        agent=agent, messages=[], context_variables={"user_name": "Ada"}
+    )
+
+    assert len(calls) == 1
+    system = mock.chat.completions.create.call_args.kwargs["messages"][0]
+    assert system["content"] == "Help Ada."
+    assert instruction_cache_info().hits == 1
+
+
+def test_memoization_is_opt_in():
+    instructions, calls = counting(lambda cv: "Same.")
+    mock = MockOpenAIClient()
+    mock.set_response(create_mock_response({"role": "assistant", "content": "Hi."}))
+    agent = Agent(instructions=instructions)
+    swarm = Swarm(client=mock)
+
+    swarm.run(agent=agent, messages=[])
+    swarm.run(agent=agent, messages=[])
+    assert len(calls) == 2
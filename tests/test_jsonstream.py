@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from swarm.jsonstream import IncrementalJSONParser
+
+DOCUMENTS = [
+    {"location": "San Francisco", "days": 3},
+    {"query": 'say "hi"\\n', "unicode": "café ☃ \U0001f600", "empty": ""},
+    {"nested": {"list": [1, -2.5, 3e-2, True, False, None, [], {}]}, "n": 0},
+    {},
+    [1, [2, [3, {"a": "b"}]]],
+    "plain",
+]
+
+
+def parse(text, size):
+    parser = IncrementalJSONParser()
+    for start in range(0, len(text), size):
+        parser.feed(text[start : start + size])
+    return parser.value()
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_matches_json_loads_for_any_split(document, ensure_ascii):
+    text = json.dumps(document, ensure_ascii=ensure_ascii, indent=1)
+    for size in range(1, 8):
+        assert parse(text, size) == json.loads(text)
+
+
+def test_top_level_number_ends_with_input():
+    parser = IncrementalJSONParser()
+    parser.feed("4")
+    parser.feed("2")
+    assert not parser.complete
+    assert parser.value() == 42
+
+
+def test_partial_exposes_fields_as_they_arrive():
+    parser = IncrementalJSONParser()
+    parser.feed('{"path": "notes.md", "body": "Hello, wo')
+    assert parser.partial() == {"path": "notes.md", "body": "Hello, wo"}
+    parser.feed('rld", "tags": ["a", "b')
+    assert parser.partial() == {"path": "notes.md", "body": "Hello, world", "tags": ["a", "b"]}
+    parser.feed('c"]}')
+    assert parser.complete
+    assert parser.value() == {"path": "notes.md", "body": "Hello, world", "tags": ["a", "bc"]}
+
+
+def test_partial_with_escape_split_across_fragments():
+    parser = IncrementalJSONParser()
+    parser.feed('{"text": "line\\')
+    assert parser.partial() == {"text": "line"}
+    parser.feed('nnext"}')
+    assert parser.value() == {"text": "line\nnext"}
+
+
+@pytest.mark.parametrize(
+    "fragments",
+    [
+        ['{"a" 1', "}"],
+        ['{"a": tru', "x}"],
+        ['{"a": 1,, ', '"b": 2}'],
+        ['{"a": 01}'],
+        ['{"a": "b"} x'],
+        ['{"a": "\\q"}'],
+    ],
+)
+def test_malformed_input_fails_on_first_bad_fragment(fragments):
+    parser = IncrementalJSONParser()
+    with pytest.raises(json.JSONDecodeError):
+        parser.feed(fragments[0])
+        parser.feed(fragments[1] if len(fragments) > 1 else "")
+        parser.value()
+    # once failed, the parser keeps failing
+    with pytest.raises(json.JSONDecodeError):
+        parser.feed("}")
+    assert parser.error is not None
+
+
+def test_malformed_input_reports_position():
+    parser = IncrementalJSONParser()
+    parser.feed('{"location": ')
+    with pytest.raises(json.JSONDecodeError) as error:
+        parser.feed("SF}")
+    assert error.value.pos == 13
+
+
+def test_incomplete_value():
+    parser = IncrementalJSONParser()
+    parser.feed('{"location": "S')
+    assert not parser.complete
+    with pytest.raises(json.JSONDecodeError):
+        parser.value()
@@ -0,0 +1,111 @@
+import json
+import pickle
+
+from swarm import Swarm, Agent
+from swarm.message import Message, ToolCall, wire_messages
+from tests.mock_client import MockOpenAIClient, create_mock_response, create_mock_stream
+
+
+def completion_message(content="", function_calls=[]):
+    return create_mock_response(
+        {"role": "assistant", "content": content}, function_calls
+    ).choices[0].message
+
+
+def test_matches_json_round_trip():
+    message = completion_message(
+        "Checking.", [{"name": "get_weather", "args": {"location": "Paris"}}]
+    )
+    expected = json.loads(message.model_dump_json())
+    expected["sender"] = "Agent"
+    # fields that are None on the wire are simply left out
+    expected = {k: v for k, v in expected.items() if v is not None or k in ("function_call",)}
+
+    compact = Message.from_completion(message, "Agent")
+
+    assert compact == expected
+    assert compact["tool_calls"][0]["function"]["name"] == "get_weather"
+    assert compact.get("tool_call_id") is None
+    assert "tool_call_id" not in compact
+
+
+def test_tool_message():
+    message = Message.tool("call_1", "get_weather", "sunny")
+    assert message == {
+        "role": "tool",
+        "tool_call_id": "call_1",
+        "tool_name": "get_weather",
+        "content": "sunny",
+    }
+    assert "tool_calls" not in message
+
+
+def test_strings_are_interned():
+    sender = "".join(["Tri", "age"])
+    first = Message.assistant("a", sender)
+    second = Message.assistant("b", "".join(["Tri", "age"]))
+    assert first.sender is second.sender
+
+
+def test_wire_messages_are_plain_dicts():
+    messages = [
+        {"role": "user", "content": "hi"},
+        Message.assistant("", "Agent", [ToolCall("call_1", "f", "{}", "function")]),
+    ]
+    wire = wire_messages(messages)
+    assert all(type(m) is dict for m in wire)
+    assert wire[0] is messages[0]
+    json.dumps(wire)
+
+
+def test_pickles():
+    message = Message.assistant("hello", "Agent", extra={"refusal": "no"})
+    restored = pickle.loads(pickle.dumps(message))
+    assert restored == message
+    assert restored["refusal"] == "no"
+
+
+def test_response_dumps_plain_messages():
+    def lookup_order(order_id):
+        return "shipped"
+
+    mock = MockOpenAIClient()
+    mock.set_sequential_responses(
+        [
+            create_mock_response(
+                {"role": "assistant", "content": ""},
+                [{"name": "lookup_order", "args": {"order_id": 1}}],
+            ),
+            create_mock_response({"role": "assistant", "content": "Shipped"}),
+        ]
+    )
+    response = Swarm(client=mock).run(
+        agent=Agent(functions=[lookup_order]),
+        messages=[{"role": "user", "content": "Where is order 1?"}],
+    )
+
+    assert all(type(m) is dict for m in response.messages)
+    assert json.loads(json.dumps(response.messages)) == response.messages
+    dumped = json.loads(response.model_dump_json(exclude={"agent"}))
+    assert dumped["messages"] == response.messages
+    assert all(type(m) is dict for m in response.model_dump()["messages"])
+
+    # callers may edit the returned history before sending it back
+    response.messages[-1]["content"] = "Shipped today"
+    assert response.messages[-1]["content"] == "Shipped today"
+
+
+def test_streamed_response_has_plain_messages():
+    mock = MockOpenAIClient()
+    mock.set_response(create_mock_stream("Hi"))
+    events = list(
+        Swarm(client=mock).run(
+            agent=Agent(),
+            messages=[{"role": "user", "content": "Hello"}],
+            stream=True,
+        )
+    )
+
+    response = events[-1]["response"]
+    assert [type(m) for m in response.messages] == [dict]
+    assert json.dumps(response.messages)
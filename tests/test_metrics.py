@@ -0,0 +1,85 @@
+import time
+
+from openai.types.completion_usage import CompletionUsage
+
+from swarm import Swarm, Agent
+from swarm.metrics import RunMetrics, TurnMetrics
+from tests.mock_client import (
+    MockOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
+
+
+def slow_tool():
+    time.sleep(0.05)
+    return "done"
+
+
+def tool_turn():
+    return create_mock_response(
+        message={"role": "assistant", "content": ""},
+        function_calls=[{"name": "slow_tool"}],
+    )
+
+
+def test_run_records_turn_metrics():
+    final = create_mock_response({"role": "assistant", "content": "All done."})
+    final.usage = CompletionUsage(prompt_tokens=120, completion_tokens=30, total_tokens=150)
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses([tool_turn(), final])
+
+    agent = Agent(name="Test Agent", model="gpt-4o-mini", functions=[slow_tool])
+    response = Swarm(client=mock_client).run(
+        agent=agent, messages=[{"role": "user", "content": "Go"}]
+    )
+    metrics = response.metrics
+
+    assert len(metrics.turns) == 2
+    first, second = metrics.turns
+    assert first.agent == "Test Agent"
+    assert first.model == "gpt-4o-mini"
+    assert first.tool_calls == 1
+    assert first.tool_time >= 0.05
+    assert first.estimated_usage and first.prompt_tokens > 0
+    assert (second.prompt_tokens, second.completion_tokens) == (120, 30)
+    assert not second.estimated_usage
+    assert metrics.tool_time >= 0.05
+    assert 0 < metrics.tool_time_share <= 1
+    assert metrics.completion_tokens == first.completion_tokens + 30
+
+
+def test_stream_emits_turn_metrics():
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_stream(function_calls=[{"name": "slow_tool"}]),
+            create_mock_stream("All done."),
+        ]
+    )
+
+    agent = Agent(functions=[slow_tool])
+    chunks = list(
+        Swarm(client=mock_client).run(
+            agent=agent, messages=[{"role": "user", "content": "Go"}], stream=True
+        )
+    )
+
+    turns = [c["metrics"] for c in chunks if "metrics" in c]
+    assert len(turns) == 2
+    assert all(t.time_to_first_token is not None for t in turns)
+    assert turns[0].tool_time >= 0.05
+    assert chunks[-1]["response"].metrics.turns == turns
+
+
+def test_run_metrics_summary():
+    metrics = RunMetrics(
+        turns=[
+            TurnMetrics(model_time=1.0, tool_time=0.5, completion_tokens=100),
+            TurnMetrics(model_time=1.0, tool_time=0.0, completion_tokens=60),
+        ]
+    ).finish(wall_time=3.0)
+
+    assert metrics.tokens_per_second == 80
+    assert metrics.tool_time_share == 0.5 / 3.0
+    assert metrics.overhead_time == 0.5
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.policy import (
+    CompletionPolicy,
+    FirstChunkTimeout,
+    call_with_policy,
+    single_attempt_client,
+)
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_response,
+)
+
+DEFAULT_RESPONSE_CONTENT = "sample response content"
+
+
+@pytest.fixture
+def mock_openai_client():
+    m = MockOpenAIClient()
+    m.set_response(
+        create_mock_response({"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT})
+    )
+    return m
+
+
+def fast_policy(**kwargs):
+    return CompletionPolicy(backoff_base=0.001, jitter=False, **kwargs)
+
+
+def test_retries_transient_errors(mock_openai_client):
+    response = create_mock_response({"role": "assistant", "content": "ok"})
+    mock_openai_client.chat.completions.create.side_effect = [
+        ConnectionError("reset"),
+        ConnectionError("reset"),
+        response,
+    ]
+    client = Swarm(client=mock_openai_client, policy=fast_policy(timeout=5))
+
+    result = client.run(agent=Agent(), messages=[{"role": "user", "content": "Hi"}])
+
+    assert result.messages[-1]["content"] == "ok"
+    assert result.metrics.turns[0].attempts == 3
+    assert mock_openai_client.chat.completions.create.call_count == 3
+    assert mock_openai_client.chat.completions.create.call_args.kwargs["timeout"] == 5
+
+
+def test_does_not_retry_other_errors(mock_openai_client):
+    mock_openai_client.chat.completions.create.side_effect = ValueError("bad request")
+    client = Swarm(client=mock_openai_client, policy=fast_policy())
+
+    with pytest.raises(ValueError):
+        client.run(agent=Agent(), messages=[{"role": "user", "content": "Hi"}])
+    assert mock_openai_client.chat.completions.create.call_count == 1
+
+
+def test_agent_policy_overrides_client_policy(mock_openai_client):
+    mock_openai_client.chat.completions.create.side_effect = ConnectionError("reset")
+    client = Swarm(client=mock_openai_client, policy=fast_policy(max_attempts=5))
+    agent = Agent(policy=fast_policy(max_attempts=2))
+
+    with pytest.raises(ConnectionError):
+        client.run(agent=agent, messages=[{"role": "user", "content": "Hi"}])
+    assert mock_openai_client.chat.completions.create.call_count == 2
+
+
+def test_retry_budget_caps_retries():
+    policy = fast_policy(max_attempts=10, retry_budget=0.0, retry_budget_min=3)
+    calls = []
+
+    def send():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            call_with_policy(policy, send, "gpt-4o", stream=False)
+
+    # three retries in total across all requests, then only first attempts
+    assert len(calls) == 3 + 3
+
+
+def test_hedges_slow_requests():
+    policy = fast_policy(hedge_after=0.05)
+    fast = create_mock_response({"role": "assistant", "content": "hedge"})
+    slow = create_mock_response({"role": "assistant", "content": "primary"})
+    lock, calls = threading.Lock(), []
+
+    def send():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return slow
+        return fast
+
+    start = time.perf_counter()
+    completion, outcome = call_with_policy(policy, send, "gpt-4o", stream=False)
+
+    assert time.perf_counter() - start < 0.4
+    assert completion is fast
+    assert outcome.hedged and outcome.attempts == 1
+
+
+def test_p95_hedging_waits_for_samples():
+    policy = fast_policy(hedge_after="p95", hedge_min_samples=5)
+    assert policy.hedge_delay("gpt-4o") is None
+    for latency in (0.1, 0.2, 0.3, 0.4, 1.0):
+        policy.observe("gpt-4o", latency)
+    assert policy.hedge_delay("gpt-4o") == 1.0
+    assert policy.hedge_delay("gpt-4o-mini") is None
+
+
+def test_first_chunk_timeout_retries_stalled_stream():
+    policy = fast_policy(first_chunk_timeout=0.05, max_attempts=2)
+    chunk = object()
+    streams = []
+
+    def stalled():
+        time.sleep(0.5)
+        yield chunk
+
+    def send():
+        streams.append(1)
+        return stalled() if len(streams) == 1 else iter([chunk])
+
+    completion, outcome = call_with_policy(policy, send, "gpt-4o", stream=True)
+
+    assert list(completion) == [chunk]
+    assert outcome.attempts == 2
+
+    with pytest.raises(FirstChunkTimeout):
+        call_with_policy(
+            fast_policy(first_chunk_timeout=0.05, max_attempts=1),
+            stalled,
+            "gpt-4o",
+            stream=True,
+        )
+
+
+def test_async_timeout_retries():
+    mock = MockAsyncOpenAIClient()
+    response = create_mock_response({"role": "assistant", "content": "ok"})
+    attempts = []
+
+    async def create(**kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+        return response
+
+    mock.chat.completions.create.side_effect = create
+    client = AsyncSwarm(client=mock, policy=fast_policy(timeout=0.05))
+
+    result = asyncio.run(
+        client.run(agent=Agent(), messages=[{"role": "user", "content": "Hi"}])
+    )
+
+    assert result.messages[-1]["content"] == "ok"
+    assert result.metrics.turns[0].attempts == 2
+
+
+def test_policy_requests_skip_sdk_retries(mock_openai_client):
+    from openai import OpenAI
+
+    client = OpenAI(api_key="test")
+    single = single_attempt_client(client)
+    assert (client.max_retries, single.max_retries) == (2, 0)
+    assert single_attempt_client(client) is single
+    # mocks have no with_options and are used as they are
+    assert single_attempt_client(mock_openai_client) is mock_openai_client
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from swarm import Swarm, Agent
+from swarm.ratelimit import (
+    RateLimiter,
+    RateLimits,
+    configure_rate_limits,
+    reset_rate_limits,
+    shared_rate_limiter,
+)
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+@pytest.fixture(autouse=True)
+def clean_shared_limiter():
+    reset_rate_limits()
+    yield
+    reset_rate_limits()
+
+
+def test_unlimited_models_pass_through():
+    limiter = RateLimiter({"gpt-4o": RateLimits(rpm=1)})
+    for _ in range(5):
+        assert limiter.acquire("gpt-4o-mini", 1_000_000) == 0
+    assert limiter.stats() == {}
+
+
+def test_token_bucket_blocks_until_refilled():
+    # 600 tokens/min refills 10 tokens per second
+    limiter = RateLimiter(default=RateLimits(tpm=600))
+    limiter.acquire("gpt-4o", 600)
+
+    start = time.monotonic()
+    waited = limiter.acquire("gpt-4o", 3)
+
+    assert 0.2 <= time.monotonic() - start < 1.0
+    assert waited > 0
+    stats = limiter.stats()["gpt-4o"]
+    assert stats["requests"] == 2
+    assert stats["throttled"] == 1
+    assert stats["waiting"] == 0 and stats["max_waiting"] == 1
+
+
+def test_async_acquire_awaits():
+    limiter = RateLimiter(default=RateLimits(rpm=600))
+    for _ in range(600):
+        limiter.acquire("gpt-4o")
+
+    async def acquire():
+        return await limiter.aacquire("gpt-4o")
+
+    assert asyncio.run(acquire()) > 0
+
+
+def test_settle_charges_actual_usage():
+    limiter = RateLimiter(default=RateLimits(tpm=1000))
+    limiter.acquire("gpt-4o", 100)
+    limiter.settle("gpt-4o", estimated=100, actual=400)
+
+    assert limiter.stats()["gpt-4o"]["tokens"] == 400
+
+
+def test_swarm_uses_shared_limiter():
+    limiter = configure_rate_limits({"gpt-4o": RateLimits(rpm=100, tpm=100_000)})
+    assert shared_rate_limiter() is limiter
+
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(create_mock_response({"role": "assistant", "content": "ok"}))
+    for _ in range(3):
+        Swarm(client=mock_client).run(
+            agent=Agent(), messages=[{"role": "user", "content": "hi"}]
+        )
+
+    stats = limiter.stats()["gpt-4o"]
+    assert stats["requests"] == 3
+    assert stats["tokens"] > 0
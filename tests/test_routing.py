@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from swarm import Swarm, AsyncSwarm, Agent
+from swarm.routing import ModelRouter
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_response,
+)
+
+
+def by_model(responses):
+    # completions keyed on the requested model; an exception is raised instead
+    def create(**kwargs):
+        result = responses[kwargs["model"]]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return create
+
+
+def test_list_of_models_becomes_router():
+    agent = Agent(models=["gpt-4o-mini", "gpt-4o"])
+    assert isinstance(agent.models, ModelRouter)
+    assert agent.models.candidates() == ["gpt-4o-mini", "gpt-4o"]
+
+
+def test_fails_over_to_next_model():
+    mock = MockOpenAIClient()
+    mock.chat.completions.create.side_effect = by_model(
+        {
+            "gpt-4o-mini": ConnectionError("down"),
+            "gpt-4o": create_mock_response({"role": "assistant", "content": "ok"}),
+        }
+    )
+    agent = Agent(models=["gpt-4o-mini", "gpt-4o"])
+
+    response = Swarm(client=mock).run(
+        agent=agent, messages=[{"role": "user", "content": "Hi"}]
+    )
+
+    assert response.messages[-1]["content"] == "ok"
+    assert response.metrics.turns[0].model == "gpt-4o"
+    stats = agent.models.stats()
+    assert stats["gpt-4o-mini"]["errors"] == 1
+    assert stats["gpt-4o-mini"]["failovers"] == 1
+    assert stats["gpt-4o"]["requests"] == 1
+
+
+def test_last_model_error_propagates():
+    mock = MockOpenAIClient()
+    mock.chat.completions.create.side_effect = ConnectionError("down")
+    agent = Agent(models=["gpt-4o-mini", "gpt-4o"])
+
+    with pytest.raises(ConnectionError):
+        Swarm(client=mock).run(agent=agent, messages=[{"role": "user", "content": "Hi"}])
+    assert mock.chat.completions.create.call_count == 2
+
+
+def test_model_override_bypasses_router():
+    mock = MockOpenAIClient()
+    mock.set_response(create_mock_response({"role": "assistant", "content": "ok"}))
+    agent = Agent(models=["gpt-4o-mini", "gpt-4o"])
+
+    Swarm(client=mock).run(
+        agent=agent,
+        messages=[{"role": "user", "content": "Hi"}],
+        model_override="o1",
+    )
+
+    assert mock.chat.completions.create.call_args.kwargs["model"] == "o1"
+    assert agent.models.stats() == {}
+
+
+def test_unhealthy_model_is_demoted_until_cooldown():
+    router = ModelRouter(models=["a", "b"], min_samples=2, cooldown=60)
+    router.record("a", 0.1, ok=False)
+    assert router.candidates() == ["a", "b"]
+    router.record("a", 0.1, ok=False)
+    assert router.candidates() == ["b", "a"]
+
+    # after the cooldown the model is tried again with fresh stats
+    router.cooldown = 0
+    assert router.candidates() == ["a", "b"]
+    assert router.stats()["a"]["error_rate"] == 0.0
+
+
+def test_latency_slo_breach_demotes_model():
+    router = ModelRouter(models=["a", "b"], latency_slo=1.0, min_samples=2)
+    router.record("a", 2.0)
+    router.record("a", 3.0)
+    assert router.candidates() == ["b", "a"]
+    assert router.stats()["a"]["healthy"] is False
+
+
+def test_fastest_strategy_prefers_lowest_latency():
+    router = ModelRouter(models=["a", "b", "c"], strategy="fastest")
+    router.record("a", 0.9)
+    router.record("b", 0.2)
+    # "c" is unmeasured, so it is tried first
+    assert router.candidates() == ["c", "b", "a"]
+
+
+def test_async_failover():
+    mock = MockAsyncOpenAIClient()
+    sync_create = by_model(
+        {
+            "gpt-4o-mini": TimeoutError(),
+            "gpt-4o": create_mock_response({"role": "assistant", "content": "ok"}),
+        }
+    )
+
+    async def create(**kwargs):
+        return sync_create(**kwargs)
+
+    mock.chat.completions.create.side_effect = create
+    agent = Agent(models=["gpt-4o-mini", "gpt-4o"])
+
+    response = asyncio.run(
+        AsyncSwarm(client=mock).run(
+            agent=agent, messages=[{"role": "user", "content": "Hi"}]
+        )
+    )
+
+    assert response.messages[-1]["content"] == "ok"
+    assert agent.models.stats()["gpt-4o-mini"]["failovers"] == 1
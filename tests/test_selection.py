@@ -0,0 +1,139 @@
+from swarm import Swarm, Agent
+from swarm.selection import ToolSelector, tokenize
+from swarm.tools import compile_tools
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+billing_agent = Agent(name="Billing")
+
+
+def lookup_order(order_id: str):
+    """Looks up the shipping status of an order."""
+
+
+def cancel_order(order_id: str):
+    """Cancels an order that hasn't shipped yet."""
+
+
+def refund_payment(payment_id: str):
+    """Refunds a card payment."""
+
+
+def update_address(street: str, city: str):
+    """Changes the customer's delivery address."""
+
+
+def reset_password(email: str):
+    """Sends a password reset email."""
+
+
+def list_invoices(customer_id: str):
+    """Lists the customer's invoices."""
+
+
+def transfer_billing():
+    return billing_agent
+
+
+FUNCTIONS = [
+    lookup_order,
+    cancel_order,
+    refund_payment,
+    update_address,
+    reset_password,
+    list_invoices,
+    transfer_billing,
+]
+
+
+def user(content):
+    return {"role": "user", "content": content}
+
+
+def test_tokenize():
+    assert tokenize("lookupOrder cancel_order the Orders") == [
+        "lookup",
+        "order",
+        "cancel",
+        "order",
+        "order",
+    ]
+
+
+def test_selects_relevant_tools_and_pins_handoffs():
+    manifest = compile_tools(FUNCTIONS)
+    selector = ToolSelector(top_k=2)
+
+    selection = selector.select(manifest, [user("I forgot my password, send a reset email")])
+    assert selection.names == ["reset_password", "transfer_billing"]
+    assert selection.tokens_saved > 0
+
+    # nothing matches: every tool goes out
+    selection = selector.select(manifest, [user("hello there")])
+    assert len(selection.tools) == len(FUNCTIONS)
+    assert selection.tokens_saved == 0
+
+
+def test_tools_in_use_stay_selected():
+    manifest = compile_tools(FUNCTIONS)
+    selector = ToolSelector(top_k=1, pinned=["list_invoices"])
+    messages = [
+        user("Where is my order?"),
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "lookup_order", "arguments": "{}"},
+                }
+            ],
+        },
+        {
+            "role": "tool",
+            "tool_call_id": "call_1",
+            "tool_name": "lookup_order",
+            "content": "lost",
+        },
+        user("Then refund the payment"),
+    ]
+    assert selector.select(manifest, messages).names == [
+        "lookup_order",
+        "refund_payment",
+        "list_invoices",
+        "transfer_billing",
+    ]
+
+
+def test_embeddings_are_cached_per_manifest():
+    calls = []
+
+    def embed(texts):
+        calls.append(len(texts))
+        # one dimension per keyword
+        return [[("address" in t) * 1.0, ("password" in t) * 1.0] for t in texts]
+
+    manifest = compile_tools(FUNCTIONS)
+    selector = ToolSelector(top_k=1, embed=embed)
+    for _ in range(3):
+        selection = selector.select(manifest, [user("new delivery address")])
+    assert selection.names == ["update_address", "transfer_billing"]
+    # the tools once, the query every turn
+    assert calls == [len(FUNCTIONS), 1, 1, 1]
+
+
+def test_run_sends_selected_tools_and_reports_savings():
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(create_mock_response({"role": "assistant", "content": "Done"}))
+    agent = Agent(functions=FUNCTIONS, tool_selector=ToolSelector(top_k=1))
+
+    response = Swarm(client=mock_client).run(
+        agent=agent, messages=[user("Cancel my order please")]
+    )
+
+    sent = mock_client.chat.completions.create.call_args.kwargs["tools"]
+    assert [tool["function"]["name"] for tool in sent] == ["cancel_order", "transfer_billing"]
+    turn = response.metrics.turns[0]
+    assert turn.tool_tokens_saved > 0
+    assert turn.tool_selection_time > 0
+    assert response.metrics.tool_tokens_saved == turn.tool_tokens_saved
@@ -0,0 +1,79 @@
+import json
+import warnings
+
+from swarm.stream import StreamAccumulator, delta_event
+from tests.mock_client import create_mock_stream
+
+
+def test_delta_event_matches_json_round_trip():
+    chunks = create_mock_stream(
+        "Hello there", [{"name": "get_weather", "args": {"location": "Paris"}}]
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        for chunk in chunks:
+            delta = chunk.choices[0].delta
+            expected = json.loads(delta.model_dump_json())
+            if expected["role"] == "assistant":
+                expected["sender"] = "Agent"
+            assert delta_event(delta, "Agent") == expected
+
+
+def test_accumulator_builds_message():
+    chunks = create_mock_stream(
+        "Checking both.",
+        [
+            {"name": "get_weather", "args": {"location": "Paris"}},
+            {"name": "get_time", "args": {"timezone": "CET"}},
+        ],
+    )
+    accumulator = StreamAccumulator("Agent")
+    for chunk in chunks:
+        accumulator.add(chunk.choices[0].delta)
+
+    message = accumulator.message()
+    assert message["content"] == "Checking both."
+    assert message["sender"] == "Agent"
+    assert message["tool_calls"] == [
+        {
+            "function": {
+                "arguments": json.dumps({"location": "Paris"}),
+                "name": "get_weather",
+            },
+            "id": "mock_tc_id_0",
+            "type": "function",
+        },
+        {
+            "function": {
+                "arguments": json.dumps({"timezone": "CET"}),
+                "name": "get_time",
+            },
+            "id": "mock_tc_id_1",
+            "type": "function",
+        },
+    ]
+
+
+def test_accumulator_without_tool_calls():
+    accumulator = StreamAccumulator("Agent")
+    for chunk in create_mock_stream("Just text"):
+        accumulator.add(chunk.choices[0].delta)
+
+    assert accumulator.message()["tool_calls"] is None
+
+
+def test_accumulator_parses_arguments_while_streaming():
+    chunks = create_mock_stream(
+        "", [{"name": "write_file", "args": {"path": "a.md", "body": "Hello"}}]
+    )
+    accumulator = StreamAccumulator("Agent")
+    partials = []
+    for chunk in chunks:
+        accumulator.add(chunk.choices[0].delta)
+        if accumulator.tool_calls:
+            partials.append(dict(accumulator.partial_arguments(0) or {}))
+
+    assert {"path": "a.md"} in partials
+    assert accumulator.parsed_arguments() == {
+        "mock_tc_id_0": {"path": "a.md", "body": "Hello"}
+    }
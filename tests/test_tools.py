@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from swarm.tools import compile_tools
+
+
+def lookup_order(order_id: int, context_variables):
+    """Looks up an order."""
+    return order_id
+
+
+def cancel_order(order_id: int):
+    return order_id
+
+
+def test_manifest_hides_context_variables():
+    manifest = compile_tools([lookup_order, cancel_order])
+
+    params = manifest.tools[0]["function"]["parameters"]
+    assert params == {
+        "type": "object",
+        "properties": {"order_id": {"type": "integer"}},
+        "required": ["order_id"],
+    }
+    assert manifest.function_map == {
+        "lookup_order": lookup_order,
+        "cancel_order": cancel_order,
+    }
+    assert manifest.context_functions == {"lookup_order"}
+
+
+def test_manifest_is_cached_per_functions_tuple():
+    functions = [lookup_order, cancel_order]
+    first = compile_tools(functions)
+    assert compile_tools(list(functions)) is first
+
+    # changing the functions invalidates the manifest
+    functions.append(lambda: "new")
+    second = compile_tools(functions)
+    assert second is not first
+    assert len(second.tools) == 3
+
+
+def test_manifest_compiled_once_across_turns():
+    def local_tool(x):
+        return x
+
+    with patch("swarm.tools.function_to_json", return_value={
+        "type": "function",
+        "function": {
+            "name": "local_tool",
+            "parameters": {"properties": {}, "required": []},
+        },
+    }) as to_json:
+        for _ in range(5):
+            compile_tools([local_tool])
+    assert to_json.call_count == 1
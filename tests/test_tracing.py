@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from swarm import Swarm, Agent
+from swarm.tracing import JSONLExporter, RingBufferExporter, start_trace
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+def handoff_client():
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[{"name": "transfer_to_agent2"}],
+            ),
+            create_mock_response({"role": "assistant", "content": "Hi from agent 2"}),
+        ]
+    )
+    return mock_client
+
+
+def agents():
+    agent2 = Agent(name="Agent 2")
+
+    def transfer_to_agent2():
+        return agent2
+
+    return Agent(name="Agent 1", functions=[transfer_to_agent2]), agent2
+
+
+def test_ring_buffer_records_run_events():
+    exporter = RingBufferExporter()
+    client = Swarm(client=handoff_client(), hooks=[exporter])
+    agent1, _ = agents()
+
+    client.run(agent=agent1, messages=[{"role": "user", "content": "Transfer me"}])
+
+    assert [e["event"] for e in exporter.events()] == [
+        "run_start",
+        "completion_request",
+        "completion_response",
+        "tool_start",
+        "tool_end",
+        "handoff",
+        "completion_request",
+        "completion_response",
+        "run_end",
+    ]
+    assert len({e["run_id"] for e in exporter.events()}) == 1
+    [handoff] = exporter.events("handoff")
+    assert (handoff["source"], handoff["target"]) == ("Agent 1", "Agent 2")
+    [tool_end] = exporter.events("tool_end")
+    assert tool_end["tool"] == "transfer_to_agent2" and tool_end["duration"] >= 0
+
+
+def test_jsonl_exporter(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    exporter = JSONLExporter(str(path))
+    client = Swarm(client=handoff_client())
+    client.add_hook(exporter)
+    agent1, _ = agents()
+
+    client.run(agent=agent1, messages=[{"role": "user", "content": "Transfer me"}])
+    exporter.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert events[0]["event"] == "run_start"
+    assert events[-1]["event"] == "run_end"
+
+
+def test_errors_are_traced_and_hook_failures_ignored():
+    def broken_tool():
+        raise RuntimeError("boom")
+
+    def broken_hook(event):
+        raise ValueError("hook failure")
+
+    exporter = RingBufferExporter()
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(
+        create_mock_response(
+            message={"role": "assistant", "content": ""},
+            function_calls=[{"name": "broken_tool"}],
+        )
+    )
+    client = Swarm(client=mock_client, hooks=[broken_hook, exporter])
+
+    with pytest.raises(RuntimeError):
+        client.run(
+            agent=Agent(functions=[broken_tool]),
+            messages=[{"role": "user", "content": "Go"}],
+        )
+
+    [tool_end] = exporter.events("tool_end")
+    assert "boom" in tool_end["error"]
+    assert exporter.events("error")[0]["error"] == "RuntimeError('boom')"
+
+
+def test_no_hooks_no_trace():
+    assert start_trace([], agent="Agent") is None
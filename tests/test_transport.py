@@ -0,0 +1,108 @@
+import asyncio
+import gc
+import threading
+
+import pytest
+
+from swarm.transport import (
+    ClientRegistry,
+    CountingTransport,
+    PoolConfig,
+    PoolStats,
+    configure_transport,
+    shared_clients,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    registry = ClientRegistry(PoolConfig(max_connections=8, http2=False))
+    yield registry
+    registry.close()
+
+
+def test_pool_stats_track_concurrency():
+    stats = PoolStats()
+    barrier = threading.Barrier(4)
+
+    def request():
+        stats.started()
+        barrier.wait()
+        stats.finished()
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stats.requests == 4
+    assert stats.in_flight == 0
+    assert stats.max_in_flight == 4
+
+
+def test_failed_requests_leave_flight():
+    class Unreachable:
+        def handle_request(self, request):
+            raise ConnectionError("refused")
+
+        async def handle_async_request(self, request):
+            raise TimeoutError("timed out")
+
+    stats = PoolStats()
+    transport = CountingTransport(Unreachable(), stats)
+    with pytest.raises(ConnectionError):
+        transport.handle_request(None)
+    with pytest.raises(TimeoutError):
+        asyncio.run(transport.handle_async_request(None))
+
+    assert stats.requests == 2
+    assert stats.in_flight == 0
+
+
+def test_configure_transport_replaces_registry(monkeypatch):
+    import swarm.transport as transport
+
+    monkeypatch.setattr(transport, "_shared_registry", None)
+    registry = configure_transport(PoolConfig(max_connections=4))
+    assert shared_clients() is registry
+    assert registry.config.max_connections == 4
+
+
+def test_clients_are_shared(registry, monkeypatch):
+    first = registry.client()
+    assert registry.client() is first
+
+    # a different key gets its own client
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-other")
+    assert registry.client() is not first
+
+    stats = registry.stats()
+    assert stats["clients"] == 2
+    assert stats["max_connections"] == 8
+    assert stats["requests"] == 0
+
+
+def test_async_clients_are_per_loop(registry):
+    async def get():
+        return registry.async_client(), registry.async_client()
+
+    first, again = asyncio.run(get())
+    assert first is again
+    del again
+    second, _ = asyncio.run(get())
+    assert second is not first
+
+    # the first loop is closed, so its client goes
+    del first
+    gc.collect()
+    assert registry.stats()["clients"] == 1
+
+
+def test_swarm_uses_shared_client(registry, monkeypatch):
+    from swarm import Swarm
+    import swarm.transport as transport
+
+    monkeypatch.setattr(transport, "_shared_registry", registry)
+    assert Swarm().client is Swarm().client is registry.client()
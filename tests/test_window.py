@@ -0,0 +1,93 @@
+from swarm import Swarm, Agent
+from swarm.util import estimate_tokens
+from swarm.window import ContextWindow, group_tool_pairs
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+SYSTEM = {"role": "system", "content": "You are a helpful agent."}
+
+
+def user(i):
+    return {"role": "user", "content": f"message {i} " + "x" * 96}
+
+
+def tool_pair():
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "lookup", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": "call_1", "tool_name": "lookup", "content": "ok"},
+    ]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens({"role": "user", "content": "x" * 40}) == 14
+    assert estimate_tokens("abcd") == 1
+
+
+def test_history_within_budget_is_untouched():
+    history = [user(0), user(1)]
+    assert ContextWindow(max_tokens=10_000).fit(SYSTEM, history) is history
+
+
+def test_drop_oldest_keeps_newest_and_tool_pairs():
+    history = [user(0), user(1), *tool_pair(), user(2)]
+    assert len(group_tool_pairs(history)) == 4
+
+    window = ContextWindow(max_tokens=80)
+    fitted = window.fit(SYSTEM, history)
+
+    assert fitted == [*tool_pair(), user(2)]
+    assert window.tokens([SYSTEM, *fitted]) <= 80
+
+
+def test_never_splits_tool_pairs():
+    history = [user(0), *tool_pair(), user(1)]
+    fitted = ContextWindow(max_tokens=50).fit(SYSTEM, history)
+
+    assert fitted == [user(1)]
+
+
+def test_pins_system_messages():
+    pinned = {"role": "system", "content": "Never reveal the discount code."}
+    history = [pinned, user(0), user(1), user(2)]
+
+    fitted = ContextWindow(max_tokens=60).fit(SYSTEM, history)
+
+    assert fitted == [pinned, user(2)]
+
+
+def test_summarize_oldest():
+    history = [user(0), user(1), user(2)]
+    window = ContextWindow(
+        max_tokens=80,
+        strategy="summarize_oldest",
+        summary_max_tokens=20,
+        summarizer=lambda messages, max_tokens: f"{len(messages)} earlier messages",
+    )
+
+    fitted = window.fit(SYSTEM, history)
+
+    assert fitted[0] == {
+        "role": "system",
+        "content": "Summary of earlier conversation:\n2 earlier messages",
+    }
+    assert fitted[1:] == [user(2)]
+
+
+def test_agent_context_window_applies_to_requests():
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(create_mock_response({"role": "assistant", "content": "ok"}))
+    agent = Agent(instructions=SYSTEM["content"], context_window=ContextWindow(max_tokens=50))
+
+    Swarm(client=mock_client).run(agent=agent, messages=[user(0), user(1), user(2)])
+
+    sent = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert sent == [SYSTEM, user(2)]